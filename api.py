@@ -0,0 +1,137 @@
+"""
+Read API serialization for C-Suite Pathway Program
+Each collection is described once by a Schema: the fields a client may request and the SQL
+expression behind each one. A request selects only the columns of the fields it asked for,
+and the rows go from the database driver to JSON or MessagePack as plain tuples, without
+model objects or per-field Python code (the C encoders call back only for datetimes), except
+for the few fields whose value is computed in Python from columns selected for them.
+MessagePack requires the msgpack package (pip install msgpack); without it only JSON is offered.
+"""
+
+import json
+from collections import namedtuple
+from datetime import date
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Older clients still send the unregistered name
+MSGPACK_ALIASES = ('application/x-msgpack',)
+
+# 'objects': one {"field": value} object per row; 'rows': the field names once, then one array per row
+LAYOUTS = ('objects', 'rows')
+
+Field = namedtuple('Field', ['name', 'expression', 'join', 'value'], defaults=[None, None])
+
+class InvalidFields(ValueError):
+    """A fieldset names fields the collection does not have"""
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+def msgpack_available():
+    return _msgpack() is not None
+
+def _encode_datetime(value):
+    # Datetimes are stored naive (created_at in UTC, event dates as entered) and sent as such
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not serializable')
+
+class Schema:
+    """
+    The fields of one collection. `fields` are Field tuples whose expression is a column (or a
+    callable returning one, for expressions that depend on the request) and whose join is the
+    relationship the column comes through, if any. A field with a value function is computed in
+    Python: its expression is a tuple of columns, and value() turns their values into the field's.
+    Pages are ordered by (sort_column, id_column).
+    """
+
+    def __init__(self, model, fields, sort_column, id_column, descending=True):
+        self.model = model
+        self.fields = {field.name: field for field in fields}
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.descending = descending
+
+    def parse_fields(self, value):
+        """Field names of a comma-separated fieldset, in request order (every field when empty)"""
+        if not value:
+            return tuple(self.fields)
+        names = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                                f"Available: {', '.join(self.fields)}")
+        return names
+
+    def query(self, session, names):
+        """
+        Query selecting the named fields, in order, followed by the paging columns the fieldset
+        lacks (rows may therefore be longer than names; a computed field takes one column per
+        input). Only the joins those fields need are made, as outer joins so that a missing
+        related row leaves its fields null rather than dropping the item.
+        """
+        expressions = []
+        joins = []
+        for name in names:
+            field = self.fields[name]
+            expression = field.expression() if callable(field.expression) else field.expression
+            if field.value is None:
+                expressions.append(expression.label(name))
+            else:
+                expressions.extend(column.label(f'{name}_{index}') for index, column in enumerate(expression))
+            if field.join is not None and all(field.join is not join for join in joins):
+                joins.append(field.join)
+        for column in (self.sort_column, self.id_column):
+            if column.key not in names:
+                expressions.append(column.label(column.key))
+
+        query = session.query(*expressions).select_from(self.model)
+        for relationship in joins:
+            query = query.outerjoin(relationship)
+        return query
+
+    def encode_rows(self, rows, names, layout='objects'):
+        """Payload entries for rows returned by query(), in the given layout"""
+        if any(self.fields[name].value is not None for name in names):
+            rows = [self._compute(row, names) for row in rows]
+        width = len(names)
+        if layout == 'rows':
+            return [tuple(row)[:width] for row in rows]
+        # zip() stops at the last requested field, leaving out the paging columns
+        return [dict(zip(names, row)) for row in rows]
+
+    def _compute(self, row, names):
+        # One value per field: computed fields consume their input columns
+        values = []
+        position = 0
+        for name in names:
+            field = self.fields[name]
+            if field.value is None:
+                values.append(row[position])
+                position += 1
+            else:
+                width = len(field.expression)
+                values.append(field.value(*row[position:position + width]))
+                position += width
+        return values
+
+def negotiate(accept_mimetypes):
+    """Mimetype of the best format the client accepts, or None if it accepts neither"""
+    if not accept_mimetypes:
+        return JSON_MIMETYPE  # no Accept header: anything goes
+    offers = [JSON_MIMETYPE]
+    if msgpack_available():
+        offers += [MSGPACK_MIMETYPE, *MSGPACK_ALIASES]
+    best = accept_mimetypes.best_match(offers)
+    return MSGPACK_MIMETYPE if best in MSGPACK_ALIASES else best
+
+def dumps(payload, mimetype):
+    """Serialize a payload of dicts, lists, tuples, strings, numbers and datetimes"""
+    if mimetype == MSGPACK_MIMETYPE:
+        return _msgpack().packb(payload, default=_encode_datetime, use_bin_type=True)
+    return json.dumps(payload, default=_encode_datetime, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
@@ -1,21 +1,58 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, send_from_directory, g, has_request_context, abort, make_response
+from flask import before_render_template, template_rendered, get_template_attribute
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_mail import Mail, Message
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from sqlalchemy import and_, or_, event, inspect, text, select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.orm import joinedload, selectinload, lazyload, make_transient_to_detached, object_session
+from collections import namedtuple
+from contextlib import contextmanager
 import os
-from datetime import datetime
+import re
+import json
+import base64
+import hashlib
+import functools
+import mimetypes
+from datetime import datetime, timedelta
 import secrets
+import time
+import threading
+import click
 import uuid
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
 from werkzeug.utils import secure_filename
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import ClosingIterator
+from cache import FragmentCache, create_cache_backend
+from storage import create_storage_backend
+from thumbnails import PREVIEW_TYPES, PreviewUnavailable, render_preview
+from search import KINDS as SEARCH_KINDS, HIGHLIGHT_START, HIGHLIGHT_END, search_index_for
+from metrics import RequestMetrics
+from compression import HTMLMinifyExtension, ResponseCompressor
+from api import (LAYOUTS as API_LAYOUTS, JSON_MIMETYPE, Field, InvalidFields, Schema, dumps as api_dumps,
+                 negotiate as negotiate_api_format)
+from ical import CONTENT_TYPE as ICAL_CONTENT_TYPE, FORMAT_VERSION as ICAL_FORMAT_VERSION, FeedEvent, render_calendar
+from livefeed import LiveFeed, encode_cursor as encode_live_cursor, decode_cursor as decode_live_cursor
+from assets import MANIFEST_NAME, AssetManifest, brotli_available, build_assets
+from markupsafe import escape, Markup
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'csuite-pathway-secret-key-2024')
 
 # Database configuration
 if os.environ.get('DATABASE_URL'):
-    # Production: Use PostgreSQL from Render
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
+    # Production: Use PostgreSQL from Render (which hands out postgres:// URLs SQLAlchemy rejects)
+    app.config['SQLALCHEMY_DATABASE_URI'] = re.sub(r'^postgres://', 'postgresql://', os.environ.get('DATABASE_URL'))
 elif os.environ.get('RENDER'):
     # Production on Render: Use SQLite (simpler setup)
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///csuite.db'
@@ -25,6 +62,69 @@ else:
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool. Every gunicorn worker process has its own pool, so the database sees up
+# to workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; keep that under max_connections.
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # before proxies/firewalls drop idle ones
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+# PostgreSQL cancels statements running longer than this (0 = no limit)
+app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+# Seconds before giving up on connecting to an unreachable PostgreSQL server
+app.config['DB_CONNECT_TIMEOUT'] = int(os.environ.get('DB_CONNECT_TIMEOUT', 5))
+# Connect through PgBouncer in transaction pooling mode: PgBouncer does the pooling, and
+# session state such as startup options cannot be used
+app.config['DB_PGBOUNCER'] = os.environ.get('DB_PGBOUNCER', 'False').lower() == 'true'
+
+def database_engine_options(database_uri):
+    """create_engine() options for the DB_* pool settings"""
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}  # one shared in-memory connection, managed by Flask-SQLAlchemy
+        # Local file: reconnecting is free, so no pre-ping or recycling
+        return {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        }
+    
+    connect_args = {}
+    if url.get_backend_name() == 'postgresql':
+        connect_args['connect_timeout'] = app.config['DB_CONNECT_TIMEOUT']
+    
+    if app.config['DB_PGBOUNCER']:
+        # Idle connections held here would pin PgBouncer server connections for nothing
+        return {'poolclass': NullPool, 'connect_args': connect_args}
+    
+    if app.config['DB_STATEMENT_TIMEOUT_MS'] and url.get_backend_name() == 'postgresql':
+        connect_args['options'] = f"-c statement_timeout={app.config['DB_STATEMENT_TIMEOUT_MS']}"
+    return {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': app.config['DB_POOL_PRE_PING'],
+        'connect_args': connect_args,
+    }
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Optional read replica: GET requests read from it, everything else goes to the primary.
+# It is skipped while it lags more than REPLICA_MAX_LAG_SECONDS or cannot be reached
+# (re-checked every REPLICA_CHECK_INTERVAL seconds), and for REPLICA_STICKY_SECONDS after
+# a browser session wrote something, so users always see their own changes.
+app.config['DATABASE_REPLICA_URL'] = re.sub(r'^postgres://', 'postgresql://', os.environ.get('DATABASE_REPLICA_URL', ''))
+app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 10))
+app.config['REPLICA_CHECK_INTERVAL'] = float(os.environ.get('REPLICA_CHECK_INTERVAL', 5))
+app.config['REPLICA_STICKY_SECONDS'] = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+if app.config['DATABASE_REPLICA_URL']:
+    app.config['SQLALCHEMY_BINDS'] = {'replica': {
+        'url': app.config['DATABASE_REPLICA_URL'],
+        **database_engine_options(app.config['DATABASE_REPLICA_URL']),
+    }}
+
 # Email configuration
 app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
 app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
@@ -32,93 +132,364 @@ app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() == '
 app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME', 'your-email@gmail.com')
 app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD', 'your-app-password')
 
+# Outbound email queue: requests only enqueue, a background worker sends
+app.config['MAIL_OUTBOX_THREAD'] = os.environ.get('MAIL_OUTBOX_THREAD', 'True').lower() == 'true'
+app.config['MAIL_OUTBOX_BATCH_SIZE'] = int(os.environ.get('MAIL_OUTBOX_BATCH_SIZE', 20))
+app.config['MAIL_OUTBOX_POLL_INTERVAL'] = float(os.environ.get('MAIL_OUTBOX_POLL_INTERVAL', 5))
+app.config['MAIL_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_MAX_ATTEMPTS', 5))
+app.config['MAIL_RETRY_BASE_SECONDS'] = int(os.environ.get('MAIL_RETRY_BASE_SECONDS', 30))
+
+# Resource previews: rendered by a background worker after the upload commits
+app.config['THUMBNAIL_THREAD'] = os.environ.get('THUMBNAIL_THREAD', 'True').lower() == 'true'
+app.config['THUMBNAIL_SIZE'] = int(os.environ.get('THUMBNAIL_SIZE', 320))
+app.config['THUMBNAIL_POLL_INTERVAL'] = float(os.environ.get('THUMBNAIL_POLL_INTERVAL', 30))
+app.config['THUMBNAIL_MAX_ATTEMPTS'] = int(os.environ.get('THUMBNAIL_MAX_ATTEMPTS', 3))
+# Larger images (and rasterized PDF pages) are marked failed without being decoded
+app.config['THUMBNAIL_MAX_PIXELS'] = int(os.environ.get('THUMBNAIL_MAX_PIXELS', 40_000_000))
+
 # File upload configuration
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'static/uploads')  # relative to the app, or absolute
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_CHUNK_SIZE'] = 64 * 1024  # bytes copied per read while streaming uploads to disk
+app.config['CHUNKED_UPLOAD_CHUNK_SIZE'] = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+# Seconds without a new chunk after which a resumable upload counts as abandoned and is deleted
+app.config['CHUNKED_UPLOAD_TTL'] = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 3600))
+
+# Download offloading: '' (Flask streams the file), 'x-sendfile' (Apache/lighttpd)
+# or 'x-accel-redirect' (nginx serves X_ACCEL_REDIRECT_PREFIX as an internal location)
+app.config['DOWNLOAD_OFFLOAD'] = os.environ.get('DOWNLOAD_OFFLOAD', '').lower()
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '/protected-uploads/')
+app.config['USE_X_SENDFILE'] = app.config['DOWNLOAD_OFFLOAD'] == 'x-sendfile'
+
+# Resource storage ('local' flat UPLOAD_FOLDER, 'sharded' nested directories, or 's3' for
+# any S3-compatible object store shared by every web instance). Uploads are still staged
+# in UPLOAD_FOLDER before they are handed to the backend.
+app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'local')
+app.config['STORAGE_SHARD_DEPTH'] = int(os.environ.get('STORAGE_SHARD_DEPTH', 2))
+app.config['STORAGE_S3_BUCKET'] = os.environ.get('STORAGE_S3_BUCKET')
+app.config['STORAGE_S3_PREFIX'] = os.environ.get('STORAGE_S3_PREFIX', '')
+app.config['STORAGE_S3_ENDPOINT_URL'] = os.environ.get('STORAGE_S3_ENDPOINT_URL')
+app.config['STORAGE_S3_REGION'] = os.environ.get('STORAGE_S3_REGION')
+# Remote downloads redirect to a presigned URL valid this many seconds (0 streams through the app)
+app.config['STORAGE_DOWNLOAD_URL_TTL'] = int(os.environ.get('STORAGE_DOWNLOAD_URL_TTL', 300))
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'ppt', 'pptx', 'xls', 'xlsx', 'txt', 'jpg', 'jpeg', 'png', 'gif'}
 
-db = SQLAlchemy(app)
+# Fingerprinted static assets written by `flask assets` (relative to the app, or absolute)
+app.config['ASSETS_FOLDER'] = os.environ.get('ASSETS_FOLDER', 'static/dist')
+
+# Response compression: brotli or gzip, whichever the client prefers, for text responses of at
+# least COMPRESSION_MIN_SIZE bytes. HTML_MINIFY strips template indentation at compile time.
+app.config['COMPRESSION_ENABLED'] = os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+app.config['COMPRESSION_ALGORITHMS'] = os.environ.get('COMPRESSION_ALGORITHMS', 'br,gzip').split(',')
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
+app.config['COMPRESSION_MIMETYPES'] = os.environ.get(
+    'COMPRESSION_MIMETYPES',
+    'text/html,text/css,text/plain,text/javascript,application/javascript,application/json,application/msgpack,'
+    'application/xml,image/svg+xml'
+).split(',')
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+app.config['HTML_MINIFY'] = os.environ.get('HTML_MINIFY', 'False').lower() == 'true'
+
+# Live feed of new messages and events (Server-Sent Events with a long-poll fallback). Waiting
+# requests hold no database connection, only a thread or greenlet, and never a sync worker.
+app.config['LIVE_FEED_ENABLED'] = os.environ.get('LIVE_FEED_ENABLED', 'True').lower() == 'true'
+app.config['LIVE_POLL_INTERVAL'] = float(os.environ.get('LIVE_POLL_INTERVAL', 2))
+app.config['LIVE_MAX_WAITERS'] = int(os.environ.get('LIVE_MAX_WAITERS', 100))  # per worker process
+app.config['LIVE_STREAM_SECONDS'] = int(os.environ.get('LIVE_STREAM_SECONDS', 300))
+app.config['LIVE_LONG_POLL_SECONDS'] = int(os.environ.get('LIVE_LONG_POLL_SECONDS', 25))
+app.config['LIVE_RETRY_SECONDS'] = int(os.environ.get('LIVE_RETRY_SECONDS', 15))
+
+# Calendar subscriptions (/calendar/<token>.ics): events older than CALENDAR_FEED_PAST_DAYS
+# are left out (0 = every event), and clients are asked to refresh every CALENDAR_FEED_REFRESH_MINUTES
+app.config['CALENDAR_FEED_PAST_DAYS'] = int(os.environ.get('CALENDAR_FEED_PAST_DAYS', 90))
+app.config['CALENDAR_FEED_REFRESH_MINUTES'] = int(os.environ.get('CALENDAR_FEED_REFRESH_MINUTES', 60))
+# Days the calendar sync log keeps changes (0 = forever); older sync tokens get a full resync
+app.config['CALENDAR_SYNC_RETENTION_DAYS'] = int(os.environ.get('CALENDAR_SYNC_RETENTION_DAYS', 30))
+
+# Pagination configuration
+app.config['PAGE_SIZE'] = int(os.environ.get('PAGE_SIZE', 20))
+# Largest ?limit= the read API accepts (its default page size is PAGE_SIZE)
+app.config['API_MAX_PAGE_SIZE'] = int(os.environ.get('API_MAX_PAGE_SIZE', 100))
+
+# List pages send ETag/Last-Modified and answer 304 while their collection is unchanged
+app.config['LIST_PAGE_ETAGS'] = os.environ.get('LIST_PAGE_ETAGS', 'True').lower() == 'true'
+
+# Search ranks queries with fewer matches than this by relevance; more common words list
+# title matches first, then newest first, which keeps their pages fast
+app.config['SEARCH_RANK_WINDOW'] = int(os.environ.get('SEARCH_RANK_WINDOW', 1000))
+
+# Relationship loading strategies used by list views ('joined', 'selectin' or 'lazy')
+app.config['RELATIONSHIP_LOADING'] = {
+    'UserMessage.author': os.environ.get('MESSAGE_AUTHOR_LOADING', 'joined'),
+    'Resource.uploader': os.environ.get('RESOURCE_UPLOADER_LOADING', 'joined'),
+}
+
+# Maximum SQL queries per request (0 disables the check). Exceeding it raises in
+# testing mode so N+1 regressions fail the test, and logs a warning otherwise.
+app.config['QUERY_BUDGET'] = int(os.environ.get('QUERY_BUDGET', 0))
+
+# Request instrumentation (opt-in): per-endpoint timings, query counts and response sizes
+# at /metrics, plus a log of requests and SQL statements slower than the thresholds (0 = off)
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'False').lower() == 'true'
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # bearer token /metrics requires, if set
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', 500))
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 100))
+
+# Fragment cache configuration ('local' per worker, 'redis' shared between workers, or 'null')
+app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'local')
+app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 128))
+# A post only invalidates the local cache of the worker that handled it; the others show the
+# old fragment until it expires, so the default TTL is short unless the cache is shared
+app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get(
+    'DASHBOARD_CACHE_TTL', 60 if app.config['CACHE_BACKEND'] == 'redis' else 10))
+# A local identity cache is only invalidated in the worker that changed the user, so other
+# workers keep a revoked is_admin/is_verified for up to USER_CACHE_TTL: keep it short there
+app.config['USER_CACHE_TTL'] = int(os.environ.get(
+    'USER_CACHE_TTL', 300 if app.config['CACHE_BACKEND'] == 'redis' else 5))
+app.config['USER_CACHE_MAX_ENTRIES'] = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 1024))
+# Seconds before a worker rebuilds its alumni allowlist even though the 'alumni' collection
+# version is unchanged (only matters for rows changed by hand, outside the app and the importer)
+app.config['ALUMNI_INDEX_TTL'] = int(os.environ.get('ALUMNI_INDEX_TTL', 300))
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """
+    Session that reads from the replica while info['read_replica'] is set (see
+    route_reads_to_replica). Flushes and INSERT/UPDATE/DELETE statements always go to the
+    primary, and once the session has written, so does everything it reads afterwards.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+        elif bind is None and self.info.get('read_replica') and not self.info.get('wrote'):
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+class ReplicaMonitor:
+    """Whether the replica is reachable and close enough behind the primary, checked at most every interval"""
+
+    # 0 on a primary (e.g. a second local database) or a standby that has replayed everything it received
+    LAG_QUERY = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+        "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, interval, max_lag):
+        self.interval = interval
+        self.max_lag = max_lag
+        self.usable = False
+        self.lag = None
+        self.error = 'not checked yet'
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        """True if reads may go to the replica; one request per interval pays for the check"""
+        due = self._checked_at is None or time.monotonic() - self._checked_at >= self.interval
+        if due and self._lock.acquire(blocking=False):
+            try:
+                self.check()
+            finally:
+                self._lock.release()
+        return self.usable
+
+    def check(self):
+        try:
+            with db.engines['replica'].connect() as connection:
+                if connection.dialect.name == 'postgresql':
+                    lag = float(connection.execute(self.LAG_QUERY).scalar())
+                else:
+                    connection.execute(text('SELECT 1'))
+                    lag = 0.0
+            self.lag = lag
+            self.usable = lag <= self.max_lag
+            self.error = None if self.usable else f'replica is {lag:.1f}s behind'
+        except Exception as e:
+            self.usable = False
+            self.lag = None
+            self.error = str(e)
+        self._checked_at = time.monotonic()
+
+    def mark_down(self, error):
+        """Stop using the replica until the next check (a query on it just failed to connect)"""
+        self.usable = False
+        self.error = str(error)
+        self._checked_at = time.monotonic()
+
+    def status(self):
+        return {'available': self.usable, 'lag_seconds': self.lag, 'error': self.error}
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+replica_monitor = ReplicaMonitor(app.config['REPLICA_CHECK_INTERVAL'], app.config['REPLICA_MAX_LAG_SECONDS'])
 mail = Mail(app)
 login_manager = LoginManager()
+fragment_cache = FragmentCache(
+    create_cache_backend(app.config['CACHE_BACKEND'],
+                         max_entries=app.config['CACHE_MAX_ENTRIES'],
+                         url=app.config['CACHE_REDIS_URL']),
+    default_ttl=app.config['DASHBOARD_CACHE_TTL']
+)
+user_cache = FragmentCache(
+    create_cache_backend(app.config['CACHE_BACKEND'],
+                         max_entries=app.config['USER_CACHE_MAX_ENTRIES'],
+                         url=app.config['CACHE_REDIS_URL']),
+    default_ttl=app.config['USER_CACHE_TTL']
+)
+storage = create_storage_backend(
+    app.config['STORAGE_BACKEND'],
+    os.path.join(app.root_path, app.config['UPLOAD_FOLDER']),
+    depth=app.config['STORAGE_SHARD_DEPTH'],
+    bucket=app.config['STORAGE_S3_BUCKET'],
+    prefix=app.config['STORAGE_S3_PREFIX'],
+    endpoint_url=app.config['STORAGE_S3_ENDPOINT_URL'],
+    region=app.config['STORAGE_S3_REGION']
+)
+
+asset_manifest = AssetManifest(os.path.join(app.root_path, app.config['ASSETS_FOLDER']))
+
+def asset_url(filename):
+    """URL of a static file: its fingerprinted build when `flask assets` has run, else the plain file"""
+    if app.debug:
+        asset_manifest.reload()  # pick up rebuilds without restarting the dev server
+    fingerprinted = asset_manifest.lookup(filename)
+    if fingerprinted is None:
+        return url_for('static', filename=filename)
+    return url_for('fingerprinted_asset', filename=fingerprinted)
+
+app.jinja_env.add_extension(HTMLMinifyExtension)
+app.jinja_env.minify_html = app.config['HTML_MINIFY']
 
 # Make helper functions available in templates
 @app.context_processor
 def utility_processor():
     return {
         'get_file_icon': get_file_icon,
-        'format_file_size': format_file_size
+        'format_file_size': format_file_size,
+        'highlight_snippet': highlight_snippet,
+        'asset_url': asset_url,
+        'resource_download_url': resource_download_url,
+        # Read per page: the process cursor only moves while a poller runs, which sync workers never start
+        'live_cursor': lambda: encode_live_cursor(newest_live_ids())
     }
 
-# Initialize database tables
-def init_database():
+# One-time database bootstrap
+BOOTSTRAP_LOCK_KEY = 0x63737569746521  # arbitrary, shared by every process bootstrapping this database
+
+@contextmanager
+def bootstrap_lock():
+    """Serialize bootstrap across processes: advisory lock on PostgreSQL, file lock elsewhere"""
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': BOOTSTRAP_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': BOOTSTRAP_LOCK_KEY})
+        return
+
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, 'bootstrap.lock'), 'w') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def seed_database():
+    """Create tables and indexes, then the test user and alumni records if they are missing"""
+    # Create database tables
+    db.create_all()
+    print('✅ Database tables created successfully')
+
+    # create_all() skips tables that already exist, so add any new columns and indexes
+    added_columns = ensure_columns()
+    if added_columns:
+        print(f'✅ Added columns: {", ".join(added_columns)}')
+    created_indexes = ensure_indexes()
+    if created_indexes:
+        print(f'✅ Created indexes: {", ".join(created_indexes)}')
+    indexed_documents = ensure_search_index()
+    if indexed_documents:
+        print(f'✅ Indexed {indexed_documents} documents for search')
+    ensure_collection_versions()
+
+    # Check if we need to create a test user
+    test_user = User.query.filter_by(email='chentail@protonmail.ch').first()
+    if not test_user:
+        # Create test user
+        test_user = User(
+            first_name='Angus',
+            last_name='Chen',
+            email='chentail@protonmail.ch',
+            password_hash=generate_password_hash('angus123'),
+            is_verified=True
+        )
+        db.session.add(test_user)
+        db.session.commit()
+        print('✅ Test user created: chentail@protonmail.ch / angus123')
+
+    # Check if we need to load alumni data
+    alumni_count = Alumni.query.count()
+    if alumni_count == 0:
+        # Load alumni data
+        alumni_data = [
+            ('Alejandro', 'Tizzoni', 'atizzoni@bladex.com'),
+            ('Alexandre', 'Ozzetti', 'alex.ozzetti@gmail.com'),
+            ('Amanjeet', 'Singh', 'amanjeetsaluja@gmail.com'),
+            ('Angus', 'Chen', 'chentail@protonmail.ch'),
+            ('Asaf', 'Snear', 'asafsnear@gmail.com'),
+            ('Belen', 'Robles', 'belenalonsorobles@gmail.com'),
+            ('Diana', 'Orozco', 'dorozco@koskoff.com'),
+            ('Ehab', 'Al Judaibi', 'ealjudaibi@spb.com.sa'),
+            ('Fulya', 'Sarican', 'fulyasarican88@hotmail.com'),
+            ('Gabriel', 'Varga', 'gabriel@aplusfinishes.com'),
+            ('Gonzalo', 'Puerta', 'gongreenesgsolutions@gmail.com'),
+            ('Hani', 'Abdullah', 'hamehmadi@spb.com.sa'),
+            ('Joe', 'Akahane', 'yoichiro.akahane@us.panasonic.com'),
+            ('Juan Carlos', 'Gutierrez', 'jclopez@lopesolutions.com'),
+            ('Marijose', 'Betant', 'marijosebetant@gmail.com'),
+            ('Natalia', 'Mercker', 'natalia.mercker@cfcdiamonds.com'),
+            ('Pedro', 'Pimenta', 'ppimenta@abanca.com'),
+            ('Priscila', 'Pasqualin', 'pripasq@yahoo.com.br'),
+            ('Quinci', 'Martin', 'quincimartin3@gmail.com'),
+            ('Raed', 'Alsufyani', 'ralsufyani@moc.gov.sa'),
+            ('Rafael', 'Bittar', 'rafael.bittar@gmail.com'),
+            ('Runi', 'Mehta', 'mehta.runi@gmail.com'),
+            ('Sam', 'Mangrum', 'sam.mangrum@leewardenergy.com'),
+            ('Saud', 'Alfaadhel', 's.alfaadhel@misk.org.sa'),
+            ('Tommy', 'Hoey', 'tdhoy@grundfos.com'),
+            ('Yousuf', 'Rashid', 'yusuf.s.zaabi@pdo.co.om')
+        ]
+
+        for first_name, last_name, email in alumni_data:
+            alumni = Alumni(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                is_active=True
+            )
+            db.session.add(alumni)
+
+        db.session.commit()
+        print(f'✅ Loaded {len(alumni_data)} alumni records')
+
+def bootstrap_database():
+    """
+    Prepare the database once per deploy (flask --app app bootstrap), not on every worker boot.
+    Safe to run from several processes at once; returns False if bootstrap failed.
+    """
     with app.app_context():
         try:
-            # Create database tables
-            db.create_all()
-            print('✅ Database tables created successfully')
-            
-            # Check if we need to create a test user
-            test_user = User.query.filter_by(email='chentail@protonmail.ch').first()
-            if not test_user:
-                # Create test user
-                test_user = User(
-                    first_name='Angus',
-                    last_name='Chen',
-                    email='chentail@protonmail.ch',
-                    password_hash=generate_password_hash('angus123'),
-                    is_verified=True
-                )
-                db.session.add(test_user)
-                db.session.commit()
-                print('✅ Test user created: chentail@protonmail.ch / angus123')
-            
-            # Check if we need to load alumni data
-            alumni_count = Alumni.query.count()
-            if alumni_count == 0:
-                # Load alumni data
-                alumni_data = [
-                    ('Alejandro', 'Tizzoni', 'atizzoni@bladex.com'),
-                    ('Alexandre', 'Ozzetti', 'alex.ozzetti@gmail.com'),
-                    ('Amanjeet', 'Singh', 'amanjeetsaluja@gmail.com'),
-                    ('Angus', 'Chen', 'chentail@protonmail.ch'),
-                    ('Asaf', 'Snear', 'asafsnear@gmail.com'),
-                    ('Belen', 'Robles', 'belenalonsorobles@gmail.com'),
-                    ('Diana', 'Orozco', 'dorozco@koskoff.com'),
-                    ('Ehab', 'Al Judaibi', 'ealjudaibi@spb.com.sa'),
-                    ('Fulya', 'Sarican', 'fulyasarican88@hotmail.com'),
-                    ('Gabriel', 'Varga', 'gabriel@aplusfinishes.com'),
-                    ('Gonzalo', 'Puerta', 'gongreenesgsolutions@gmail.com'),
-                    ('Hani', 'Abdullah', 'hamehmadi@spb.com.sa'),
-                    ('Joe', 'Akahane', 'yoichiro.akahane@us.panasonic.com'),
-                    ('Juan Carlos', 'Gutierrez', 'jclopez@lopesolutions.com'),
-                    ('Marijose', 'Betant', 'marijosebetant@gmail.com'),
-                    ('Natalia', 'Mercker', 'natalia.mercker@cfcdiamonds.com'),
-                    ('Pedro', 'Pimenta', 'ppimenta@abanca.com'),
-                    ('Priscila', 'Pasqualin', 'pripasq@yahoo.com.br'),
-                    ('Quinci', 'Martin', 'quincimartin3@gmail.com'),
-                    ('Raed', 'Alsufyani', 'ralsufyani@moc.gov.sa'),
-                    ('Rafael', 'Bittar', 'rafael.bittar@gmail.com'),
-                    ('Runi', 'Mehta', 'mehta.runi@gmail.com'),
-                    ('Sam', 'Mangrum', 'sam.mangrum@leewardenergy.com'),
-                    ('Saud', 'Alfaadhel', 's.alfaadhel@misk.org.sa'),
-                    ('Tommy', 'Hoey', 'tdhoy@grundfos.com'),
-                    ('Yousuf', 'Rashid', 'yusuf.s.zaabi@pdo.co.om')
-                ]
-                
-                for first_name, last_name, email in alumni_data:
-                    alumni = Alumni(
-                        first_name=first_name,
-                        last_name=last_name,
-                        email=email,
-                        is_active=True
-                    )
-                    db.session.add(alumni)
-                
-                db.session.commit()
-                print(f'✅ Loaded {len(alumni_data)} alumni records')
-                
+            with bootstrap_lock():
+                seed_database()
+            return True
         except Exception as e:
             print(f'❌ Database initialization error: {str(e)}')
+            return False
 
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -134,6 +505,11 @@ class User(UserMixin, db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     verification_token = db.Column(db.String(100), unique=True)
+    calendar_token = db.Column(db.String(64))  # secret in the user's calendar feed URL, None until requested
+
+    __table_args__ = (
+        db.Index('ix_user_calendar_token', 'calendar_token', unique=True),
+    )
 
 class Alumni(db.Model):
     """Table to store verified C-Suite Pathway alumni information"""
@@ -147,6 +523,13 @@ class Alumni(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Registration verification looks alumni up by email among active rows
+        db.Index('ix_alumni_email_active', 'email', 'is_active'),
+        # Admin listing of active alumni ordered by last name
+        db.Index('ix_alumni_active_last_name', 'is_active', 'last_name'),
+    )
+
 # Alumni verification - List of approved alumni emails
 # In production, this could be stored in environment variables or a separate table
 ALUMNI_EMAILS = {
@@ -179,15 +562,64 @@ ALUMNI_EMAILS = {
     'yusuf.s.zaabi@pdo.co.om'
 }
 
+def normalize_email(email):
+    """Canonical form used for every alumni email comparison"""
+    return email.strip().lower()
+
+class AlumniIndex:
+    """
+    Precomputed, normalized allowlist of C-Suite Pathway alumni.
+    Merges ALUMNI_EMAILS with the active rows of the Alumni table so lookups are a
+    single hash probe. Each lookup reads the 'alumni' collection version (one primary key
+    probe), so a change committed by any process rebuilds the index; it is also rebuilt
+    at least every ttl seconds.
+    """
+
+    def __init__(self, static_emails, ttl=300):
+        self.static_emails = frozenset(normalize_email(email) for email in static_emails)
+        self.ttl = ttl
+        self._loaded_at = None
+        # (collection version, all approved emails, {email: (first_name, last_name)} for Alumni table rows)
+        self._state = (None, self.static_emails, {})
+
+    def refresh(self, version=None):
+        """Rebuild the index from the Alumni table"""
+        if version is None:
+            version = collection_version('alumni')
+        rows = db.session.query(Alumni.email, Alumni.first_name, Alumni.last_name).filter_by(is_active=True)
+        records = {normalize_email(email): (first_name, last_name) for email, first_name, last_name in rows}
+        # Swap all structures in one assignment so concurrent readers never see a mix
+        self._state = (version, self.static_emails | records.keys(), records)
+        self._loaded_at = time.monotonic()
+
+    def _current(self):
+        # The version is read before the rows, so a change committed in between rebuilds again next time
+        version = collection_version('alumni')
+        if (self._loaded_at is None or version != self._state[0]
+                or time.monotonic() - self._loaded_at > self.ttl):
+            self.refresh(version)
+        return self._state[1:]
+
+    def is_alumni(self, email):
+        """True if email is on the hardcoded list or an active Alumni row"""
+        emails, _ = self._current()
+        return normalize_email(email) in emails
+
+    def record(self, email):
+        """(first_name, last_name) of the active Alumni row for email, or None"""
+        _, records = self._current()
+        return records.get(normalize_email(email))
+
+    def verify_many(self, emails):
+        """Check many emails in one call, returning {email: is_alumni}"""
+        approved, _ = self._current()
+        return {email: normalize_email(email) in approved for email in emails}
+
+alumni_index = AlumniIndex(ALUMNI_EMAILS, ttl=app.config['ALUMNI_INDEX_TTL'])
+
 def is_alumni_email(email):
     """Check if email belongs to a verified C-Suite Pathway alumni"""
-    # First check the hardcoded list
-    if email.lower() in {email.lower() for email in ALUMNI_EMAILS}:
-        return True
-    
-    # Then check the Alumni table
-    alumni = Alumni.query.filter_by(email=email.lower(), is_active=True).first()
-    return alumni is not None
+    return alumni_index.is_alumni(email)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -223,21 +655,417 @@ def format_file_size(size_bytes):
         i += 1
     return f"{size_bytes:.1f}{size_names[i]}"
 
+LOADER_OPTIONS = {
+    'joined': joinedload,
+    'selectin': selectinload,
+    'lazy': lazyload,
+}
+
+def with_relationship_loading(query, relationship):
+    """Apply the configured loading strategy for relationship (e.g. UserMessage.author) to query"""
+    name = f"{relationship.class_.__name__}.{relationship.key}"
+    strategy = app.config['RELATIONSHIP_LOADING'].get(name, 'lazy')
+    if strategy not in LOADER_OPTIONS:
+        raise ValueError(f"Unknown loading strategy '{strategy}' for {name}")
+    return query.options(LOADER_OPTIONS[strategy](relationship))
+
+class QueryBudgetExceeded(Exception):
+    """Raised in testing mode when a request issues more SQL queries than its budget"""
+
+def use_primary(view):
+    """Decorator for GET views that write, or must not see data the replica has not caught up on"""
+    view.primary_only = True
+    return view
+
+def long_lived(view):
+    """Decorator for views that hold the request open on purpose (kept out of the slow-request log)"""
+    view.long_lived = True
+    return view
+
+@app.before_request
+def route_reads_to_replica():
+    if not app.config['DATABASE_REPLICA_URL']:
+        return
+    view = app.view_functions.get(request.endpoint)
+    db.session.info['read_replica'] = (
+        request.method in ('GET', 'HEAD')
+        and not getattr(view, 'primary_only', False)
+        and session.get('read_primary_until', 0) < time.time()
+        and replica_monitor.available()
+    )
+
+@event.listens_for(db.session, 'after_commit')
+def stick_to_primary_after_write(db_session):
+    # The replica may not have this commit yet when the browser follows the redirect
+    if app.config['DATABASE_REPLICA_URL'] and has_request_context() and db_session.info.get('wrote'):
+        session['read_primary_until'] = time.time() + app.config['REPLICA_STICKY_SECONDS']
+
+@event.listens_for(Engine, 'handle_error')
+def replica_connection_failed(exception_context):
+    if (app.config['DATABASE_REPLICA_URL'] and exception_context.is_disconnect
+            and exception_context.engine is db.engines.get('replica')):
+        replica_monitor.mark_down(exception_context.original_exception)
+
+def query_budget(max_queries):
+    """Decorator overriding QUERY_BUDGET for a single view"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def count_request_queries(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+@app.before_request
+def reset_query_count():
+    g.query_count = 0
+
+@app.after_request
+def enforce_query_budget(response):
+    view = app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None) or app.config['QUERY_BUDGET']
+    count = g.get('query_count', 0)
+    if budget and count > budget:
+        message = f"{request.endpoint} issued {count} queries (budget {budget})"
+        if app.testing:
+            raise QueryBudgetExceeded(message)
+        app.logger.warning(message)
+    return response
+
+@event.listens_for(Engine, 'begin')
+def set_transaction_statement_timeout(conn):
+    # Behind PgBouncer the timeout cannot be a startup option; SET LOCAL ends with the transaction
+    timeout = app.config['DB_STATEMENT_TIMEOUT_MS']
+    if timeout and app.config['DB_PGBOUNCER'] and conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+request_metrics = RequestMetrics()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if app.config['METRICS_ENABLED']:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    endpoint = None
+    if has_request_context():
+        endpoint = request.endpoint
+        g.db_time = g.get('db_time', 0.0) + elapsed
+    threshold = app.config['SLOW_QUERY_MS']
+    if threshold and elapsed * 1000 >= threshold:
+        request_metrics.slow_queries.inc((endpoint or 'background',))
+        app.logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) in {endpoint or 'background'}: "
+                           f"{' '.join(statement.split())[:1000]}")
+
+@event.listens_for(Engine, 'handle_error')
+def forget_failed_query(exception_context):
+    # after_cursor_execute never fires for a statement that raised
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    if app.config['METRICS_ENABLED'] and has_request_context():
+        g.setdefault('template_started', []).append(time.perf_counter())
+
+@template_rendered.connect_via(app)
+def record_template_time(sender, template, context, **extra):
+    if has_request_context() and g.get('template_started'):
+        g.template_time = g.get('template_time', 0.0) + time.perf_counter() - g.template_started.pop()
+
+@app.before_request
+def start_request_timer():
+    if app.config['METRICS_ENABLED']:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    duration = time.perf_counter() - started
+    # Unrouted paths share one label, so scanners cannot grow the metrics without bound
+    endpoint = request.endpoint or 'unmatched'
+    queries = g.get('query_count', 0)
+    db_time = g.get('db_time', 0.0)
+    template_time = g.get('template_time', 0.0)
+    request_metrics.observe_request(endpoint, request.method, response.status_code, duration,
+                                    queries, db_time, template_time, response.content_length or 0)
+    threshold = app.config['SLOW_REQUEST_MS']
+    if getattr(app.view_functions.get(request.endpoint), 'long_lived', False):
+        threshold = 0
+    if threshold and duration * 1000 >= threshold:
+        request_metrics.slow_requests.inc((endpoint,))
+        app.logger.warning(f"Slow request ({duration * 1000:.0f} ms) {request.method} {request.full_path} "
+                           f"-> {response.status_code}: {queries} queries in {db_time * 1000:.0f} ms, "
+                           f"templates {template_time * 1000:.0f} ms")
+    return response
+
+response_compressor = ResponseCompressor(
+    algorithms=[name.strip() for name in app.config['COMPRESSION_ALGORITHMS'] if name.strip()],
+    min_size=app.config['COMPRESSION_MIN_SIZE'],
+    mimetypes=[mimetype.strip() for mimetype in app.config['COMPRESSION_MIMETYPES'] if mimetype.strip()],
+    gzip_level=app.config['COMPRESSION_GZIP_LEVEL'],
+    brotli_quality=app.config['COMPRESSION_BROTLI_QUALITY']
+)
+
+# Registered after record_request_metrics, so it runs first and the metrics see the bytes on the wire
+@app.after_request
+def compress_response(response):
+    if app.config['COMPRESSION_ENABLED']:
+        response = response_compressor.process(request.accept_encodings, response)
+    return response
+
+def upload_path(*parts):
+    """Absolute path inside UPLOAD_FOLDER, where uploads are staged before they reach storage"""
+    return os.path.join(app.root_path, app.config['UPLOAD_FOLDER'], *parts)
+
+def stream_to_temp_file(stream):
+    """
+    Copy an upload stream to a temporary file in fixed-size chunks, hashing it as it is written.
+    Returns (temp_path, sha256 hex digest, size in bytes).
+    """
+    os.makedirs(upload_path('tmp'), exist_ok=True)
+    temp_path = upload_path('tmp', uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    size = 0
+    with open(temp_path, 'wb') as f:
+        while True:
+            chunk = stream.read(app.config['UPLOAD_CHUNK_SIZE'])
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return temp_path, digest.hexdigest(), size
+
+@functools.lru_cache(maxsize=1024)
+def content_etag(path, mtime_ns, size):
+    """sha256 of a file without a Blob row, recomputed only when its mtime or size change"""
+    return hash_file(path)
+
+def hash_file(path):
+    """sha256 hex digest of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(app.config['UPLOAD_CHUNK_SIZE']), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def lock_blob_key(connection, key):
+    """
+    Hold a lock on one stored file until the transaction ends, so an upload that relies on
+    the file and a delete of the file never interleave. PostgreSQL takes an advisory lock;
+    on SQLite any write holds the database lock until commit.
+    """
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {'key': key})
+    else:
+        connection.execute(update(Blob).where(Blob.file_path == key).values(ref_count=Blob.ref_count))
+
+def delete_unreferenced_files(keys):
+    """
+    Remove a blob's stored files (file key first, then its preview) if no Blob row uses the
+    file any more. The check and the delete run under the file's lock, so an upload of the
+    same content that recreated the blob in the meantime keeps its bytes.
+    """
+    if not keys:
+        return
+    with db.engine.begin() as connection:
+        lock_blob_key(connection, keys[0])
+        if connection.scalar(select(Blob.id).where(Blob.file_path == keys[0])) is None:
+            for key in keys:
+                storage.delete(key)
+
+def acquire_blob(temp_path, sha256, size, extension):
+    """
+    Move a hashed temporary file into the content-addressed store and take a reference on its Blob.
+    When identical content is already stored the temporary file is simply discarded.
+    """
+    key = f"{sha256}.{extension}"
+    # Held until commit: a delete of the last reference cannot remove the file under us
+    lock_blob_key(db.session.connection(), key)
+    add_reference = update(Blob).where(Blob.file_path == key).values(ref_count=Blob.ref_count + 1)
+
+    if db.session.execute(add_reference).rowcount == 0:
+        try:
+            with db.session.begin_nested():
+                db.session.add(Blob(
+                    sha256=sha256, file_path=key, size=size, ref_count=1,
+                    preview_status='pending' if extension in PREVIEW_TYPES else None
+                ))
+        except IntegrityError:
+            # A concurrent upload of the same content created the blob first
+            db.session.execute(add_reference)
+
+    # Keep the bytes if they are missing from storage (e.g. an upload folder lost on redeploy)
+    if storage.exists(key):
+        os.remove(temp_path)
+    else:
+        storage.save(key, temp_path)
+        # Removed again if the transaction rolls back (see remove_rolled_back_blob_files)
+        db.session.info.setdefault('saved_blob_keys', []).append(key)
+    return db.session.scalar(select(Blob).where(Blob.file_path == key))
+
+# Both also fire when a savepoint is released or rolled back; only the outer transaction counts
+@event.listens_for(db.session, 'after_commit')
+def keep_committed_blob_files(session):
+    if not session.in_nested_transaction():
+        session.info.pop('saved_blob_keys', None)
+
+@event.listens_for(db.session, 'after_rollback')
+def remove_rolled_back_blob_files(session):
+    if not session.in_nested_transaction():
+        for key in session.info.pop('saved_blob_keys', ()):
+            delete_unreferenced_files([key])
+
+def release_blob(blob_id):
+    """
+    Drop one reference to a Blob. Returns the storage keys (file and preview) to remove once
+    the transaction commits if that was the last reference, otherwise an empty list.
+    """
+    keys = db.session.execute(select(Blob.file_path, Blob.preview_key).where(Blob.id == blob_id)).first()
+    db.session.execute(update(Blob).where(Blob.id == blob_id).values(ref_count=Blob.ref_count - 1))
+    deleted = db.session.execute(delete(Blob).where(Blob.id == blob_id, Blob.ref_count <= 0)).rowcount
+    return [key for key in keys if key] if deleted and keys else []
+
+def create_resource(title, description, file_name, temp_path, sha256, size):
+    """Store an uploaded file and add its Resource row to the session (the caller commits)"""
+    file_extension = file_name.rsplit('.', 1)[1].lower()
+    blob = acquire_blob(temp_path, sha256, size, file_extension)
+    new_resource = Resource(
+        title=title,
+        description=description,
+        file_path=blob.file_path,
+        file_name=file_name,
+        file_size=size,
+        file_type=file_extension,
+        uploaded_by=current_user.id,
+        blob_id=blob.id
+    )
+    db.session.add(new_resource)
+    return new_resource
+
+def message_fragment(message):
+    """Plain-data copy of a message for the dashboard cache (safe to share across sessions)"""
+    return {
+        'id': message.id,
+        'title': message.title,
+        'content': message.content,
+        'message_type': message.message_type,
+        'created_at': message.created_at,
+        'author': {
+            'first_name': message.author.first_name,
+            'last_name': message.author.last_name,
+        },
+    }
+
+def event_fragment(event):
+    """Plain-data copy of an event for the dashboard cache"""
+    return {
+        'id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'date': event.date,
+        'location': event.location,
+    }
+
+KeysetPage = namedtuple('KeysetPage', ['items', 'next_cursor', 'prev_cursor'])
+
+def encode_cursor(sort_value, row_id):
+    """Encode a (sort value, id) position as an opaque URL-safe cursor"""
+    raw = f"{sort_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, returning None if it is invalid"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def paginate_keyset(query, sort_column, id_column, descending=True, per_page=None, start=None):
+    """
+    Return one page of query ordered by (sort_column, id_column).
+    Reads the ?after= / ?before= cursors from the request and seeks to them with a
+    WHERE clause instead of OFFSET, so every page costs the same as the first one.
+    Without a cursor the page starts at the first row at or past the (sort value, id)
+    position `start`, if given, and the rows before it are reached with Previous.
+    """
+    per_page = per_page or app.config['PAGE_SIZE']
+    after = decode_cursor(request.args.get('after'))
+    before = None if after else decode_cursor(request.args.get('before'))
+    forward = before is None
+    cursor = after or before
+
+    # Walking backwards scans in the opposite direction and flips the rows afterwards
+    scan_desc = descending == forward
+    has_earlier = False
+    if cursor:
+        sort_value, row_id = cursor
+        if scan_desc:
+            query = query.filter(or_(sort_column < sort_value,
+                                     and_(sort_column == sort_value, id_column < row_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value,
+                                     and_(sort_column == sort_value, id_column > row_id)))
+    elif start:
+        sort_value, row_id = start
+        if descending:
+            earlier = or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > row_id))
+        else:
+            earlier = or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id))
+        has_earlier = query.filter(earlier).with_entities(id_column).limit(1).first() is not None
+        query = query.filter(~earlier)
+
+    if scan_desc:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    has_next = has_more if forward else cursor is not None
+    has_prev = (cursor is not None or has_earlier) if forward else has_more
+
+    def cursor_for(row):
+        return encode_cursor(getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    next_cursor = cursor_for(rows[-1]) if rows and has_next else None
+    prev_cursor = cursor_for(rows[0]) if rows and has_prev else None
+    if has_earlier and not rows:
+        prev_cursor = encode_cursor(*start)  # nothing at or past start, but there are rows before it
+    return KeysetPage(rows, next_cursor, prev_cursor)
+
 def verify_alumni_registration(first_name, last_name, email):
     """Verify that the registration matches a verified C-Suite Pathway alumni"""
-    # Check the Alumni table for exact match
-    alumni = Alumni.query.filter_by(
-        email=email.lower(), 
-        is_active=True
-    ).first()
+    # Look the email up in the precomputed alumni index
+    alumni = alumni_index.record(email)
     
     if not alumni:
         return False, "Email not found in alumni database"
     
     # Check if names match (case-insensitive)
-    if (alumni.first_name.lower() != first_name.lower() or 
-        alumni.last_name.lower() != last_name.lower()):
-        return False, f"Name does not match alumni record. Expected: {alumni.first_name} {alumni.last_name}"
+    alumni_first_name, alumni_last_name = alumni
+    if (alumni_first_name.lower() != first_name.lower() or 
+        alumni_last_name.lower() != last_name.lower()):
+        return False, f"Name does not match alumni record. Expected: {alumni_first_name} {alumni_last_name}"
     
     return True, "Verification successful"
 
@@ -250,6 +1078,13 @@ class UserMessage(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     author = db.relationship('User', backref='messages')
 
+    __table_args__ = (
+        # Dashboard: latest messages of one type
+        db.Index('ix_user_message_type_created', 'message_type', 'created_at'),
+        # Messages page: keyset pagination on (created_at, id)
+        db.Index('ix_user_message_created_id', 'created_at', 'id'),
+    )
+
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -258,6 +1093,32 @@ class Event(db.Model):
     location = db.Column(db.String(200))
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Upcoming events and calendar keyset pagination on (date, id)
+        db.Index('ix_event_date_id', 'date', 'id'),
+    )
+
+class Blob(db.Model):
+    """Content-addressed upload, shared by every Resource with the same bytes and extension"""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False)
+    file_path = db.Column(db.String(500), unique=True, nullable=False)  # <sha256>.<extension>
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Preview image, None for file types without one
+    preview_status = db.Column(db.String(20))  # pending, processing, ready, failed
+    preview_key = db.Column(db.String(500))  # <file_path>.preview.jpg
+    preview_attempts = db.Column(db.Integer, default=0)
+    preview_claimed_at = db.Column(db.DateTime)
+    preview_error = db.Column(db.Text)
+
+    __table_args__ = (
+        # The thumbnail worker polls for pending previews
+        db.Index('ix_blob_preview_status', 'preview_status'),
+    )
 
 class Resource(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -269,7 +1130,15 @@ class Resource(db.Model):
     file_type = db.Column(db.String(50))  # MIME type
     uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    blob_id = db.Column(db.Integer, db.ForeignKey('blob.id'))  # None for uploads made before deduplication
     uploader = db.relationship('User', backref='uploaded_resources')
+    blob = db.relationship('Blob')
+
+    __table_args__ = (
+        db.Index('ix_resource_created_id', 'created_at', 'id'),
+        # Downloads look the resource up by its stored file name
+        db.Index('ix_resource_file_path', 'file_path'),
+    )
 
 class FAQ(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -278,12 +1147,411 @@ class FAQ(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_faq_created_id', 'created_at', 'id'),
+    )
+
+class OutboundEmail(db.Model):
+    """Durable outbox row for an email waiting to be sent by the mail worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # The worker polls for due pending rows
+        db.Index('ix_outbound_email_status_next', 'status', 'next_attempt_at'),
+    )
+
+class CollectionVersion(db.Model):
+    """Write counter of the rows behind a list page, bumped in the same transaction as the change"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class EventChange(db.Model):
+    """
+    Calendar sync log: one row per insert, update or delete of an Event, written in the same
+    transaction. A sync token is the id of the last row a client has seen. Rows older than
+    CALENDAR_SYNC_RETENTION_DAYS are pruned, except the newest of them, which marks how far
+    back the log is complete.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False)  # no foreign key: deleted events keep their rows
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_event_change_changed_at', 'changed_at'),
+    )
+
+def ensure_columns():
+    """
+    Add nullable model columns missing from existing tables with ALTER TABLE ... ADD COLUMN.
+    Returns the names of added columns as table.column.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.quote(table.name)} ADD COLUMN {preparer.quote(column.name)} {column_type}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def ensure_indexes():
+    """
+    Create any model index missing from the existing database.
+    Safe to run repeatedly on SQLite and PostgreSQL; returns the names of created indexes.
+    """
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    return created
+
+# Full-text search: FAQs, messages and resources are indexed as they are inserted,
+# updated or deleted, inside the same transaction as the change itself
+SEARCHABLE_MODELS = {
+    FAQ: ('faq', lambda faq: (faq.question, faq.answer)),
+    UserMessage: ('message', lambda message: (message.title, message.content)),
+    Resource: ('resource', lambda resource: (
+        resource.title, f"{resource.description or ''} {resource.file_name or ''}"
+    )),
+}
+
+def search_document(model, target):
+    """(kind, doc_id, title, body, created_at) of a model instance or table row"""
+    kind, document = SEARCHABLE_MODELS[model]
+    title, body = document(target)
+    return kind, target.id, title, body, target.created_at
+
+def ensure_search_index():
+    """
+    Create the search index if it is missing and fill it from the existing rows when it is empty
+    (first deploy, or a database copied by migrate_db.py). Returns the number of documents indexed.
+    """
+    indexed = 0
+    with db.engine.begin() as connection:
+        index = search_index_for(connection.dialect.name)
+        index.create(connection)
+        if not index.is_empty(connection):
+            return 0
+        for model in SEARCHABLE_MODELS:
+            # Plain rows read on the same connection, so the writes never wait on another reader
+            rows = connection.execution_options(yield_per=1000).execute(select(model.__table__))
+            for partition in rows.partitions():
+                index.add_many(connection, [search_document(model, row) for row in partition])
+                indexed += len(partition)
+    return indexed
+
+def rebuild_search_index():
+    """Drop every indexed document and index all rows again"""
+    with db.engine.begin() as connection:
+        search_index_for(connection.dialect.name).clear(connection)
+    return ensure_search_index()
+
+@event.listens_for(FAQ, 'after_insert')
+@event.listens_for(FAQ, 'after_update')
+@event.listens_for(UserMessage, 'after_insert')
+@event.listens_for(UserMessage, 'after_update')
+@event.listens_for(Resource, 'after_insert')
+@event.listens_for(Resource, 'after_update')
+def searchable_saved(mapper, connection, target):
+    search_index_for(connection.dialect.name).upsert(connection, *search_document(mapper.class_, target))
+
+@event.listens_for(FAQ, 'after_delete')
+@event.listens_for(UserMessage, 'after_delete')
+@event.listens_for(Resource, 'after_delete')
+def searchable_deleted(mapper, connection, target):
+    kind, _ = SEARCHABLE_MODELS[mapper.class_]
+    search_index_for(connection.dialect.name).remove(connection, kind, target.id)
+
+# Conditional list pages: every page's rows (including the author names it shows) belong
+# to a collection whose version is bumped by each flush that inserts, updates or deletes them.
+# 'alumni' tells every worker's AlumniIndex that the allowlist changed
+VERSIONED_COLLECTIONS = {
+    'messages': (UserMessage, User),
+    'calendar': (Event,),
+    'faq': (FAQ,),
+    'resources': (Resource, Blob, User),
+    'alumni': (Alumni,),
+}
+
+def ensure_collection_versions():
+    """Create the version row of every collection that does not have one yet"""
+    existing = set(db.session.scalars(select(CollectionVersion.name)))
+    for name in VERSIONED_COLLECTIONS:
+        if name not in existing:
+            db.session.add(CollectionVersion(name=name))
+    db.session.commit()
+
+def collection_version(name):
+    return db.session.scalar(select(CollectionVersion.version).where(CollectionVersion.name == name))
+
+def increment_collection_versions(connection, names):
+    """
+    Bump the named collections in the caller's transaction. Flushed ORM changes do this
+    automatically; writes made with Core statements (bulk imports) call it themselves.
+    """
+    # Sorted, so concurrent writers lock the rows in the same order
+    connection.execute(
+        update(CollectionVersion)
+        .where(CollectionVersion.name.in_(sorted(names)))
+        .values(version=CollectionVersion.version + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+@event.listens_for(db.session, 'after_flush')
+def bump_collection_versions(session, flush_context):
+    changed = list(session.new) + list(session.deleted)
+    changed += [obj for obj in session.dirty if session.is_modified(obj)]
+    names = {name for name, models in VERSIONED_COLLECTIONS.items()
+             for obj in changed if isinstance(obj, models)}
+    if names:
+        increment_collection_versions(session.connection(), names)
+
+@event.listens_for(db.session, 'after_flush')
+def record_event_changes(session, flush_context):
+    changed = [obj for obj in list(session.new) + list(session.deleted) if isinstance(obj, Event)]
+    changed += [obj for obj in session.dirty if isinstance(obj, Event) and session.is_modified(obj)]
+    if changed:
+        now = datetime.utcnow()
+        connection = session.connection()
+        connection.execute(insert(EventChange), [
+            {'event_id': obj.id, 'changed_at': now} for obj in changed
+        ])
+        retention = app.config['CALENDAR_SYNC_RETENTION_DAYS']
+        if retention:
+            # Keep the newest expired row: tokens before it may have missed pruned changes
+            expired = EventChange.changed_at < now - timedelta(days=retention)
+            newest_expired = select(func.max(EventChange.id)).where(expired).scalar_subquery()
+            connection.execute(delete(EventChange).where(expired, EventChange.id < newest_expired))
+
+# Live feed: macros of _feed_items.html each kind of row is rendered with, one per list showing it
+LIVE_FEED_VARIANTS = {
+    'message': ('message_item', 'dashboard_message', 'dashboard_message_card'),
+    'event': ('event_card', 'dashboard_event'),
+}
+
+def live_payload(kind, fragment):
+    """What clients receive for a new row: its markup for every list it belongs in"""
+    sort_value = fragment['created_at'] if kind == 'message' else fragment['date']
+    payload = {
+        'kind': kind,
+        'id': fragment['id'],
+        'sort': sort_value.isoformat(),
+        'html': {variant: str(get_template_attribute('_feed_items.html', variant)(fragment))
+                 for variant in LIVE_FEED_VARIANTS[kind]},
+    }
+    if kind == 'message':
+        payload['type'] = fragment['message_type']
+    return payload
+
+# The live feed's queries run in their own app context (their own session), so they also work
+# from the poller thread and give their connection back as soon as they are done
+
+def newest_live_ids():
+    """(newest message id, newest event id) in one statement of two index lookups"""
+    return tuple(db.session.execute(select(
+        select(func.coalesce(func.max(UserMessage.id), 0)).scalar_subquery(),
+        select(func.coalesce(func.max(Event.id), 0)).scalar_subquery()
+    )).one())
+
+def load_live_cursor():
+    with app.app_context():
+        return newest_live_ids()
+
+def live_collections_version():
+    with app.app_context():
+        return db.session.execute(
+            select(CollectionVersion.name, CollectionVersion.version)
+            .where(CollectionVersion.name.in_(('messages', 'calendar')))
+            .order_by(CollectionVersion.name)
+        ).all()
+
+def fetch_live_items(cursor, limit):
+    with app.app_context():
+        # Newest first so a long absence returns the latest rows, then back in id order
+        messages = (with_relationship_loading(UserMessage.query, UserMessage.author)
+                    .filter(UserMessage.id > cursor[0]).order_by(UserMessage.id.desc()).limit(limit).all())
+        events = Event.query.filter(Event.id > cursor[1]).order_by(Event.id.desc()).limit(limit).all()
+        return ([('message', message.id, live_payload('message', message_fragment(message)))
+                 for message in reversed(messages)] +
+                [('event', event.id, live_payload('event', event_fragment(event))) for event in reversed(events)])
+
+live_feed = LiveFeed(
+    load_live_cursor, live_collections_version, fetch_live_items,
+    poll_interval=app.config['LIVE_POLL_INTERVAL'],
+    max_waiters=app.config['LIVE_MAX_WAITERS'],
+    logger=app.logger
+)
+
+@event.listens_for(db.session, 'after_flush')
+def note_live_feed_rows(session, flush_context):
+    if any(isinstance(obj, (UserMessage, Event)) for obj in session.new):
+        session.info['live_feed_rows'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def wake_live_feed(session):
+    # Listeners in this process see the new rows now; other processes at their next poll
+    if session.info.pop('live_feed_rows', False):
+        live_feed.notify()
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_live_feed_rows(session):
+    session.info.pop('live_feed_rows', None)
+
+@functools.lru_cache(maxsize=1)
+def templates_version():
+    """Digest of every template, so a deploy that changes the markup never gets a 304"""
+    digest = hashlib.sha256()
+    template_root = os.path.join(app.root_path, app.template_folder)
+    for root, dirs, files in os.walk(template_root):
+        dirs.sort()
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+def conditional_list_page(*collections, window_start=None, viewer_state=None):
+    """
+    Decorator giving a list view an ETag and Last-Modified taken from its collections' versions.
+    A client whose copy is current gets a 304 before the view runs its queries or renders.
+    window_start is a callable returning when the page last changed regardless of the data
+    (e.g. midnight for a page that starts at today's rows); viewer_state returns anything
+    else about the current user that only this page shows.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # A pending flash message is part of the page, so it must render
+            if not app.config['LIST_PAGE_ETAGS'] or session.get('_flashes'):
+                return view(*args, **kwargs)
+            versions = db.session.execute(
+                select(CollectionVersion.name, CollectionVersion.version, CollectionVersion.updated_at)
+                .where(CollectionVersion.name.in_(collections))
+            ).all()
+            if len(versions) < len(collections):
+                return view(*args, **kwargs)
+
+            # Same page in the same format, same data, same viewer (the navbar shows their name
+            # and admins see extra buttons), same templates and same asset URLs
+            viewer = (current_user.id, current_user.first_name, current_user.last_name, current_user.is_admin,
+                      viewer_state() if viewer_state else None)
+            moved_at = window_start() if window_start else None
+            state = json.dumps([sorted((name, version) for name, version, _ in versions),
+                                request.full_path, request.headers.get('Accept', ''), viewer,
+                                templates_version(), asset_manifest.version, moved_at and moved_at.isoformat()])
+            etag = hashlib.sha256(state.encode()).hexdigest()[:32]
+            changed = [updated_at for _, _, updated_at in versions] + ([moved_at] if moved_at else [])
+            last_modified = max(changed).replace(microsecond=0)
+
+            if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = make_response(view(*args, **kwargs))
+            else:
+                response = app.response_class(status=304)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            # Revalidate every time, and never reuse one user's copy for another session
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
+
+def highlight_snippet(snippet):
+    """Escape a search snippet and turn its match markers into <mark> tags"""
+    escaped = str(escape(snippet or ''))
+    return Markup(escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+# Secrets stay out of the identity cache, which the redis backend keeps in a shared store.
+# They are left unloaded and read from the database on first access
+USER_CACHE_EXCLUDED_COLUMNS = frozenset({'password_hash', 'verification_token', 'calendar_token'})
+
+def user_cache_key(user_id):
+    return f"user:{int(user_id)}"
+
+def invalidate_user(user_id):
+    """Drop a cached session identity, e.g. after is_verified/is_admin changed"""
+    user_cache.invalidate(user_cache_key(user_id))
+
+@event.listens_for(User, 'after_update')
+def user_updated(mapper, connection, target):
+    # Invalidate now and again after commit, so a concurrent request cannot
+    # re-cache the pre-commit row for a whole TTL
+    invalidate_user(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('updated_user_ids', set()).add(target.id)
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_committed_users(session):
+    for user_id in session.info.pop('updated_user_ids', ()):
+        invalidate_user(user_id)
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_rolled_back_users(session):
+    session.info.pop('updated_user_ids', None)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    """
+    Load the session user from the identity cache.
+    The cache holds plain column values (without USER_CACHE_EXCLUDED_COLUMNS); they are
+    attached to the request's session with merge(load=False), which does not emit a SELECT.
+    """
+    def fetch():
+        user = db.session.get(User, int(user_id))
+        if user is None:
+            return None
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns
+                if column.key not in USER_CACHE_EXCLUDED_COLUMNS}
+
+    data = user_cache.get_or_set(user_cache_key(user_id), fetch)
+    if data is None:
+        return None
+
+    user = User(**data)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+@app.cli.command('search-index')
+@click.option('--rebuild', is_flag=True, help='Re-index every document instead of only filling an empty index')
+def search_index_command(rebuild):
+    """Create the full-text search index and fill it from existing rows"""
+    indexed = rebuild_search_index() if rebuild else ensure_search_index()
+    print(f'🔎 Indexed {indexed} documents')
 
-# Initialize database when app starts (after all models are defined)
-init_database()
+@app.cli.command('bootstrap')
+def bootstrap_command():
+    """Create tables and indexes and load seed data (run once per deploy)"""
+    if not bootstrap_database():
+        raise SystemExit(1)
 
 # Routes
 @app.route('/')
@@ -292,14 +1560,70 @@ def index():
         return redirect(url_for('dashboard'))
     return render_template('index.html')
 
+@app.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    """
+    A fingerprinted static file, cached for a year without revalidation (its name changes with
+    its content). Clients that accept brotli or gzip get the precompressed sibling.
+    """
+    # Only the fingerprinted files themselves; earlier builds' files stay servable
+    if filename == MANIFEST_NAME or filename.endswith(('.gz', '.br', '.tmp')):
+        abort(404)
+    folder = os.path.dirname(asset_manifest.path)
+    source = safe_join(folder, filename)
+    if source is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[candidate] and os.path.isfile(source + suffix):
+            encoding = candidate
+            filename += suffix
+            break
+
+    response = send_from_directory(folder, filename, mimetype=mimetype, max_age=365 * 24 * 3600)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def pool_stats(pool):
+    """Checkout counters of this worker's connection pool"""
+    stats = {'pool': type(pool).__name__, 'worker_pid': os.getpid()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+        stats['saturated'] = stats['idle'] == 0 and stats['checked_out'] >= stats['size'] + stats['max_overflow']
+    return stats
+
 @app.route('/health')
 def health_check():
+    """Database reachability and latency plus this worker's pool usage, for load balancer probes"""
+    stats = pool_stats(db.engine.pool)
+    if stats.get('saturated'):
+        # Every connection is in use: queueing for one would only add to the pile-up. The
+        # worker is busy, not broken, so do not fail the probe.
+        return {'status': 'degraded', 'database': 'pool exhausted', 'pool': stats}, 200
     try:
-        # Test database connection
-        db.session.execute('SELECT 1')
-        return {'status': 'healthy', 'database': 'connected'}, 200
+        started = time.perf_counter()
+        # A connection of its own, returned as soon as the ping is done
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        latency_ms = (time.perf_counter() - started) * 1000
+        health = {'status': 'healthy', 'database': 'connected', 'latency_ms': round(latency_ms, 2),
+                  'pool': pool_stats(db.engine.pool)}
+        if app.config['DATABASE_REPLICA_URL']:
+            health['replica'] = dict(replica_monitor.status(), pool=pool_stats(db.engines['replica'].pool))
+        return health, 200
     except Exception as e:
-        return {'status': 'unhealthy', 'error': str(e)}, 500
+        return {'status': 'unhealthy', 'error': str(e), 'pool': stats}, 500
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -361,9 +1685,8 @@ def register():
             )
             
             db.session.add(new_user)
-            db.session.commit()
             
-            # Send verification email
+            # Queue verification email (committed together with the user)
             email_sent = send_verification_email(new_user)
             
             if email_sent:
@@ -381,6 +1704,7 @@ def register():
     return render_template('register.html')
 
 @app.route('/verify/<token>')
+@use_primary
 def verify_email(token):
     user = User.query.filter_by(verification_token=token).first()
     if user:
@@ -395,10 +1719,22 @@ def verify_email(token):
 
 @app.route('/dashboard')
 @login_required
+@query_budget(6)
 def dashboard():
-    admin_messages = UserMessage.query.filter_by(message_type='admin').order_by(UserMessage.created_at.desc()).limit(5).all()
-    classmate_messages = UserMessage.query.filter_by(message_type='classmate').order_by(UserMessage.created_at.desc()).limit(10).all()
-    upcoming_events = Event.query.filter(Event.date >= datetime.utcnow()).order_by(Event.date).limit(5).all()
+    # Fragments only change when add_message/add_event commit, which invalidate them
+    messages_query = with_relationship_loading(UserMessage.query, UserMessage.author)
+    admin_messages = fragment_cache.get_or_set('dashboard:admin_messages', lambda: [
+        message_fragment(message) for message in
+        messages_query.filter_by(message_type='admin').order_by(UserMessage.created_at.desc()).limit(5)
+    ])
+    classmate_messages = fragment_cache.get_or_set('dashboard:classmate_messages', lambda: [
+        message_fragment(message) for message in
+        messages_query.filter_by(message_type='classmate').order_by(UserMessage.created_at.desc()).limit(10)
+    ])
+    upcoming_events = fragment_cache.get_or_set('dashboard:upcoming_events', lambda: [
+        event_fragment(event) for event in
+        Event.query.filter(Event.date >= datetime.utcnow()).order_by(Event.date).limit(5)
+    ])
     
     return render_template('dashboard.html', 
                          admin_messages=admin_messages,
@@ -407,9 +1743,12 @@ def dashboard():
 
 @app.route('/messages')
 @login_required
+@query_budget(4)
+@conditional_list_page('messages')
 def messages():
-    messages = UserMessage.query.order_by(UserMessage.created_at.desc()).all()
-    return render_template('messages.html', messages=messages)
+    query = with_relationship_loading(UserMessage.query, UserMessage.author)
+    page = paginate_keyset(query, UserMessage.created_at, UserMessage.id)
+    return render_template('messages.html', messages=page.items, page=page)
 
 @app.route('/add_message', methods=['GET', 'POST'])
 @login_required
@@ -428,17 +1767,32 @@ def add_message():
         
         db.session.add(new_message)
         db.session.commit()
+        fragment_cache.invalidate('dashboard:admin_messages', 'dashboard:classmate_messages')
         
         flash('Message posted successfully!')
         return redirect(url_for('messages'))
     
     return render_template('add_message.html')
 
+def start_of_today():
+    """Midnight (UTC) at the start of the current day"""
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+def calendar_token_digest():
+    """Stands in for the user's calendar feed token in ETags, so the secret never becomes a cache key"""
+    token = current_user.calendar_token
+    return hashlib.sha256(token.encode()).hexdigest() if token else None
+
 @app.route('/calendar')
 @login_required
+@conditional_list_page('calendar', window_start=start_of_today, viewer_state=calendar_token_digest)
 def calendar():
-    events = Event.query.order_by(Event.date).all()
-    return render_template('calendar.html', events=events)
+    """Events in date order, starting at today's; Previous pages back through past events"""
+    page = paginate_keyset(Event.query, Event.date, Event.id, descending=False, start=(start_of_today(), 0))
+    # The only page that reads the token, which the identity cache leaves out
+    token = current_user.calendar_token
+    feed_url = url_for('calendar_feed', token=token, _external=True) if token else None
+    return render_template('calendar.html', events=page.items, page=page, feed_url=feed_url)
 
 @app.route('/add_event', methods=['GET', 'POST'])
 @login_required
@@ -461,21 +1815,118 @@ def add_event():
         
         db.session.add(new_event)
         db.session.commit()
+        fragment_cache.invalidate('dashboard:upcoming_events')
         
         flash('Event added successfully!')
         return redirect(url_for('calendar'))
     
     return render_template('add_event.html')
 
+LIVE_HEARTBEAT_SECONDS = 20  # comment line sent while idle, so proxies keep the stream open
+LIVE_BACKFILL_LIMIT = 50  # newest rows of each kind sent to a client that was away for long
+
+def live_backlog(cursor):
+    """Items after a client's cursor: from this process's buffer when it can tell, else one query"""
+    items = live_feed.items_after(cursor)
+    if items is None:
+        items = live_feed.backfill(cursor, LIVE_BACKFILL_LIMIT)
+    return items
+
+def hold_live_request():
+    """
+    A waiter slot for this request, or None if it must answer right away: a sync worker serves one
+    request at a time, so holding it open would block everyone else.
+    """
+    if not request.environ.get('wsgi.multithread'):
+        return None
+    return live_feed.try_hold()
+
+@app.route('/live/stream')
+@login_required
+def live_stream():
+    """
+    Server-Sent Events of new messages and events. Each event id is a cursor, so a reconnecting
+    EventSource resumes where it left off with Last-Event-ID. The body is streamed after the
+    request's database session has been closed.
+    """
+    if not app.config['LIVE_FEED_ENABLED']:
+        abort(404)
+    cursor = decode_live_cursor(request.headers.get('Last-Event-ID') or request.args.get('cursor'))
+    backlog = live_backlog(cursor) if cursor else []
+    cursor = cursor or newest_live_ids()
+    release = hold_live_request()
+    lifetime = app.config['LIVE_STREAM_SECONDS']
+    # Reconnect quickly after a stream ends, or poll slowly when streams cannot be held here
+    retry_seconds = 1 if release else app.config['LIVE_RETRY_SECONDS']
+
+    def events():
+        position = cursor
+        yield f'retry: {retry_seconds * 1000}\n\n'
+        for item in backlog:
+            yield live_event(item)
+            position = item.cursor
+        if not release:
+            return
+        deadline = time.monotonic() + lifetime
+        while time.monotonic() < deadline:
+            items = live_feed.wait(position, min(LIVE_HEARTBEAT_SECONDS, deadline - time.monotonic()))
+            for item in items:
+                yield live_event(item)
+                position = item.cursor
+            if not items:
+                yield ': keepalive\n\n'
+
+    # The slot is given back when the server closes the response, also if the client went away
+    response = app.response_class(ClosingIterator(events(), [release] if release else None),
+                                  mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: pass each event on as it is written
+    return response
+
+def live_event(item):
+    return f'id: {encode_live_cursor(item.cursor)}\nevent: new-{item.kind}\ndata: {json.dumps(item.payload)}\n\n'
+
+@app.route('/live/poll')
+@login_required
+@long_lived
+def live_poll():
+    """Long-poll fallback: the items after ?cursor=, waiting up to LIVE_LONG_POLL_SECONDS for some"""
+    if not app.config['LIVE_FEED_ENABLED']:
+        abort(404)
+    cursor = decode_live_cursor(request.args.get('cursor'))
+    items = live_backlog(cursor) if cursor else []
+    cursor = cursor or newest_live_ids()
+    retry_after = 0
+    if not items:
+        release = hold_live_request()
+        if release:
+            db.session.close()  # wait without a database connection
+            try:
+                items = live_feed.wait(cursor, app.config['LIVE_LONG_POLL_SECONDS'])
+            finally:
+                release()
+        else:
+            retry_after = app.config['LIVE_RETRY_SECONDS']
+    if items:
+        cursor = items[-1].cursor
+
+    response = make_response({'cursor': encode_live_cursor(cursor), 'items': [item.payload for item in items],
+                              'retry_after': retry_after})
+    response.cache_control.no_store = True
+    return response
+
 @app.route('/resources')
 @login_required
+@query_budget(4)
+@conditional_list_page('resources')
 def resources():
     try:
-        resources = Resource.query.order_by(Resource.created_at.desc()).all()
-        return render_template('resources.html', resources=resources)
+        query = with_relationship_loading(Resource.query, Resource.uploader).options(joinedload(Resource.blob))
+        page = paginate_keyset(query, Resource.created_at, Resource.id)
+        return render_template('resources.html', resources=page.items, page=page)
     except Exception as e:
         # If there's a database schema issue, show empty resources
-        print(f"Database error in resources: {str(e)}")
+        app.logger.exception(f"Database error in resources: {str(e)}")
         flash('Resources temporarily unavailable. Please try again later.')
         return render_template('resources.html', resources=[])
 
@@ -499,33 +1950,17 @@ def add_resource():
                 return render_template('add_resource.html')
             
             if file and allowed_file(file.filename):
-                # Create upload directory if it doesn't exist
-                os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+                # Stream to disk in fixed-size chunks, hashing as we go
+                temp_path, sha256, file_size = stream_to_temp_file(file.stream)
                 
-                # Generate unique filename
-                file_extension = file.filename.rsplit('.', 1)[1].lower()
-                unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                
-                # Save file
-                file.save(file_path)
-                
-                # Get file size
-                file_size = os.path.getsize(file_path)
-                
-                # Create resource record
-                new_resource = Resource(
-                    title=title,
-                    description=description,
-                    file_path=unique_filename,
-                    file_name=file.filename,
-                    file_size=file_size,
-                    file_type=file_extension,
-                    uploaded_by=current_user.id
-                )
-                
-                db.session.add(new_resource)
-                db.session.commit()
+                # Identical files share one stored blob
+                try:
+                    create_resource(title, description, file.filename, temp_path, sha256, file_size)
+                    db.session.commit()
+                    thumbnail_worker_wakeup.set()
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
                 
                 flash('Resource uploaded successfully!')
                 return redirect(url_for('resources'))
@@ -533,21 +1968,120 @@ def add_resource():
                 flash('File type not allowed. Please upload a valid file.')
                 return render_template('add_resource.html')
         except Exception as e:
-            print(f"Error uploading resource: {str(e)}")
+            db.session.rollback()  # also removes a file stored for the failed transaction
+            app.logger.exception(f"Error uploading resource: {str(e)}")
             flash('Error uploading resource. Please try again.')
             return render_template('add_resource.html')
     
     return render_template('add_resource.html')
 
-@app.route('/download/<filename>')
+def resource_download_url(resource):
+    """Download URL of a resource; with a blob, ?v= pins the content so browsers may cache it for good"""
+    return versioned_download_url(resource.id, resource.blob.sha256 if resource.blob else None)
+
+def versioned_download_url(resource_id, sha256=None):
+    # The same URL from a resource's id and blob hash alone (the read API selects just those)
+    if sha256:
+        return url_for('download_file', resource_id=resource_id, v=sha256[:12])
+    return url_for('download_file', resource_id=resource_id)
+
+@app.route('/download/<int:resource_id>')
 @login_required
-def download_file(filename):
-    """Download a file from the uploads folder"""
-    try:
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
-    except FileNotFoundError:
+def download_file(resource_id):
+    """
+    Download a stored resource file under the resource's own file name.
+    Deduplicated resources share one stored file, so the file is always found through the
+    resource row. Sends a strong content-derived ETag and answers If-None-Match /
+    If-Modified-Since with 304 and Range requests with 206. With DOWNLOAD_OFFLOAD set, local
+    files are streamed by the front proxy; remote files redirect to a presigned URL of the object store.
+    """
+    resource = db.session.get(Resource, resource_id, options=[joinedload(Resource.blob)])
+    if resource is None or not resource.file_path:
         flash('File not found.')
         return redirect(url_for('resources'))
+    try:
+        file_path = storage.local_path(resource.file_path)
+    except ValueError:
+        abort(404)
+    
+    download_name = resource.file_name or resource.file_path
+    if resource.blob:
+        etag = resource.blob.sha256
+        # A URL carrying the content hash never changes content, even if the id is reused
+        immutable = request.args.get('v') == resource.blob.sha256[:12]
+    elif file_path:
+        stat = os.stat(file_path)
+        etag = content_etag(file_path, stat.st_mtime_ns, stat.st_size)
+        immutable = False
+    else:
+        etag = False
+        immutable = False
+    
+    if file_path:
+        response = local_file_response(file_path, download_name, etag)
+    else:
+        response = remote_file_response(resource, download_name, etag)
+        if response is None:
+            flash('File not found.')
+            return redirect(url_for('resources'))
+        if response.status_code in (301, 302, 303, 307, 308):
+            return response
+    
+    # Downloads require login, so only the browser may cache them
+    response.cache_control.public = None
+    response.cache_control.private = True
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = 365 * 24 * 3600
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+def local_file_response(file_path, download_name, etag):
+    """Conditional/range response for a file on this machine, optionally offloaded to the proxy"""
+    offload_to_nginx = app.config['DOWNLOAD_OFFLOAD'] == 'x-accel-redirect'
+    response = send_file(
+        file_path,
+        as_attachment=True,
+        download_name=download_name,
+        etag=etag,
+        conditional=not offload_to_nginx
+    )
+    
+    if offload_to_nginx:
+        # Keep the headers, hand the body (and Range handling) to nginx
+        response.close()
+        response.response = []
+        response.headers.pop('Content-Length', None)
+        relative_path = os.path.relpath(file_path, storage.root).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = app.config['X_ACCEL_REDIRECT_PREFIX'] + relative_path
+        response = response.make_conditional(request)
+    return response
+
+def remote_file_response(resource, download_name, etag):
+    """Redirect to a presigned URL, or stream the object through the app; None if it is missing"""
+    if app.config['STORAGE_DOWNLOAD_URL_TTL']:
+        url = storage.download_url(resource.file_path, download_name, app.config['STORAGE_DOWNLOAD_URL_TTL'])
+        if url:
+            return redirect(url)
+    
+    try:
+        body = storage.open(resource.file_path)
+    except FileNotFoundError:
+        return None
+    response = send_file(
+        body,
+        mimetype=mimetypes.guess_type(download_name)[0] or 'application/octet-stream',
+        as_attachment=True,
+        download_name=download_name,
+        etag=etag,
+        last_modified=resource.created_at,
+        conditional=False
+    )
+    # The object store does not tell send_file the size, but the resource row does
+    response.content_length = resource.file_size
+    return response.make_conditional(request, accept_ranges=True, complete_length=resource.file_size)
 
 @app.route('/delete_resource/<int:resource_id>', methods=['POST'])
 @login_required
@@ -561,27 +2095,194 @@ def delete_resource(resource_id):
         return redirect(url_for('resources'))
     
     try:
-        # Delete file from filesystem
-        if resource.file_path:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], resource.file_path)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        # Shared blobs are only removed with their last reference
+        if resource.blob_id:
+            orphaned_keys = release_blob(resource.blob_id)
+        else:
+            orphaned_keys = [resource.file_path] if resource.file_path else []
         
         # Delete from database
         db.session.delete(resource)
         db.session.commit()
         
+        # Delete files from storage once the rows are gone, unless a new upload reused them
+        delete_unreferenced_files(orphaned_keys)
+        
         flash('Resource deleted successfully!')
     except Exception as e:
+        db.session.rollback()
         flash(f'Error deleting resource: {str(e)}')
     
     return redirect(url_for('resources'))
 
+@app.route('/preview/<filename>')
+@login_required
+def resource_preview(filename):
+    """Thumbnail of a resource; the name is derived from the content hash, so it never changes"""
+    blob = Blob.query.filter_by(preview_key=filename, preview_status='ready').first_or_404()
+    try:
+        file_path = storage.local_path(filename)
+        body = file_path or storage.open(filename)
+    except (ValueError, FileNotFoundError):
+        abort(404)
+    
+    response = send_file(body, mimetype='image/jpeg', etag=f'{blob.sha256}-preview',
+                         last_modified=blob.created_at, conditional=True)
+    response.cache_control.public = None
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    response.cache_control.immutable = True
+    return response
+
+# Resumable chunked uploads for large files
+def chunked_upload_paths(upload_id):
+    """(.part data file, .json metadata file) of an upload, 404 for malformed ids"""
+    if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+        abort(404)
+    base = upload_path('partial', upload_id)
+    return base + '.part', base + '.json'
+
+def remove_abandoned_uploads():
+    """Delete resumable uploads untouched for CHUNKED_UPLOAD_TTL seconds; returns how many"""
+    folder = upload_path('partial')
+    if not os.path.isdir(folder):
+        return 0
+    # An upload is as old as the newer of its two files (.part grows with every chunk)
+    touched = {}
+    for entry in os.scandir(folder):
+        try:
+            mtime = entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        upload_id = os.path.splitext(entry.name)[0]
+        touched[upload_id] = max(touched.get(upload_id, 0), mtime)
+    
+    cutoff = time.time() - app.config['CHUNKED_UPLOAD_TTL']
+    removed = 0
+    for upload_id, mtime in touched.items():
+        if mtime >= cutoff:
+            continue
+        for extension in ('.part', '.json'):
+            try:
+                os.remove(os.path.join(folder, upload_id + extension))
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+def load_chunked_upload(upload_id):
+    """Metadata of an upload owned by the current user, or 404"""
+    part_path, meta_path = chunked_upload_paths(upload_id)
+    if not os.path.exists(meta_path):
+        abort(404)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['user_id'] != current_user.id:
+        abort(404)
+    return part_path, meta_path, meta
+
+@app.route('/uploads', methods=['POST'])
+@login_required
+def start_chunked_upload():
+    """Start a resumable upload from {"file_name": ..., "size": ...}"""
+    data = request.get_json(silent=True) or request.form
+    file_name = secure_filename(data.get('file_name', ''))
+    try:
+        size = int(data.get('size', 0))
+    except (TypeError, ValueError):
+        size = 0
+    
+    if not allowed_file(file_name):
+        return {'error': 'File type not allowed.'}, 400
+    if size <= 0 or size > app.config['MAX_CONTENT_LENGTH']:
+        return {'error': f"Size must be between 1 and {app.config['MAX_CONTENT_LENGTH']} bytes."}, 413
+    
+    # Starting an upload is the natural time to clear out the ones clients gave up on
+    remove_abandoned_uploads()
+    
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = chunked_upload_paths(upload_id)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    open(part_path, 'wb').close()
+    with open(meta_path, 'w') as f:
+        json.dump({'user_id': current_user.id, 'file_name': file_name, 'size': size}, f)
+    
+    return {
+        'upload_id': upload_id,
+        'offset': 0,
+        'chunk_size': app.config['CHUNKED_UPLOAD_CHUNK_SIZE'],
+        'upload_url': url_for('upload_chunk', upload_id=upload_id),
+    }, 201
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+@login_required
+def chunked_upload_status(upload_id):
+    """Bytes received so far, so a client can resume after an interruption"""
+    part_path, _, meta = load_chunked_upload(upload_id)
+    return {'offset': os.path.getsize(part_path), 'size': meta['size']}
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """Append the request body at the offset given by Content-Range: bytes <start>-<end>/<total>"""
+    part_path, _, meta = load_chunked_upload(upload_id)
+    content_range = re.match(r'bytes (\d+)-\d+/\d+', request.headers.get('Content-Range', ''))
+    
+    with open(part_path, 'ab') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        offset = f.seek(0, os.SEEK_END)
+        start = int(content_range.group(1)) if content_range else offset
+        if start != offset:
+            return {'error': 'Chunk does not start at the current offset.', 'offset': offset}, 409
+        
+        remaining = meta['size'] - offset
+        written = 0
+        while True:
+            chunk = request.stream.read(app.config['UPLOAD_CHUNK_SIZE'])
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > remaining:
+                f.truncate(offset)
+                return {'error': 'Upload is larger than its declared size.', 'offset': offset}, 413
+            f.write(chunk)
+    
+    return {'offset': offset + written, 'size': meta['size']}
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_chunked_upload(upload_id):
+    """Turn a fully received upload into a Resource"""
+    part_path, meta_path, meta = load_chunked_upload(upload_id)
+    data = request.get_json(silent=True) or request.form
+    title = data.get('title', '').strip()
+    if not title:
+        return {'error': 'A title is required.'}, 400
+    
+    size = os.path.getsize(part_path)
+    if size != meta['size']:
+        return {'error': 'Upload is incomplete.', 'offset': size}, 409
+    
+    sha256 = hash_file(part_path)
+    try:
+        resource = create_resource(title, data.get('description', ''), meta['file_name'], part_path, sha256, size)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()  # also removes a file stored for the failed transaction
+        raise
+    thumbnail_worker_wakeup.set()
+    os.remove(meta_path)
+    
+    return {'resource_id': resource.id, 'sha256': sha256, 'size': size}, 201
+
 @app.route('/faq')
 @login_required
+@conditional_list_page('faq')
 def faq():
-    faqs = FAQ.query.order_by(FAQ.created_at.desc()).all()
-    return render_template('faq.html', faqs=faqs)
+    page = paginate_keyset(FAQ.query, FAQ.created_at, FAQ.id)
+    return render_template('faq.html', faqs=page.items, page=page)
 
 @app.route('/add_faq', methods=['GET', 'POST'])
 @login_required
@@ -604,6 +2305,324 @@ def add_faq():
     
     return render_template('add_faq.html')
 
+@app.route('/search')
+@login_required
+@query_budget(8)  # SQLite: a match count, up to two ranking reads, then snippets for one page
+def search():
+    """Ranked full-text search over FAQs, messages and resources (?q=...&type=faq&page=2)"""
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('type') if request.args.get('type') in SEARCH_KINDS else None
+    page_number = max(request.args.get('page', 1, type=int), 1)
+    per_page = app.config['PAGE_SIZE']
+    
+    hits = []
+    if query:
+        connection = db.session.connection()
+        # One extra row tells whether there is a next page
+        hits = search_index_for(connection.dialect.name).search(
+            connection, query,
+            kinds=[kind] if kind else None,
+            limit=per_page + 1,
+            offset=(page_number - 1) * per_page,
+            window=app.config['SEARCH_RANK_WINDOW']
+        )
+    
+    return render_template('search.html',
+                           query=query,
+                           kind=kind,
+                           kinds=SEARCH_KINDS,
+                           hits=hits[:per_page],
+                           page_number=page_number,
+                           has_next=len(hits) > per_page)
+
+# Read API: the fields each collection exposes. ?fields= picks a subset, and only their
+# columns are selected (author and uploader names are joined only when asked for)
+API_SCHEMAS = {
+    'messages': Schema(UserMessage, [
+        Field('id', UserMessage.id),
+        Field('title', UserMessage.title),
+        Field('content', UserMessage.content),
+        Field('message_type', UserMessage.message_type),
+        Field('created_at', UserMessage.created_at),
+        Field('author_id', UserMessage.author_id),
+        Field('author_name', User.first_name + ' ' + User.last_name, UserMessage.author),
+    ], UserMessage.created_at, UserMessage.id),
+    'events': Schema(Event, [
+        Field('id', Event.id),
+        Field('title', Event.title),
+        Field('description', Event.description),
+        Field('date', Event.date),
+        Field('location', Event.location),
+        Field('created_by', Event.created_by),
+        Field('created_at', Event.created_at),
+        Field('updated_at', Event.updated_at),
+    ], Event.date, Event.id, descending=False),
+    'resources': Schema(Resource, [
+        Field('id', Resource.id),
+        Field('title', Resource.title),
+        Field('description', Resource.description),
+        Field('file_name', Resource.file_name),
+        Field('file_size', Resource.file_size),
+        Field('file_type', Resource.file_type),
+        Field('download_url', (Resource.id, Blob.sha256), Resource.blob, versioned_download_url),
+        Field('created_at', Resource.created_at),
+        Field('uploaded_by', Resource.uploaded_by),
+        Field('uploader_name', User.first_name + ' ' + User.last_name, Resource.uploader),
+    ], Resource.created_at, Resource.id),
+    'faqs': Schema(FAQ, [
+        Field('id', FAQ.id),
+        Field('question', FAQ.question),
+        Field('answer', FAQ.answer),
+        Field('created_by', FAQ.created_by),
+        Field('created_at', FAQ.created_at),
+    ], FAQ.created_at, FAQ.id),
+}
+
+def api_response(payload, status=200, mimetype=None):
+    mimetype = mimetype or g.get('api_mimetype') or JSON_MIMETYPE
+    response = app.response_class(api_dumps(payload, mimetype), status=status, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+def api_error(status, message):
+    # Errors are always JSON, even for clients that asked for MessagePack only
+    return api_response({'error': message}, status, JSON_MIMETYPE)
+
+def api_format(view):
+    """Decorator choosing the response format from Accept (a 406 when the client accepts none)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.api_mimetype = negotiate_api_format(request.accept_mimetypes)
+        if g.api_mimetype is None:
+            return api_error(406, 'Supported formats: application/json, application/msgpack')
+        return view(*args, **kwargs)
+    return wrapper
+
+def api_view(view):
+    """Decorator for read API views: a session login and a format the client accepts, else an error"""
+    negotiated = api_format(view)
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return api_error(401, 'Login required')
+        return negotiated(*args, **kwargs)
+    return wrapper
+
+def api_list(schema):
+    """
+    One keyset page of a collection: ?fields=a,b selects fields, ?limit= sets the page size,
+    ?after= / ?before= take the next_cursor / prev_cursor of an earlier page, and ?layout=rows
+    sends the field names once and every item as an array.
+    """
+    try:
+        names = schema.parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return api_error(400, str(e))
+    layout = request.args.get('layout', 'objects')
+    if layout not in API_LAYOUTS:
+        return api_error(400, f"Unknown layout '{layout}'. Available: {', '.join(API_LAYOUTS)}")
+    limit = min(max(request.args.get('limit', app.config['PAGE_SIZE'], type=int), 1), app.config['API_MAX_PAGE_SIZE'])
+
+    page = paginate_keyset(schema.query(db.session, names), schema.sort_column, schema.id_column,
+                           descending=schema.descending, per_page=limit)
+    payload = {'data': schema.encode_rows(page.items, names, layout),
+               'next_cursor': page.next_cursor,
+               'prev_cursor': page.prev_cursor}
+    if layout == 'rows':
+        payload = {'fields': names, **payload}
+    return api_response(payload)
+
+def api_item(schema, item_id):
+    """One item of a collection by id (?fields= as for the list)"""
+    try:
+        names = schema.parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return api_error(400, str(e))
+    row = schema.query(db.session, names).filter(schema.id_column == item_id).first()
+    if row is None:
+        return api_error(404, 'Not found')
+    return api_response({'data': schema.encode_rows([row], names)[0]})
+
+@app.route('/api/v1/messages')
+@api_view
+@query_budget(3)
+@conditional_list_page('messages')
+def api_messages():
+    return api_list(API_SCHEMAS['messages'])
+
+@app.route('/api/v1/messages/<int:item_id>')
+@api_view
+@query_budget(3)
+@conditional_list_page('messages')
+def api_message(item_id):
+    return api_item(API_SCHEMAS['messages'], item_id)
+
+@app.route('/api/v1/events')
+@api_view
+@query_budget(3)
+@conditional_list_page('calendar')
+def api_events():
+    return api_list(API_SCHEMAS['events'])
+
+@app.route('/api/v1/events/<int:item_id>')
+@api_view
+@query_budget(3)
+@conditional_list_page('calendar')
+def api_event(item_id):
+    return api_item(API_SCHEMAS['events'], item_id)
+
+@app.route('/api/v1/resources')
+@api_view
+@query_budget(3)
+@conditional_list_page('resources')
+def api_resources():
+    return api_list(API_SCHEMAS['resources'])
+
+@app.route('/api/v1/resources/<int:item_id>')
+@api_view
+@query_budget(3)
+@conditional_list_page('resources')
+def api_resource(item_id):
+    return api_item(API_SCHEMAS['resources'], item_id)
+
+@app.route('/api/v1/faqs')
+@api_view
+@query_budget(3)
+@conditional_list_page('faq')
+def api_faqs():
+    return api_list(API_SCHEMAS['faqs'])
+
+@app.route('/api/v1/faqs/<int:item_id>')
+@api_view
+@query_budget(3)
+@conditional_list_page('faq')
+def api_faq(item_id):
+    return api_item(API_SCHEMAS['faqs'], item_id)
+
+# Calendar subscriptions. A user's feed URL carries their calendar_token instead of a session,
+# since calendar clients cannot log in. /calendar/<token>/sync lets clients that keep their own
+# copy fetch only the events created, changed or deleted since their last sync token.
+CALENDAR_FEED_CACHE_TTL = 3600  # rendered feeds are keyed by the calendar version, so never stale
+# Sync tokens stay before changes younger than this. On PostgreSQL a change can commit after one
+# with a higher id; it is then still sent, because the client asks again from before it.
+EVENT_SYNC_SETTLE_SECONDS = 60
+
+def calendar_feed_user(token):
+    """Id of the user a calendar feed token belongs to, or None"""
+    return db.session.scalar(select(User.id).where(User.calendar_token == token))
+
+def calendar_feed_cutoff():
+    """Start of the day CALENDAR_FEED_PAST_DAYS ago, or None when the feed has every event"""
+    days = app.config['CALENDAR_FEED_PAST_DAYS']
+    if not days:
+        return None
+    return start_of_today() - timedelta(days=days)
+
+def calendar_feed_events(cutoff):
+    """FeedEvent tuples in date order, selected as plain columns"""
+    query = select(Event.id, Event.title, Event.description, Event.date, Event.location,
+                   func.coalesce(Event.updated_at, Event.created_at, Event.date))
+    if cutoff:
+        query = query.where(Event.date >= cutoff)
+    return [FeedEvent(*row) for row in db.session.execute(query.order_by(Event.date, Event.id))]
+
+@app.route('/calendar/subscription', methods=['POST'])
+@login_required
+def calendar_subscription():
+    """Create the user's calendar feed URL, or replace it so the old one stops working"""
+    replaced = current_user.calendar_token is not None
+    current_user.calendar_token = secrets.token_urlsafe(32)
+    db.session.commit()
+    if replaced:
+        flash('Your calendar link has been replaced. Calendars subscribed with the old link will stop updating.')
+    else:
+        flash('Your calendar link is ready. Add it to your calendar app to subscribe.')
+    return redirect(url_for('calendar'))
+
+@app.route('/calendar/<token>.ics')
+@query_budget(3)
+def calendar_feed(token):
+    """The events as an iCalendar feed, with a strong ETag so polling clients get 304s"""
+    if calendar_feed_user(token) is None:
+        abort(404)
+    version = collection_version('calendar')
+    cutoff = calendar_feed_cutoff()
+    # Every user's feed has the same events, so the rendered bytes are shared
+    state = json.dumps([version, cutoff and cutoff.isoformat(), app.config['CALENDAR_FEED_REFRESH_MINUTES'],
+                        ICAL_FORMAT_VERSION])
+    etag = hashlib.sha256(state.encode()).hexdigest()[:32]
+
+    if version is not None and not is_resource_modified(request.environ, etag=etag):
+        response = app.response_class(status=304)
+    else:
+        body = fragment_cache.get_or_set(
+            f'calendar:ics:{etag}',
+            lambda: render_calendar(calendar_feed_events(cutoff), 'C-Suite Pathway Program',
+                                    refresh_minutes=app.config['CALENDAR_FEED_REFRESH_MINUTES']),
+            ttl=CALENDAR_FEED_CACHE_TTL
+        )
+        response = app.response_class(body, content_type=ICAL_CONTENT_TYPE)
+    if version is not None:
+        response.set_etag(etag)
+    # The URL is a secret, so shared caches must not keep the feed
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/calendar/<token>/sync')
+@api_format
+@query_budget(4)
+def calendar_sync(token):
+    """
+    Events changed since ?since= (the sync_token of the previous response), with the ids of
+    deleted ones. Without a usable token (none, unknown, or older than the pruned log), every
+    event in the feed's window is sent with full=true, and the client should replace its copy.
+    ?fields= works as in the read API.
+    """
+    if calendar_feed_user(token) is None:
+        return api_error(404, 'Not found')
+    schema = API_SCHEMAS['events']
+    try:
+        names = schema.parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return api_error(400, str(e))
+
+    since = request.args.get('since', type=int)
+    latest, oldest = db.session.execute(select(func.max(EventChange.id), func.min(EventChange.id))).one()
+    latest = latest or 0
+    settled_before = datetime.utcnow() - timedelta(seconds=EVENT_SYNC_SETTLE_SECONDS)
+    if since == latest:
+        return api_response({'sync_token': str(since), 'full': False, 'events': [], 'deleted': []})
+
+    # Changes right after a token older than the log's oldest row may have been pruned
+    expired = since is not None and oldest is not None and since < oldest - 1
+    if since is None or expired or not 0 <= since < latest:
+        # The token is read before the events, so a change committed in between is sent again next time
+        unsettled = db.session.scalar(select(func.min(EventChange.id)).where(EventChange.changed_at > settled_before))
+        sync_token = unsettled - 1 if unsettled else latest
+        query = schema.query(db.session, names)
+        cutoff = calendar_feed_cutoff()
+        if cutoff:
+            query = query.filter(Event.date >= cutoff)
+        rows = query.order_by(Event.date, Event.id).all()
+        return api_response({'sync_token': str(sync_token), 'full': True,
+                             'events': schema.encode_rows(rows, names), 'deleted': []})
+
+    changes = db.session.execute(
+        select(EventChange.id, EventChange.event_id, EventChange.changed_at)
+        .where(EventChange.id > since).order_by(EventChange.id)
+    ).all()
+    unsettled = [change_id for change_id, _, changed_at in changes if changed_at > settled_before]
+    sync_token = unsettled[0] - 1 if unsettled else changes[-1].id if changes else since
+    event_ids = list(dict.fromkeys(event_id for _, event_id, _ in changes))
+    rows = schema.query(db.session, names).filter(Event.id.in_(event_ids)).order_by(Event.date, Event.id).all()
+    # Events in the log that no longer exist were deleted
+    present = {row.id for row in rows}
+    return api_response({'sync_token': str(sync_token), 'full': False,
+                         'events': schema.encode_rows(rows, names),
+                         'deleted': [event_id for event_id in event_ids if event_id not in present]})
+
 @app.route('/logout')
 @login_required
 def logout():
@@ -626,6 +2645,23 @@ def debug_users():
         })
     return {'users': result, 'count': len(result)}
 
+@app.route('/debug/cache')
+def debug_cache():
+    """Fragment cache hit/miss counters for this worker (admins only, or anyone in debug mode)"""
+    if not app.debug and not (current_user.is_authenticated and current_user.is_admin):
+        abort(404)
+    return fragment_cache.stats()
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape target with this worker's request metrics (METRICS_ENABLED=True)"""
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    token = app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return request_metrics.render(), 200, {'Content-Type': RequestMetrics.CONTENT_TYPE}
+
 # Admin routes for managing alumni
 @app.route('/admin/alumni')
 @login_required
@@ -675,37 +2711,300 @@ def add_alumni():
     
     return render_template('add_alumni.html')
 
+def mail_configured():
+    """False while the placeholder Gmail credentials are still in place"""
+    return app.config.get('MAIL_USERNAME') != 'your-email@gmail.com'
+
+def enqueue_email(recipient, subject, html):
+    """Add an email to the outbox; it is sent once the caller's transaction commits"""
+    email = OutboundEmail(recipient=recipient, subject=subject, html=html)
+    db.session.add(email)
+    return email
+
 def send_verification_email(user):
+    """
+    Queue the verification email and commit it together with the user.
+    Returns False when email is not configured and the user was auto-verified instead.
+    """
+    if not mail_configured():
+        # For development, we'll auto-verify the user if email is not set up
+        user.is_verified = True
+        user.verification_token = None
+        db.session.commit()
+        return False
+    
+    verification_url = url_for('verify_email', token=user.verification_token, _external=True)
+    
+    html = f'''
+    <h2>Welcome to C-Suite Pathway Program!</h2>
+    <p>Hi {user.first_name},</p>
+    <p>Thank you for registering for the C-Suite Pathway Program. Please click the button below to verify your email address:</p>
+    <a href="{verification_url}" style="background-color: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Verify Email</a>
+    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+    <p>{verification_url}</p>
+    <p>Best regards,<br>C-Suite Pathway Team</p>
+    '''
+    
+    enqueue_email(user.email, 'Verify Your C-Suite Pathway Account', html)
+    db.session.commit()
+    mail_worker_wakeup.set()
+    return True
+
+def claim_outbox_batch(limit):
+    """
+    Atomically mark up to limit due emails as 'sending' for this worker and return them.
+    Rows stuck in 'sending' (worker died mid-batch) are reclaimed after 10 minutes.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(minutes=10)
+    claimable = or_(
+        and_(OutboundEmail.status == 'pending', OutboundEmail.next_attempt_at <= now),
+        and_(OutboundEmail.status == 'sending', OutboundEmail.claimed_at < stale),
+    )
+    ids = db.session.scalars(
+        select(OutboundEmail.id).where(claimable).order_by(OutboundEmail.next_attempt_at).limit(limit)
+    ).all()
+    if not ids:
+        return []
+    
+    # The conditional UPDATE makes the claim safe against other workers racing for the same rows
+    token = secrets.token_hex(16)
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id.in_(ids), claimable)
+        .values(status='sending', claim_token=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboundEmail.query.filter_by(claim_token=token).all()
+
+def schedule_retry(email, error):
+    """Record a failed attempt and back off exponentially, giving up after MAIL_MAX_ATTEMPTS"""
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    email.claim_token = None
+    if email.attempts >= app.config['MAIL_MAX_ATTEMPTS']:
+        email.status = 'failed'
+        app.logger.error(f'Giving up on email {email.id} to {email.recipient}: {email.last_error}')
+    else:
+        delay = min(app.config['MAIL_RETRY_BASE_SECONDS'] * 2 ** (email.attempts - 1), 3600)
+        email.status = 'pending'
+        email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+def send_outbox_batch(limit=None):
+    """Send one batch of due emails over a single SMTP connection; returns (sent, failed)"""
+    batch = claim_outbox_batch(limit or app.config['MAIL_OUTBOX_BATCH_SIZE'])
+    if not batch:
+        return 0, 0
+    
+    sent = failed = 0
     try:
-        msg = Message(
-            'Verify Your C-Suite Pathway Account',
-            sender=app.config['MAIL_USERNAME'],
-            recipients=[user.email]
-        )
+        with mail.connect() as connection:
+            for email in batch:
+                try:
+                    connection.send(Message(
+                        email.subject,
+                        sender=app.config['MAIL_USERNAME'],
+                        recipients=[email.recipient],
+                        html=email.html
+                    ))
+                    email.status = 'sent'
+                    email.sent_at = datetime.utcnow()
+                    email.claim_token = None
+                    sent += 1
+                except Exception as e:
+                    schedule_retry(email, e)
+                    failed += 1
+    except Exception as e:
+        # Connecting failed or the connection dropped: retry whatever was not sent
+        for email in batch:
+            if email.status == 'sending':
+                schedule_retry(email, e)
+                failed += 1
+    
+    db.session.commit()
+    return sent, failed
+
+mail_worker_wakeup = threading.Event()
+mail_worker_pid = None
+mail_worker_lock = threading.Lock()
+
+def run_mail_worker(stop_event=None):
+    """Send queued email until stop_event is set, sleeping when the outbox is empty"""
+    while not (stop_event and stop_event.is_set()):
+        with app.app_context():
+            try:
+                sent, failed = send_outbox_batch()
+            except Exception as e:
+                app.logger.error(f'Mail worker error: {str(e)}')
+                db.session.rollback()
+                sent = failed = 0
         
-        verification_url = url_for('verify_email', token=user.verification_token, _external=True)
+        # A full batch probably means more is waiting, so only sleep when idle
+        if sent + failed < app.config['MAIL_OUTBOX_BATCH_SIZE']:
+            mail_worker_wakeup.wait(app.config['MAIL_OUTBOX_POLL_INTERVAL'])
+            mail_worker_wakeup.clear()
+
+@app.before_request
+def start_mail_worker():
+    """Start one mail thread per worker process (after gunicorn has forked)"""
+    global mail_worker_pid
+    if mail_worker_pid == os.getpid():
+        return
+    if not app.config['MAIL_OUTBOX_THREAD'] or app.testing or not mail_configured():
+        return
+    with mail_worker_lock:
+        if mail_worker_pid != os.getpid():
+            threading.Thread(target=run_mail_worker, name='mail-worker', daemon=True).start()
+            mail_worker_pid = os.getpid()
+
+@app.cli.command('send-mail')
+@click.option('--once', is_flag=True, help='Send one batch and exit instead of polling forever')
+def send_mail_command(once):
+    """Run the outbound email worker as its own process"""
+    if once:
+        sent, failed = send_outbox_batch()
+        print(f'📧 Sent {sent}, failed {failed}')
+    else:
+        print('📧 Mail worker started, press Ctrl+C to stop')
+        run_mail_worker()
+
+def claim_preview():
+    """
+    Atomically mark one pending preview (or one stuck in 'processing' for 10 minutes) as
+    'processing' for this worker and return its Blob, or None when there is nothing to do.
+    A preview that just failed waits a minute before it is retried.
+    """
+    now = datetime.utcnow()
+    claimable = or_(
+        and_(Blob.preview_status == 'pending',
+             or_(Blob.preview_claimed_at.is_(None), Blob.preview_claimed_at < now - timedelta(minutes=1))),
+        and_(Blob.preview_status == 'processing', Blob.preview_claimed_at < now - timedelta(minutes=10)),
+    )
+    blob_id = db.session.scalar(select(Blob.id).where(claimable).order_by(Blob.id).limit(1))
+    if blob_id is None:
+        return None
+    
+    claimed = db.session.execute(
+        update(Blob)
+        .where(Blob.id == blob_id, claimable)
+        .values(preview_status='processing', preview_claimed_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return db.session.get(Blob, blob_id) if claimed else None
+
+def generate_preview(blob):
+    """Render and store the preview of a claimed Blob, recording success or the failure"""
+    file_type = blob.file_path.rsplit('.', 1)[-1].lower()
+    source_path = storage.local_path(blob.file_path)
+    temp_paths = []
+    try:
+        if source_path is None:
+            # Remote storage: fetch the original into the staging folder first
+            source_path, _, _ = stream_to_temp_file(storage.open(blob.file_path))
+            temp_paths.append(source_path)
         
-        msg.html = f'''
-        <h2>Welcome to C-Suite Pathway Program!</h2>
-        <p>Hi {user.first_name},</p>
-        <p>Thank you for registering for the C-Suite Pathway Program. Please click the button below to verify your email address:</p>
-        <a href="{verification_url}" style="background-color: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Verify Email</a>
-        <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-        <p>{verification_url}</p>
-        <p>Best regards,<br>C-Suite Pathway Team</p>
-        '''
+        preview = render_preview(source_path, file_type, max_size=app.config['THUMBNAIL_SIZE'],
+                                 max_pixels=app.config['THUMBNAIL_MAX_PIXELS'])
+        preview_path = upload_path('tmp', uuid.uuid4().hex)
+        temp_paths.append(preview_path)
+        with open(preview_path, 'wb') as f:
+            f.write(preview)
         
-        mail.send(msg)
-        return True
+        preview_key = f'{blob.file_path}.preview.jpg'
+        storage.save(preview_key, preview_path)
+        blob.preview_key = preview_key
+        blob.preview_status = 'ready'
+        blob.preview_error = None
     except Exception as e:
-        print(f"Email sending failed: {str(e)}")
-        # For development, we'll auto-verify the user if email fails
-        if app.config.get('MAIL_USERNAME') == 'your-email@gmail.com':
-            user.is_verified = True
-            user.verification_token = None
-            db.session.commit()
-            return False
-        return False
+        blob.preview_attempts = (blob.preview_attempts or 0) + 1
+        blob.preview_error = str(e)[:1000]
+        retry = not isinstance(e, PreviewUnavailable) and blob.preview_attempts < app.config['THUMBNAIL_MAX_ATTEMPTS']
+        blob.preview_status = 'pending' if retry else 'failed'
+        app.logger.warning(f'Preview of {blob.file_path} failed: {blob.preview_error}')
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    db.session.commit()
+    return blob.preview_status == 'ready'
+
+def generate_pending_previews(limit=None):
+    """Render previews until none are pending (or limit were tried); returns (ready, failed)"""
+    ready = failed = 0
+    while limit is None or ready + failed < limit:
+        blob = claim_preview()
+        if blob is None:
+            break
+        if generate_preview(blob):
+            ready += 1
+        else:
+            failed += 1
+    return ready, failed
+
+thumbnail_worker_wakeup = threading.Event()
+thumbnail_worker_pid = None
+thumbnail_worker_lock = threading.Lock()
+
+def run_thumbnail_worker(stop_event=None):
+    """Render queued previews until stop_event is set, sleeping when none are pending"""
+    while not (stop_event and stop_event.is_set()):
+        with app.app_context():
+            try:
+                generate_pending_previews()
+            except Exception as e:
+                app.logger.error(f'Thumbnail worker error: {str(e)}')
+                db.session.rollback()
+        
+        thumbnail_worker_wakeup.wait(app.config['THUMBNAIL_POLL_INTERVAL'])
+        thumbnail_worker_wakeup.clear()
+
+@app.before_request
+def start_thumbnail_worker():
+    """Start one thumbnail thread per worker process (after gunicorn has forked)"""
+    global thumbnail_worker_pid
+    if thumbnail_worker_pid == os.getpid():
+        return
+    if not app.config['THUMBNAIL_THREAD'] or app.testing:
+        return
+    with thumbnail_worker_lock:
+        if thumbnail_worker_pid != os.getpid():
+            threading.Thread(target=run_thumbnail_worker, name='thumbnail-worker', daemon=True).start()
+            thumbnail_worker_pid = os.getpid()
+
+@app.cli.command('thumbnails')
+@click.option('--once', is_flag=True, help='Render what is pending and exit instead of polling forever')
+@click.option('--backfill', is_flag=True, help='Queue previews for files uploaded before previews existed')
+def thumbnails_command(once, backfill):
+    """Run the preview worker as its own process"""
+    if backfill:
+        previewable = or_(*(Blob.file_path.like(f'%.{file_type}') for file_type in PREVIEW_TYPES))
+        queued = db.session.execute(
+            update(Blob).where(Blob.preview_status.is_(None), previewable).values(preview_status='pending')
+        ).rowcount
+        db.session.commit()
+        print(f'🖼️  Queued {queued} previews')
+    if once:
+        ready, failed = generate_pending_previews()
+        print(f'🖼️  Rendered {ready}, failed {failed}')
+    else:
+        print('🖼️  Thumbnail worker started, press Ctrl+C to stop')
+        run_thumbnail_worker()
+
+@app.cli.command('assets')
+def assets_command():
+    """Fingerprint, optimize and precompress static assets (run once per deploy, before starting workers)"""
+    output_folder = os.path.join(app.root_path, app.config['ASSETS_FOLDER'])
+    report = build_assets(app.static_folder, output_folder)
+    print(f"{'Asset':<32} {'Source':>10} {'Optimized':>10} {'gzip':>10} {'brotli':>10}  (bytes)")
+    for path, *sizes in report:
+        print(f'{path:<32} ' + ' '.join(f"{'-' if value is None else value:>10}" for value in sizes))
+    if not brotli_available():
+        print('⚠️  brotli is not installed, only gzip variants were written (pip install brotli)')
+    print(f'📦 Built {len(report)} assets into {output_folder}')
 
 if __name__ == '__main__':
+    bootstrap_database()
     app.run(debug=True, port=5001)
@@ -0,0 +1,194 @@
+"""
+Static asset pipeline for C-Suite Pathway Program
+Copies the stylesheets, scripts and images under static/ into static/dist with a content hash
+in each filename, shrinks the logos and writes gzip and brotli siblings of every text asset.
+manifest.json maps each source path to its fingerprinted path. Brotli output requires the
+brotli package (pip install brotli); without it only gzip siblings are written.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+
+# Directories under static/ that are fingerprinted (uploads and the output itself are not)
+SOURCE_DIRS = ('css', 'js', 'images')
+MANIFEST_NAME = 'manifest.json'
+
+# Text formats worth precompressing; PNG/JPEG are already compressed
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.ico'}
+# A compressed sibling that saves less than this is not worth serving
+MIN_SAVING = 0.05
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def brotli_available():
+    return _brotli() is not None
+
+def optimize_svg(data):
+    """SVG without comments, editor metadata and whitespace between tags"""
+    text = data.decode('utf-8')
+    text = re.sub(r'<\?xml[^>]*\?>|<!DOCTYPE[^>]*>|<!--.*?-->', '', text, flags=re.S)
+    text = re.sub(r'<metadata\b.*?</metadata>', '', text, flags=re.S)
+    text = re.sub(r'\sdata-name="[^"]*"', '', text)
+    text = re.sub(r'>\s+<', '><', text)
+    return text.strip().encode('utf-8')
+
+def _exact_palette(image):
+    """A palette image with exactly the pixels of an RGBA image of at most 256 colors, else None"""
+    from PIL import Image
+
+    colors = image.getcolors(256)
+    if colors is None:
+        return None
+    index = {color: i for i, (_, color) in enumerate(colors)}
+    pixels = image.tobytes()
+    palette_image = Image.frombytes('P', image.size, bytes(index[tuple(pixels[i:i + 4])] for i in range(0, len(pixels), 4)))
+    palette_image.putpalette([channel for _, color in colors for channel in color[:3]])
+    palette_image.info['transparency'] = bytes(color[3] for _, color in colors)
+    return palette_image
+
+def optimize_png(data):
+    """
+    The smallest lossless encoding of a PNG: as is, re-encoded with maximum zlib effort, or
+    as an 8-bit palette image when it has few enough colors. Metadata chunks are dropped.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+
+    candidates = [data]
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        palette_image = _exact_palette(image.convert('RGBA'))
+        for candidate in (image, palette_image):
+            if candidate is None:
+                continue
+            output = io.BytesIO()
+            candidate.save(output, 'PNG', optimize=True, transparency=candidate.info.get('transparency'))
+            candidates.append(output.getvalue())
+    return min(candidates, key=len)
+
+OPTIMIZERS = {'.svg': optimize_svg, '.png': optimize_png}
+
+def fingerprinted_name(path, data):
+    """css/style.css -> css/style.<hash>.css"""
+    stem, ext = posixpath.splitext(path)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+def rewrite_css_urls(css, path, manifest):
+    """Point url(...) references to other assets at their fingerprinted names"""
+    directory = posixpath.dirname(path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if re.match(r'^([a-z][a-z0-9+.-]*:|/|#)', url, re.I):
+            return match.group(0)  # data:, absolute and fragment URLs
+        target = re.split(r'[?#]', url, maxsplit=1)[0]
+        suffix = url[len(target):]  # e.g. the #iefix of a font URL
+        resolved = posixpath.normpath(posixpath.join(directory, target))
+        if resolved not in manifest:
+            return match.group(0)
+        relative = posixpath.relpath(manifest[resolved], directory)
+        return f'url({quote}{relative}{suffix}{quote})'
+
+    return CSS_URL.sub(replace, css.decode('utf-8')).encode('utf-8')
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+def _sources(static_folder):
+    for directory in SOURCE_DIRS:
+        root = os.path.join(static_folder, directory)
+        for current, dirs, files in os.walk(root):
+            dirs.sort()
+            for name in sorted(files):
+                full_path = os.path.join(current, name)
+                yield posixpath.join(*os.path.relpath(full_path, static_folder).split(os.sep)), full_path
+
+def build_assets(static_folder, output_folder, gzip_level=9, brotli_quality=11):
+    """
+    Fingerprint, optimize and precompress every asset, then replace the manifest.
+    Files from earlier builds are left in place so pages rendered before a deploy keep working.
+    Returns one (path, source bytes, optimized bytes, gzip bytes, brotli bytes) row per asset;
+    a missing variant is None.
+    """
+    brotli = _brotli()
+    manifest = {}
+    report = []
+
+    # Stylesheets last, so their url() references can be rewritten to already hashed images
+    sources = sorted(_sources(static_folder), key=lambda item: item[0].endswith('.css'))
+    for path, full_path in sources:
+        with open(full_path, 'rb') as f:
+            original = f.read()
+        ext = posixpath.splitext(path)[1].lower()
+        data = OPTIMIZERS.get(ext, lambda data: data)(original)
+        if ext == '.css':
+            data = rewrite_css_urls(data, path, manifest)
+
+        manifest[path] = fingerprinted_name(path, data)
+        target = os.path.join(output_folder, *manifest[path].split('/'))
+        _write(target, data)
+
+        gzip_size = brotli_size = None
+        if ext in COMPRESSIBLE:
+            # mtime=0 keeps the .gz bytes identical between builds of the same file
+            compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+            if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                _write(target + '.gz', compressed)
+                gzip_size = len(compressed)
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=brotli_quality)
+                if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                    _write(target + '.br', compressed)
+                    brotli_size = len(compressed)
+        report.append((path, len(original), len(data), gzip_size, brotli_size))
+
+    _write(os.path.join(output_folder, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return report
+
+class AssetManifest:
+    """Source path -> fingerprinted path, as written by the last build_assets()"""
+
+    def __init__(self, output_folder):
+        self.path = os.path.join(output_folder, MANIFEST_NAME)
+        self._mtime = None
+        self._entries = {}
+        self.version = ''
+        self.reload()
+
+    def reload(self):
+        """Re-read the manifest if the file changed (a missing manifest means no assets were built)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        entries = {}
+        if mtime is not None:
+            with open(self.path, 'rb') as f:
+                entries = json.load(f)
+        self._mtime = mtime
+        self._entries = entries
+        self.version = hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest()[:16] if entries else ''
+
+    def lookup(self, path):
+        """Fingerprinted path of a source asset, or None when it was not built"""
+        return self._entries.get(path)
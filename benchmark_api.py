@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Read API Benchmark Script
+Serializes one page of messages in every format and layout the read API offers, with and
+without a sparse fieldset, next to the ORM approach of /debug/users (load model objects, build
+a dict per row, jsonify). Prints the payload size (plain and gzip) and the time to query and
+to serialize the page.
+
+Usage:
+    python benchmark_api.py
+    python benchmark_api.py --limit 100 --repeat 500
+    python benchmark_api.py --database-url postgresql://localhost/csuite_bench
+
+The target database is seeded and written to, so never point this at production.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark read API payload size and serialization time')
+    parser.add_argument('--limit', type=int, default=100, help='messages per page (default: 100)')
+    parser.add_argument('--repeat', type=int, default=200, help='runs per measurement (default: 200)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+args = parse_args()
+os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['MAIL_OUTBOX_THREAD'] = 'False'
+os.environ['THUMBNAIL_THREAD'] = 'False'
+
+from flask import json as flask_json
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from werkzeug.security import generate_password_hash
+from app import app, db, bootstrap_database, API_SCHEMAS, User, UserMessage
+from api import JSON_MIMETYPE, MSGPACK_MIMETYPE, dumps, msgpack_available
+
+SPARSE_FIELDS = ('id', 'title', 'created_at')
+
+def seed():
+    if User.query.filter_by(email='bench-api@example.com').first():
+        return
+    user = User(first_name='Bench', last_name='User', email='bench-api@example.com',
+                password_hash=generate_password_hash('benchmark-password'), is_verified=True)
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.execute(insert(UserMessage), [
+        {'title': f'Message {i} about the next module', 'content': 'Lorem ipsum dolor sit amet. ' * 10,
+         'author_id': user.id, 'message_type': 'classmate', 'created_at': now - timedelta(minutes=i)}
+        for i in range(max(args.limit, 1000))
+    ])
+    db.session.commit()
+
+def timed(function):
+    """(last result, ms per call)"""
+    function()  # warm up
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        result = function()
+    return result, (time.perf_counter() - started) * 1000 / args.repeat
+
+def orm_page():
+    return (UserMessage.query.options(joinedload(UserMessage.author))
+            .order_by(UserMessage.created_at.desc(), UserMessage.id.desc()).limit(args.limit).all())
+
+def orm_serialize(messages):
+    """Per-row dicts built in Python, as /debug/users does"""
+    result = []
+    for message in messages:
+        result.append({
+            'id': message.id,
+            'title': message.title,
+            'content': message.content,
+            'message_type': message.message_type,
+            'created_at': message.created_at,
+            'author_id': message.author_id,
+            'author_name': f"{message.author.first_name} {message.author.last_name}",
+        })
+    return flask_json.dumps({'data': result}).encode('utf-8')
+
+def schema_page(names):
+    schema = API_SCHEMAS['messages']
+    return (schema.query(db.session, names)
+            .order_by(schema.sort_column.desc(), schema.id_column.desc()).limit(args.limit).all())
+
+def variants():
+    """(label, fetch the page, serialize it) for each way of sending the page"""
+    yield 'ORM + dicts (JSON)', orm_page, orm_serialize
+    mimetypes = [('JSON', JSON_MIMETYPE)] + ([('MessagePack', MSGPACK_MIMETYPE)] if msgpack_available() else [])
+    everything = tuple(API_SCHEMAS['messages'].fields)
+    for fields_label, names in (('all fields', everything), ('sparse', SPARSE_FIELDS)):
+        for format_label, mimetype in mimetypes:
+            for layout in ('objects', 'rows'):
+                def serialize(rows, names=names, mimetype=mimetype, layout=layout):
+                    payload = {'data': API_SCHEMAS['messages'].encode_rows(rows, names, layout)}
+                    if layout == 'rows':
+                        payload = {'fields': names, **payload}
+                    return dumps(payload, mimetype)
+                yield (f'{format_label} {layout}, {fields_label}',
+                       lambda names=names: schema_page(names), serialize)
+
+def main():
+    bootstrap_database()
+    with app.test_request_context():
+        print(f"📊 Benchmarking the read API on {db.engine.url.render_as_string(hide_password=True)}, "
+              f"{args.limit} messages per page, {args.repeat} runs per measurement")
+        seed()
+        if not msgpack_available():
+            print("⚠️  msgpack is not installed (pip install msgpack): MessagePack is skipped")
+
+        print(f"\n{'Variant':<34} {'Bytes':>8} {'vs ORM':>7} {'gzip':>7} {'Query ms':>9} {'Serialize ms':>13}")
+        print('-' * 83)
+        baseline = None
+        for label, fetch, serialize in variants():
+            rows, query_ms = timed(fetch)
+            body, serialize_ms = timed(lambda: serialize(rows))
+            db.session.expunge_all()
+            baseline = baseline or len(body)
+            print(f"{label:<34} {len(body):>8} {len(body) / baseline:>7.0%} "
+                  f"{len(gzip.compress(body, compresslevel=6)):>7} {query_ms:>9.3f} {serialize_ms:>13.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Application Benchmark Script
+Seeds a scratch database with synthetic users, alumni, messages, events, resources and
+FAQs, then drives the key flows (login, dashboard, list pages, resource upload and
+download, registration) and reports p50/p95/p99 latency, throughput and SQL queries per
+request. Results are written as JSON so runs can be compared for regressions.
+
+Usage:
+    python benchmark_app.py                                  # Flask test client, one request at a time
+    python benchmark_app.py --scale 10 --requests 300
+    python benchmark_app.py --server --workers 4 --concurrency 16   # local gunicorn over HTTP
+    python benchmark_app.py --compare benchmark_results/baseline.json
+    python benchmark_app.py --database-url postgresql://localhost/csuite_bench
+
+The target database is seeded and written to, so never point this at production.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.cookiejar import CookieJar
+from datetime import datetime, timedelta
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Add the current directory to Python path
+sys.path.append(PROJECT_DIR)
+
+# Rows seeded at --scale 1
+BASE_COUNTS = {'users': 200, 'alumni': 1000, 'messages': 5000, 'events': 500, 'resources': 1000, 'faqs': 200}
+PASSWORD = 'benchmark-password'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the key flows of the web app')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier for the seeded row counts (default: 1 = ' +
+                             ', '.join(f'{count} {name}' for name, count in BASE_COUNTS.items()) + ')')
+    for name in BASE_COUNTS:
+        parser.add_argument(f'--{name}', type=int, help=f'{name} to seed (overrides --scale)')
+    parser.add_argument('--requests', type=int, default=100, help='measured requests per flow (default: 100)')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured requests per flow first (default: 5)')
+    parser.add_argument('--flows', help='comma-separated subset of flows to run (default: all)')
+    parser.add_argument('--server', action='store_true', help='run a local gunicorn and drive it over HTTP')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers with --server (default: 2)')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker (default: 4)')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent sessions with --server (default: 8)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    parser.add_argument('--output', help='results file (default: benchmark_results/app-<timestamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='p95 increase in percent reported as a regression (default: 20)')
+    return parser.parse_args()
+
+args = parse_args()
+SCRATCH_DIR = tempfile.mkdtemp(prefix='csuite-bench-')
+os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(SCRATCH_DIR, 'bench.db')
+os.environ['UPLOAD_FOLDER'] = os.path.join(SCRATCH_DIR, 'uploads')
+os.environ['STORAGE_BACKEND'] = 'local'
+# Background threads would compete with the requests being measured
+os.environ['MAIL_OUTBOX_THREAD'] = 'False'
+os.environ['THUMBNAIL_THREAD'] = 'False'
+# The server reports its per-endpoint query counts through /metrics
+os.environ['METRICS_ENABLED'] = 'True'
+os.environ['SLOW_REQUEST_MS'] = '0'
+os.environ['SLOW_QUERY_MS'] = '0'
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Engine
+from werkzeug.security import generate_password_hash
+from app import (app, db, bootstrap_database, increment_collection_versions, VERSIONED_COLLECTIONS,
+                 User, Alumni, UserMessage, Event, Resource, FAQ)
+
+def scaled_counts():
+    return {name: getattr(args, name) if getattr(args, name) is not None else max(1, int(count * args.scale))
+            for name, count in BASE_COUNTS.items()}
+
+def user_email(i):
+    return f'bench-user{i}@example.com'
+
+def registrant(i):
+    """Alumni row reserved for the i-th registration, so every registration succeeds"""
+    return f'Reg{i}', 'Bench', f'bench-register{i}@example.com'
+
+def seed(counts, registrations):
+    """Bulk insert the synthetic dataset (bypassing ORM events, like an import would)"""
+    password_hash = generate_password_hash(PASSWORD)
+    start = datetime.utcnow() - timedelta(days=365)
+
+    def stamp(i, total):
+        return start + timedelta(seconds=i * 365 * 86400 // max(total, 1))
+
+    def insert_batches(model, rows):
+        rows = list(rows)
+        for offset in range(0, len(rows), 5000):
+            db.session.execute(insert(model), rows[offset:offset + 5000])
+
+    insert_batches(User, ({'first_name': f'Bench{i}', 'last_name': 'User', 'email': user_email(i),
+                           'password_hash': password_hash, 'is_verified': True, 'is_admin': i == 0,
+                           'created_at': stamp(i, counts['users'])} for i in range(counts['users'])))
+    user_ids = db.session.scalars(select(User.id).where(User.email.like('bench-user%'))).all()
+
+    insert_batches(Alumni, ({'first_name': f'Alum{i}', 'last_name': f'Last{i % 97}',
+                             'email': f'bench-alumni{i}@example.com', 'is_active': True,
+                             'created_at': stamp(i, counts['alumni'])} for i in range(counts['alumni'])))
+    insert_batches(Alumni, ({'first_name': first, 'last_name': last, 'email': email, 'is_active': True}
+                            for first, last, email in map(registrant, range(registrations))))
+
+    insert_batches(UserMessage, ({'title': f'Message {i}', 'content': 'Lorem ipsum dolor sit amet. ' * 20,
+                                  'author_id': random.choice(user_ids),
+                                  'message_type': 'admin' if i % 10 == 0 else 'classmate',
+                                  'created_at': stamp(i, counts['messages'])} for i in range(counts['messages'])))
+    # Half the events are still upcoming, for the dashboard
+    insert_batches(Event, ({'title': f'Event {i}', 'description': 'Networking and talks',
+                            'date': datetime.utcnow() + timedelta(days=i - counts['events'] // 2),
+                            'location': 'Campus', 'created_by': user_ids[0],
+                            'created_at': stamp(i, counts['events'])} for i in range(counts['events'])))
+    insert_batches(Resource, ({'title': f'Resource {i}', 'description': 'Slides from the session',
+                               'file_path': f'seed-{i}.pdf', 'file_name': f'resource-{i}.pdf',
+                               'file_size': 250000, 'file_type': 'pdf', 'uploaded_by': random.choice(user_ids),
+                               'created_at': stamp(i, counts['resources'])} for i in range(counts['resources'])))
+    insert_batches(FAQ, ({'question': f'Question {i}?', 'answer': 'An answer of a few sentences. ' * 5,
+                          'created_by': user_ids[0], 'created_at': stamp(i, counts['faqs'])}
+                         for i in range(counts['faqs'])))
+    # Bulk inserts skip the flush that bumps the collection versions (and so the alumni index)
+    increment_collection_versions(db.session.connection(), VERSIONED_COLLECTIONS)
+    db.session.commit()
+
+def upload_payload(i):
+    """Distinct bytes per upload, so each one stores a new blob"""
+    return f'%PDF-1.4\n% benchmark upload {i} {uuid.uuid4().hex}\n'.encode() + os.urandom(32 * 1024)
+
+# name -> (endpoint reported in /metrics, request builder(i, state) -> (method, path, form, file))
+FLOWS = {
+    'login': ('login', lambda i, state: ('POST', '/login', {'email': user_email(i % state['users']),
+                                                             'password': PASSWORD}, None)),
+    'dashboard': ('dashboard', lambda i, state: ('GET', '/dashboard', None, None)),
+    'messages': ('messages', lambda i, state: ('GET', '/messages', None, None)),
+    'calendar': ('calendar', lambda i, state: ('GET', '/calendar', None, None)),
+    'resources': ('resources', lambda i, state: ('GET', '/resources', None, None)),
+    'api': ('api_messages', lambda i, state: ('GET', '/api/v1/messages', None, None)),
+    'upload': ('add_resource', lambda i, state: (
+        'POST', '/add_resource', {'title': f'Upload {i}', 'description': 'Benchmark upload'},
+        ('file', f'upload-{i}.pdf', upload_payload(i)))),
+    'download': ('download_file', lambda i, state: (
+        'GET', f"/download/{state['downloads'][i % len(state['downloads'])]}", None, None)),
+    'register': ('register', lambda i, state: (
+        'POST', '/register', dict(zip(('first_name', 'last_name', 'email'), registrant(state['registered'] + i)),
+                                  password=PASSWORD), None)),
+}
+
+class ClientDriver:
+    """Requests through the Flask test client, in this process"""
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def request(self, method, path, form=None, upload=None):
+        data = dict(form or {})
+        if upload:
+            field, filename, content = upload
+            data[field] = (io.BytesIO(content), filename)
+        response = self.client.open(path, method=method, data=data or None,
+                                    content_type='multipart/form-data' if upload else None)
+        response.close()
+        return response.status_code
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class HTTPDriver:
+    """Requests over HTTP with a cookie jar of its own (one logged-in browser session)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, form=None, upload=None):
+        headers = {}
+        body = None
+        if upload:
+            boundary = uuid.uuid4().hex
+            parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+                     for name, value in (form or {}).items()]
+            field, filename, content = upload
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                         f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n')
+            body = b''.join(parts) + f'--{boundary}--\r\n'.encode()
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            # Redirects land here too, since they are not followed
+            e.read()
+            return e.code
+
+def login(driver, i):
+    status = driver.request('POST', '/login', {'email': user_email(i), 'password': PASSWORD})
+    if status != 302:
+        raise RuntimeError(f'Benchmark user could not log in (HTTP {status})')
+
+def percentile(sorted_timings, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_timings) - 1, int(round(fraction * len(sorted_timings))) - 1))
+    return sorted_timings[index]
+
+def summarize(timings, statuses, elapsed, queries):
+    timings = sorted(timings)
+    errors = sum(1 for status in statuses if status >= 400)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 0.50), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'p99_ms': round(percentile(timings, 0.99), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'throughput_rps': round(len(timings) / elapsed, 1) if elapsed else None,
+        'queries_per_request': round(queries, 2) if queries is not None else None,
+    }
+
+class QueryCounter:
+    """SQL statements issued by this thread, for the in-process driver"""
+
+    def __init__(self):
+        self.local = threading.local()
+        event.listen(Engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.local.count = getattr(self.local, 'count', 0) + 1
+
+    def take(self):
+        count = getattr(self.local, 'count', 0)
+        self.local.count = 0
+        return count
+
+def run_flow_in_process(driver, counter, name, state):
+    _, build = FLOWS[name]
+    for i in range(args.warmup):
+        driver.request(*build(i, state))
+    offset = args.warmup
+    timings, statuses, queries = [], [], 0
+    started = time.perf_counter()
+    for i in range(offset, offset + args.requests):
+        request_args = build(i, state)
+        counter.take()
+        request_started = time.perf_counter()
+        statuses.append(driver.request(*request_args))
+        timings.append((time.perf_counter() - request_started) * 1000)
+        queries += counter.take()
+    elapsed = time.perf_counter() - started
+    return summarize(timings, statuses, elapsed, queries / args.requests)
+
+def run_flow_concurrently(drivers, name, state):
+    _, build = FLOWS[name]
+    for i in range(args.warmup):
+        drivers[i % len(drivers)].request(*build(i, state))
+    offset = args.warmup
+    timings, statuses = [], []
+    lock = threading.Lock()
+
+    def session(index, driver):
+        # Session `index` sends requests index, index + concurrency, ...
+        for i in range(offset + index, offset + args.requests, len(drivers)):
+            request_args = build(i, state)
+            request_started = time.perf_counter()
+            status = driver.request(*request_args)
+            elapsed_ms = (time.perf_counter() - request_started) * 1000
+            with lock:
+                timings.append(elapsed_ms)
+                statuses.append(status)
+
+    threads = [threading.Thread(target=session, args=(index, driver)) for index, driver in enumerate(drivers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(timings, statuses, time.perf_counter() - started, None)
+
+def scrape_query_counts(base_url):
+    """Average SQL statements per request by endpoint, from the /metrics of whichever worker answers"""
+    with urllib.request.urlopen(base_url + '/metrics', timeout=10) as response:
+        text = response.read().decode()
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        match = re.match(r'csuite_http_request_db_queries_(sum|count)\{endpoint="([^"]+)"\} (\S+)', line)
+        if match:
+            kind, endpoint, value = match.groups()
+            (sums if kind == 'sum' else counts)[endpoint] = float(value)
+    return {endpoint: sums[endpoint] / counts[endpoint] for endpoint in counts if counts[endpoint]}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server():
+    """Start gunicorn on a free port and wait until it answers"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app'],
+        cwd=PROJECT_DIR, env=dict(os.environ)
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/login', timeout=1).read()
+            return process, base_url
+        except (urllib.error.URLError, ConnectionError):
+            if process.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start within 30s')
+
+def uploaded_resource_ids(limit):
+    """Ids of the newest resources with an uploaded blob, for the download flow"""
+    with app.app_context():
+        return db.session.scalars(select(Resource.id).where(Resource.blob_id.isnot(None))
+                                  .order_by(Resource.id.desc()).limit(limit)).all()
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """Print p95 changes against an earlier run; returns the flows that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n🔍 Compared with {baseline_path} ({baseline['meta'].get('git_revision') or 'unknown revision'})")
+    setup = ('mode', 'database', 'concurrency', 'counts')
+    if any(baseline['meta'].get(key) != results['meta'].get(key) for key in setup):
+        print("⚠️  The runs differ in mode, database, concurrency or dataset size; changes are not comparable")
+    print(f"{'Flow':<12} {'p95 before':>11} {'p95 now':>9} {'change':>8}")
+    print('-' * 44)
+    regressions = []
+    for name, now in results['flows'].items():
+        before = baseline['flows'].get(name)
+        if not before:
+            continue
+        change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        flag = '❌' if change > args.threshold else '  '
+        if change > args.threshold:
+            regressions.append(name)
+        print(f"{name:<12} {before['p95_ms']:>11.2f} {now['p95_ms']:>9.2f} {change:>+7.1f}% {flag}")
+    return regressions
+
+def main():
+    flows = args.flows.split(',') if args.flows else list(FLOWS)
+    unknown = [name for name in flows if name not in FLOWS]
+    if unknown:
+        print(f"❌ Unknown flows: {', '.join(unknown)} (choose from {', '.join(FLOWS)})")
+        sys.exit(2)
+
+    counts = scaled_counts()
+    if not bootstrap_database():
+        sys.exit(1)
+    with app.app_context():
+        database = db.engine.url.get_backend_name()
+        print(f"📊 Benchmarking on {db.engine.url.render_as_string(hide_password=True)}")
+        started = time.perf_counter()
+        registered = db.session.query(Alumni).filter(Alumni.email.like('bench-register%')).count()
+        seed(counts, registered + args.warmup + args.requests)
+        print(f"✅ Seeded {', '.join(f'{count} {name}' for name, count in counts.items())} "
+              f"in {time.perf_counter() - started:.1f}s")
+    state = {'users': counts['users'], 'registered': registered, 'downloads': []}
+
+    server = None
+    try:
+        if args.server:
+            server, base_url = start_server()
+            print(f"🚀 gunicorn: {args.workers} workers x {args.threads} threads, "
+                  f"{args.concurrency} concurrent sessions")
+            drivers = [HTTPDriver(base_url) for _ in range(args.concurrency)]
+            for index, driver in enumerate(drivers):
+                login(driver, index % counts['users'])
+        else:
+            print("🧪 Flask test client, one request at a time")
+            driver = ClientDriver()
+            counter = QueryCounter()
+            login(driver, 0)
+
+        results = {}
+        for name in flows:
+            if name == 'download':
+                state['downloads'] = uploaded_resource_ids(50)
+                if not state['downloads']:
+                    # Nothing uploaded in this run: upload a few files first
+                    for i in range(10):
+                        (drivers[0] if args.server else driver).request(*FLOWS['upload'][1](i, state))
+                    state['downloads'] = uploaded_resource_ids(50)
+            if args.server:
+                results[name] = run_flow_concurrently(drivers, name, state)
+            else:
+                results[name] = run_flow_in_process(driver, counter, name, state)
+            if name == 'register':
+                state['registered'] += args.warmup + args.requests
+            if name == 'login' and not args.server:
+                # The login flow switched users; carry on as the first one
+                login(driver, 0)
+
+        if args.server:
+            query_counts = scrape_query_counts(base_url)
+            for name, summary in results.items():
+                endpoint = FLOWS[name][0]
+                if endpoint in query_counts:
+                    summary['queries_per_request'] = round(query_counts[endpoint], 2)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"\n{'Flow':<12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8} {'queries':>8} {'errors':>7}")
+    print('-' * 68)
+    for name, summary in results.items():
+        queries = summary['queries_per_request']
+        print(f"{name:<12} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} "
+              f"{summary['throughput_rps']:>8.1f} {'-' if queries is None else f'{queries:.1f}':>8} "
+              f"{summary['errors']:>7}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_revision': git_revision(),
+            'database': database,
+            'mode': 'server' if args.server else 'client',
+            'workers': args.workers if args.server else None,
+            'threads': args.threads if args.server else None,
+            'concurrency': args.concurrency if args.server else 1,
+            'requests_per_flow': args.requests,
+            'counts': counts,
+            'python': platform.python_version(),
+        },
+        'flows': results,
+    }
+    output = args.output or os.path.join(
+        PROJECT_DIR, 'benchmark_results', f"app-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare)
+        if regressions:
+            print(f"\n❌ p95 regressed by more than {args.threshold:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == '__main__':
+    main()
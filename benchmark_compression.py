@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark Script
+Renders the main pages for a logged-in user with and without HTML minification and prints
+the bytes sent with each Content-Encoding (identity, gzip, brotli) next to the CPU time per
+request, plus what each gzip level / brotli quality costs and saves on the largest page.
+
+Usage:
+    python benchmark_compression.py
+    python benchmark_compression.py --repeat 200
+    python benchmark_compression.py --database-url postgresql://localhost/csuite_bench
+
+The target database is seeded and written to, so never point this at production.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = 'benchmark-password'
+PAGES = ['/dashboard', '/messages', '/calendar', '/resources', '/faq', '/search?q=message']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark response compression and HTML minification')
+    parser.add_argument('--repeat', type=int, default=50, help='requests per page and setting (default: 50)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+args = parse_args()
+os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+# Render every request in full: no cached dashboard fragments, no 304s, no background threads
+os.environ['CACHE_BACKEND'] = 'null'
+os.environ['LIST_PAGE_ETAGS'] = 'False'
+os.environ['MAIL_OUTBOX_THREAD'] = 'False'
+os.environ['THUMBNAIL_THREAD'] = 'False'
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from app import app, db, bootstrap_database, response_compressor, User, UserMessage, Event, Resource, FAQ
+from compression import ResponseCompressor
+
+ENCODINGS = ['identity', *response_compressor.algorithms]
+
+def seed():
+    """One page of every list, written with bulk inserts"""
+    if User.query.filter_by(email='bench-compression@example.com').first():
+        return
+    user = User(first_name='Bench', last_name='User', email='bench-compression@example.com',
+                password_hash=generate_password_hash(PASSWORD), is_verified=True)
+    db.session.add(user)
+    db.session.flush()
+    author_id = user.id
+    now = datetime.utcnow()
+    db.session.execute(insert(UserMessage), [
+        {'title': f'Message {i} about the next module', 'content': 'Lorem ipsum dolor sit amet. ' * 20,
+         'author_id': author_id, 'message_type': 'classmate', 'created_at': now - timedelta(hours=i)}
+        for i in range(100)
+    ])
+    db.session.execute(insert(Event), [
+        {'title': f'Event {i}', 'description': 'Networking and talks with the faculty', 'location': 'Campus',
+         'date': now + timedelta(days=i - 20), 'created_by': author_id, 'created_at': now}
+        for i in range(40)
+    ])
+    db.session.execute(insert(Resource), [
+        {'title': f'Resource {i}', 'description': 'Slides from the session', 'file_path': f'seed-{i}.pdf',
+         'file_name': f'resource-{i}.pdf', 'file_size': 250000, 'file_type': 'pdf', 'uploaded_by': author_id,
+         'created_at': now - timedelta(hours=i)}
+        for i in range(40)
+    ])
+    db.session.execute(insert(FAQ), [
+        {'question': f'Question {i}?', 'answer': 'An answer of a few sentences. ' * 5, 'created_by': author_id,
+         'created_at': now - timedelta(hours=i)}
+        for i in range(40)
+    ])
+    db.session.commit()
+
+def set_minify(enabled):
+    app.jinja_env.minify_html = enabled
+    app.jinja_env.cache.clear()  # templates are preprocessed when compiled
+
+def measure(client, path, encoding):
+    """(bytes on the wire, CPU ms per request)"""
+    headers = {'Accept-Encoding': encoding}
+    client.get(path, headers=headers)  # warm up
+    started = time.process_time()
+    for _ in range(args.repeat):
+        response = client.get(path, headers=headers)
+    cpu_ms = (time.process_time() - started) * 1000 / args.repeat
+    if response.status_code != 200:
+        raise RuntimeError(f'{path} returned HTTP {response.status_code}')
+    return len(response.data), cpu_ms
+
+def compression_levels(body):
+    """(setting, bytes, CPU ms to compress) for a range of gzip levels and brotli qualities"""
+    settings = [('gzip', level, ResponseCompressor(['gzip'], gzip_level=level)) for level in (1, 6, 9)]
+    if 'br' in response_compressor.algorithms:
+        settings += [('br', quality, ResponseCompressor(['br'], brotli_quality=quality)) for quality in (1, 4, 6, 11)]
+    for name, level, compressor in settings:
+        started = time.process_time()
+        for _ in range(args.repeat):
+            compressed = compressor.compress(body, name)
+        yield f'{name} {level}', len(compressed), (time.process_time() - started) * 1000 / args.repeat
+
+def main():
+    bootstrap_database()
+    with app.app_context():
+        print(f"📊 Benchmarking compression on {db.engine.url.render_as_string(hide_password=True)}, "
+              f"{args.repeat} requests per measurement")
+        seed()
+
+    client = app.test_client()
+    response = client.post('/login', data={'email': 'bench-compression@example.com', 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'Benchmark user could not log in (HTTP {response.status_code})')
+
+    print(f"\n{'Page':<18} {'Minify':<7} {'Encoding':<9} {'Bytes':>8} {'vs plain':>9} {'CPU ms/req':>11}")
+    print('-' * 66)
+    largest = None
+    for path in PAGES:
+        baseline = None
+        for minify in (False, True):
+            set_minify(minify)
+            for encoding in ENCODINGS:
+                size, cpu_ms = measure(client, path, encoding)
+                baseline = baseline or size
+                print(f"{path:<18} {'on' if minify else 'off':<7} {encoding:<9} {size:>8} "
+                      f"{size / baseline:>8.0%} {cpu_ms:>11.2f}")
+        set_minify(False)
+        body = client.get(path, headers={'Accept-Encoding': 'identity'}).data
+        if largest is None or len(body) > len(largest[1]):
+            largest = (path, body)
+        print()
+
+    path, body = largest
+    print(f"🗜️  Compressing {path} ({len(body)} bytes) at each setting")
+    print(f"{'Setting':<10} {'Bytes':>8} {'Ratio':>7} {'CPU ms':>8}")
+    print('-' * 36)
+    for setting, size, cpu_ms in compression_levels(body):
+        print(f"{setting:<10} {size:>8} {size / len(body):>7.0%} {cpu_ms:>8.3f}")
+    print(f"\nServing with gzip level {response_compressor.gzip_level}, "
+          f"brotli quality {response_compressor.brotli_quality}, HTML_MINIFY={app.config['HTML_MINIFY']}")
+
+if __name__ == '__main__':
+    main()
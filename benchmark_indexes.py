@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Index Benchmark Script
+Seeds a scratch database, then prints EXPLAIN output and timings for the hot queries
+before and after the composite model indexes are created.
+
+Usage:
+    python benchmark_indexes.py                       # temporary SQLite file
+    python benchmark_indexes.py --rows 200000
+    python benchmark_indexes.py --database-url postgresql://localhost/csuite_bench
+
+The target database is modified (indexes are dropped and recreated), so never point
+this at production.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark hot queries with and without composite indexes')
+    parser.add_argument('--rows', type=int, default=50000, help='rows to seed per table (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=50, help='executions per timing (default: 50)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ['DATABASE_URL'] = args.database_url
+else:
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+from sqlalchemy import insert, text
+from app import app, db, bootstrap_database, ensure_indexes, User, Alumni, UserMessage, Event, Resource, FAQ
+
+MODELS = [Alumni, UserMessage, Event, Resource, FAQ]
+
+def hot_queries():
+    """The queries the indexes are meant to serve, keyed by the page that runs them"""
+    now = datetime.utcnow()
+    return {
+        'dashboard admin messages': UserMessage.query.filter_by(message_type='admin')
+            .order_by(UserMessage.created_at.desc()).limit(5),
+        'dashboard upcoming events': Event.query.filter(Event.date >= now)
+            .order_by(Event.date).limit(5),
+        'registration alumni lookup': Alumni.query.filter_by(email='alumni4242@example.com', is_active=True),
+        'admin alumni list': Alumni.query.filter_by(is_active=True).order_by(Alumni.last_name).limit(50),
+        'messages page': UserMessage.query.order_by(UserMessage.created_at.desc(), UserMessage.id.desc()).limit(21),
+        'resources page': Resource.query.order_by(Resource.created_at.desc(), Resource.id.desc()).limit(21),
+        'faq page': FAQ.query.order_by(FAQ.created_at.desc(), FAQ.id.desc()).limit(21),
+    }
+
+def drop_model_indexes():
+    """Drop the composite indexes so the 'before' run sees the original schema"""
+    for model in MODELS:
+        for index in model.__table__.indexes:
+            index.drop(bind=db.engine, checkfirst=True)
+
+def seed(rows):
+    """Bulk insert synthetic rows unless the scratch database is already seeded"""
+    if UserMessage.query.count() >= rows:
+        return
+    
+    author_id = User.query.first().id
+    start = datetime.utcnow() - timedelta(days=365)
+    
+    def stamp(i):
+        return start + timedelta(seconds=i * 30)
+    
+    db.session.execute(insert(Alumni), [
+        {'first_name': f'First{i}', 'last_name': f'Last{i % 997}', 'email': f'alumni{i}@example.com',
+         'is_active': i % 10 != 0, 'created_at': stamp(i)}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(UserMessage), [
+        {'title': f'Message {i}', 'content': 'Lorem ipsum', 'author_id': author_id,
+         'message_type': 'admin' if i % 20 == 0 else 'classmate', 'created_at': stamp(i)}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Event), [
+        {'title': f'Event {i}', 'date': stamp(i * 2), 'created_by': author_id, 'created_at': stamp(i)}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Resource), [
+        {'title': f'Resource {i}', 'file_path': f'{i}.pdf', 'file_name': f'{i}.pdf', 'file_size': 1024,
+         'file_type': 'pdf', 'uploaded_by': author_id, 'created_at': stamp(i)}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(FAQ), [
+        {'question': f'Question {i}?', 'answer': 'Answer', 'created_by': author_id, 'created_at': stamp(i)}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+def explain(query):
+    """Return the database's plan for query as a list of lines"""
+    compiled = query.statement.compile()
+    if db.engine.dialect.name == 'sqlite':
+        sql, detail_column = 'EXPLAIN QUERY PLAN ', -1
+    else:
+        sql, detail_column = 'EXPLAIN ', 0
+    rows = db.session.execute(text(sql + str(compiled)), compiled.params).fetchall()
+    return [str(row[detail_column]) for row in rows]
+
+def time_query(query, repeat):
+    """Average wall time of query in milliseconds"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        query.all()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+def run(label, repeat):
+    db.session.execute(text('ANALYZE'))
+    results = {}
+    print(f"\n{'=' * 70}\n{label}\n{'=' * 70}")
+    for name, query in hot_queries().items():
+        results[name] = time_query(query, repeat)
+        print(f"\n{name}: {results[name]:.3f} ms")
+        for line in explain(query):
+            print(f"    {line}")
+    return results
+
+def main():
+    bootstrap_database()
+    with app.app_context():
+        print(f"📊 Benchmarking on {db.engine.url.render_as_string(hide_password=True)} with {args.rows} rows per table")
+        drop_model_indexes()
+        seed(args.rows)
+        
+        before = run('BEFORE: without composite indexes', args.repeat)
+        created = ensure_indexes()
+        print(f"\n✅ Created indexes: {', '.join(created)}")
+        after = run('AFTER: with composite indexes', args.repeat)
+        
+        print(f"\n{'=' * 70}")
+        print(f"{'Query':<30} {'Before (ms)':>12} {'After (ms)':>12} {'Speedup':>10}")
+        print('-' * 70)
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{name:<30} {before[name]:>12.3f} {after[name]:>12.3f} {speedup:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark Script
+Seeds a scratch database with synthetic FAQs, messages and resources, builds the full-text
+index and prints query latencies for rare and very common words, plus the cost of
+indexing one document as it is saved.
+
+Usage:
+    python benchmark_search.py                        # 100k documents in a temporary SQLite file
+    python benchmark_search.py --documents 250000
+    python benchmark_search.py --database-url postgresql://localhost/csuite_bench
+
+The search index of the target database is rebuilt, so never point this at production.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark full-text search latency')
+    parser.add_argument('--documents', type=int, default=100000, help='documents to seed (default: 100000)')
+    parser.add_argument('--repeat', type=int, default=50, help='executions per query (default: 50)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ['DATABASE_URL'] = args.database_url
+else:
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+from sqlalchemy import insert
+from app import app, db, bootstrap_database, rebuild_search_index, search_index_for, User, UserMessage, Resource, FAQ
+
+# Zipf-like vocabulary: a few words appear in most documents, most words in very few
+random.seed(42)
+VOCABULARY = [''.join(random.choice('bcdfghjklmnpqrstvwxz') + random.choice('aeiou') for _ in range(random.randint(2, 4)))
+              for _ in range(30000)]
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+def words(count):
+    return ' '.join(random.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=count))
+
+def seed(documents):
+    """Bulk insert synthetic rows (bypassing the ORM events) unless already seeded"""
+    if UserMessage.query.count() >= documents * 0.6:
+        return
+
+    author_id = User.query.first().id
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = 10000
+    for offset in range(0, documents, batch):
+        rows = range(offset, min(offset + batch, documents))
+        stamp = lambda i: start + timedelta(seconds=i * 30)
+        db.session.execute(insert(UserMessage), [
+            {'title': words(6), 'content': words(80), 'author_id': author_id,
+             'message_type': 'classmate', 'created_at': stamp(i)}
+            for i in rows if i % 10 < 6
+        ])
+        db.session.execute(insert(FAQ), [
+            {'question': words(10) + '?', 'answer': words(60), 'created_by': author_id, 'created_at': stamp(i)}
+            for i in rows if 6 <= i % 10 < 8
+        ])
+        db.session.execute(insert(Resource), [
+            {'title': words(5), 'description': words(30), 'file_path': f'{i}.pdf', 'file_name': f'{i}.pdf',
+             'file_size': 1024, 'file_type': 'pdf', 'uploaded_by': author_id, 'created_at': stamp(i)}
+            for i in rows if i % 10 >= 8
+        ])
+        db.session.commit()
+
+def time_search(query, repeat, kinds=None, page=1):
+    """(median ms, 95th percentile ms, hits on the page)"""
+    connection = db.session.connection()
+    index = search_index_for(connection.dialect.name)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hits = index.search(connection, query, kinds=kinds, limit=app.config['PAGE_SIZE'] + 1,
+                            offset=(page - 1) * app.config['PAGE_SIZE'], window=app.config['SEARCH_RANK_WINDOW'])
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95) - 1], len(hits)
+
+def time_indexing(count):
+    """Average ms to insert and commit one message, including its search index update"""
+    author_id = User.query.first().id
+    started = time.perf_counter()
+    for _ in range(count):
+        db.session.add(UserMessage(title=words(6), content=words(80), author_id=author_id))
+        db.session.commit()
+    return (time.perf_counter() - started) * 1000 / count
+
+def main():
+    bootstrap_database()
+    with app.app_context():
+        print(f"📊 Benchmarking search on {db.engine.url.render_as_string(hide_password=True)} "
+              f"with {args.documents} documents")
+        seed(args.documents)
+
+        started = time.perf_counter()
+        indexed = rebuild_search_index()
+        print(f"✅ Indexed {indexed} documents in {time.perf_counter() - started:.1f}s")
+
+        queries = {
+            'rare word': (VOCABULARY[20000], None, 1),
+            'two rare words': (f'{VOCABULARY[15000]} {VOCABULARY[25000]}', None, 1),
+            'common word': (VOCABULARY[0], None, 1),
+            'common word, page 10': (VOCABULARY[0], None, 10),
+            'two common words': (f'{VOCABULARY[0]} {VOCABULARY[1]}', None, 1),
+            'third most common word': (VOCABULARY[2], None, 1),
+            'common word, FAQs only': (VOCABULARY[0], ['faq'], 1),
+            'no match': ('qqqqqq', None, 1),
+        }
+        print(f"\n{'Query':<26} {'Median (ms)':>12} {'p95 (ms)':>10} {'Hits':>6}")
+        print('-' * 58)
+        for name, (query, kinds, page) in queries.items():
+            median, p95, hits = time_search(query, args.repeat, kinds, page)
+            print(f"{name:<26} {median:>12.2f} {p95:>10.2f} {hits:>6}")
+
+        print(f"\n✏️  Insert + index + commit one message: {time_indexing(200):.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark Script
+Measures the cost of booting a worker (importing app) with and without the database
+bootstrap that used to run at import time, and checks that concurrent bootstraps are safe.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 20 --workers 8
+    python benchmark_startup.py --database-url postgresql://localhost/csuite_bench
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each snippet runs in a fresh interpreter, like a newly forked gunicorn worker
+BOOT_BEFORE = "from app import bootstrap_database; bootstrap_database()"
+BOOT_AFTER = "import app"
+CHECK_SEED = (
+    "from app import app, User, Alumni\n"
+    "with app.app_context():\n"
+    "    print(User.query.filter_by(email='chentail@protonmail.ch').count(), Alumni.query.count())"
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark worker startup time')
+    parser.add_argument('--runs', type=int, default=10, help='boots measured per mode (default: 10)')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent bootstraps in the safety check (default: 4)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+def run_python(code, env):
+    return subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+def time_boot(code, env, runs):
+    """Wall time in milliseconds of each fresh-interpreter boot"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_python(code, env)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def concurrent_bootstrap(env, workers):
+    """Start several bootstraps at once against an empty database and report what they seeded"""
+    processes = [
+        subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'app', 'bootstrap'], cwd=PROJECT_DIR, env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    failures = sum(1 for process in processes if process.wait() != 0)
+    users, alumni = run_python(CHECK_SEED, env).stdout.split()
+    return failures, int(users), int(alumni)
+
+def main():
+    args = parse_args()
+    scratch_dir = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(scratch_dir, 'startup.db')
+    
+    print("🔄 Startup benchmark")
+    print("=" * 60)
+    
+    failures, users, alumni = concurrent_bootstrap(env, args.workers)
+    status = '✅' if failures == 0 and users == 1 and alumni == 26 else '❌'
+    print(f"{status} {args.workers} concurrent bootstraps: {failures} failed, "
+          f"{users} test user(s), {alumni} alumni rows")
+    
+    # Both modes run against the already bootstrapped database, as on a redeploy
+    before = time_boot(BOOT_BEFORE, env, args.runs)
+    after = time_boot(BOOT_AFTER, env, args.runs)
+    
+    print(f"\n{'Mode':<32} {'median (ms)':>12} {'p90 (ms)':>10}")
+    print("-" * 60)
+    for label, timings in (('import + bootstrap (before)', before), ('import only (after)', after)):
+        p90 = statistics.quantiles(timings, n=10)[-1] if len(timings) > 1 else timings[0]
+        print(f"{label:<32} {statistics.median(timings):>12.1f} {p90:>10.1f}")
+    saved = statistics.median(before) - statistics.median(after)
+    print(f"\n📉 Saved per worker boot: {saved:.1f} ms")
+
+if __name__ == '__main__':
+    main()
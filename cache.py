@@ -0,0 +1,170 @@
+"""
+Fragment cache for C-Suite Pathway Program
+A process-local TTL/LRU cache with a pluggable backend interface, so several
+gunicorn workers can share one cache (e.g. Redis) instead of each keeping its own.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by backends on a miss, so cached None values still count as hits
+MISSING = object()
+
+class CacheBackend:
+    """Interface every cache backend implements"""
+
+    def get(self, key):
+        """Return the cached value for key, or MISSING"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds"""
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """Remove keys from the cache"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every key from the cache"""
+        raise NotImplementedError
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (caching disabled)"""
+
+    def get(self, key):
+        return MISSING
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+class LocalCache(CacheBackend):
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisCache(CacheBackend):
+    """Backend shared by every worker through a Redis server (requires the redis package)"""
+
+    def __init__(self, url, prefix='csuite:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package (pip install redis)') from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self._client.delete(*keys)
+
+def create_cache_backend(name, max_entries=128, url=None):
+    """Build the backend selected by the CACHE_BACKEND setting"""
+    if name == 'local':
+        return LocalCache(max_entries=max_entries)
+    if name == 'redis':
+        return RedisCache(url)
+    if name in ('null', 'none'):
+        return NullCache()
+    raise ValueError(f"Unknown cache backend '{name}'")
+
+class FragmentCache:
+    """Wraps a backend with hit/miss counters and a get_or_set helper"""
+
+    def __init__(self, backend, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, producer, ttl=None):
+        """Return the cached value for key, calling producer() to fill it on a miss"""
+        value = self.backend.get(key)
+        if value is not MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = producer()
+        self.backend.set(key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop keys after the data behind them changed"""
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        stats = {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+        if isinstance(self.backend, LocalCache):
+            stats['entries'] = len(self.backend)
+            stats['evictions'] = self.backend.evictions
+        return stats
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Query Budget Check Script
+Seeds a scratch database with many distinct authors and uploaders, then renders the list
+pages in testing mode, where a view that issues more SQL queries than its @query_budget
+raises QueryBudgetExceeded. An N+1 on the author or uploader names (one query per row)
+therefore fails the check instead of only slowing the page down.
+
+Usage:
+    python check_query_budget.py                     # temporary SQLite file
+    python check_query_budget.py --authors 100
+    python check_query_budget.py --loading lazy      # shows the guard catching an N+1
+    python check_query_budget.py --database-url postgresql://localhost/csuite_check
+
+Exits with status 1 if any page exceeds its budget. The budgets are set for the default
+joined loading; selectin loading costs one more query per list, so it exceeds them too.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Render the list pages and fail on queries over their budget')
+    parser.add_argument('--authors', type=int, default=40,
+                        help='distinct authors and uploaders to seed, one message and resource each (default: 40)')
+    parser.add_argument('--loading', choices=['joined', 'selectin', 'lazy'],
+                        help='author/uploader loading strategy to check (default: the configured ones)')
+    parser.add_argument('--database-url', help='scratch database URL (default: temporary SQLite file)')
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ['DATABASE_URL'] = args.database_url
+else:
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'check.db')
+# Cached dashboard fragments would hide the queries that build them
+os.environ['CACHE_BACKEND'] = 'null'
+
+from flask import g, request, request_finished
+from werkzeug.security import generate_password_hash
+from app import app, db, bootstrap_database, QueryBudgetExceeded, User, UserMessage, Event, Resource
+
+PASSWORD = 'check-password'
+VIEWER_EMAIL = 'check-viewer@example.com'
+
+# Every page lists rows by many different authors or uploaders
+PAGES = [
+    '/dashboard',
+    '/messages',
+    '/resources',
+    '/api/v1/messages',
+    '/api/v1/resources',
+]
+
+def seed(authors):
+    """One message, resource and event per author, unless the scratch database is already seeded"""
+    if User.query.filter_by(email=VIEWER_EMAIL).first():
+        return
+    now = datetime.utcnow()
+    db.session.add(User(first_name='Check', last_name='Viewer', email=VIEWER_EMAIL,
+                        password_hash=generate_password_hash(PASSWORD), is_verified=True))
+    users = [User(first_name=f'Author{i}', last_name='Check', email=f'check-author{i}@example.com',
+                  password_hash='!', is_verified=True) for i in range(authors)]
+    db.session.add_all(users)
+    db.session.flush()
+    for i, user in enumerate(users):
+        stamp = now - timedelta(minutes=i)
+        db.session.add(UserMessage(title=f'Message {i}', content='Checking the query budget.', author_id=user.id,
+                                   message_type='admin' if i % 4 == 0 else 'classmate', created_at=stamp))
+        db.session.add(Resource(title=f'Resource {i}', file_path=f'check-{i}.pdf', file_name=f'resource-{i}.pdf',
+                                file_size=1000, file_type='pdf', uploaded_by=user.id, created_at=stamp))
+        db.session.add(Event(title=f'Event {i}', date=now + timedelta(days=i), created_by=user.id))
+    db.session.commit()
+
+def main():
+    bootstrap_database()
+    app.config['TESTING'] = True
+    if args.loading:
+        app.config['RELATIONSHIP_LOADING'] = {name: args.loading for name in app.config['RELATIONSHIP_LOADING']}
+
+    with app.app_context():
+        print(f"🔍 Checking query budgets on {db.engine.url.render_as_string(hide_password=True)} "
+              f"with {args.authors} authors and uploaders")
+        seed(args.authors)
+
+    strategies = ', '.join(f'{name} {strategy}' for name, strategy in app.config['RELATIONSHIP_LOADING'].items())
+    print(f"   Loading: {strategies}")
+
+    client = app.test_client()
+    response = client.post('/login', data={'email': VIEWER_EMAIL, 'password': PASSWORD})
+    if response.status_code != 302:
+        print(f"❌ Could not log in as {VIEWER_EMAIL} ({response.status_code})")
+        sys.exit(1)
+
+    # Query count and budget of the last request that stayed within it
+    counted = {}
+
+    def record_count(sender, response, **extra):
+        view = app.view_functions.get(request.endpoint)
+        counted['last'] = (g.get('query_count', 0),
+                           getattr(view, 'query_budget', None) or app.config['QUERY_BUDGET'])
+    request_finished.connect(record_count, app)
+
+    failures = 0
+    for path in PAGES:
+        accept = 'application/json' if path.startswith('/api/') else 'text/html'
+        try:
+            response = client.get(path, headers={'Accept': accept})
+        except QueryBudgetExceeded as e:
+            failures += 1
+            print(f"❌ {path:<20} {e}")
+            continue
+        if response.status_code != 200:
+            failures += 1
+            print(f"❌ {path:<20} status {response.status_code}")
+            continue
+        count, budget = counted['last']
+        print(f"✅ {path:<20} {count} queries (budget {budget})")
+
+    if failures:
+        print(f"\n❌ {failures} of {len(PAGES)} pages failed")
+        sys.exit(1)
+    print(f"\n✅ All {len(PAGES)} pages stayed within their query budgets")
+
+if __name__ == '__main__':
+    main()
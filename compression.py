@@ -0,0 +1,159 @@
+"""
+Response compression for C-Suite Pathway Program
+Negotiates brotli or gzip with the client and compresses eligible responses, buffered ones
+in one go and streamed ones chunk by chunk (each chunk is flushed, so nothing is held back).
+Also provides a Jinja extension that strips template indentation at compile time.
+Brotli requires the brotli package (pip install brotli); without it only gzip is offered.
+"""
+
+import gzip
+import re
+import zlib
+
+from jinja2.ext import Extension
+from werkzeug.wsgi import ClosingIterator
+
+# No body, or (206) a byte range of the identity representation
+UNCOMPRESSIBLE_STATUSES = {204, 206}
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits 31 = zlib deflate with a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, brotli, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+class ResponseCompressor:
+    """Content-Encoding for responses, negotiated from Accept-Encoding"""
+
+    def __init__(self, algorithms=('br', 'gzip'), min_size=500, mimetypes=(), gzip_level=6, brotli_quality=4):
+        self.brotli = None
+        if 'br' in algorithms:
+            try:
+                import brotli
+                self.brotli = brotli
+            except ImportError:
+                pass
+        # Preference order for equally acceptable encodings; br only when it can be produced
+        self.algorithms = tuple(name for name in algorithms if name == 'gzip' or (name == 'br' and self.brotli))
+        self.min_size = min_size
+        self.mimetypes = frozenset(mimetypes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def negotiate(self, accept_encodings):
+        """The supported encoding the client prefers, or None for identity"""
+        best, best_quality = None, 0
+        for name in self.algorithms:
+            quality = accept_encodings[name]
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return self.brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _stream(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli, self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _compress_chunks(self, chunks, encoding):
+        stream = self._stream(encoding)
+        for chunk in chunks:
+            if chunk:
+                yield stream.compress(chunk)
+        yield stream.finish()
+
+    def eligible(self, response):
+        """Whether the body's representation can depend on Accept-Encoding at all"""
+        return (response.status_code >= 200 and response.status_code not in UNCOMPRESSIBLE_STATUSES
+                and response.mimetype in self.mimetypes
+                # send_file responses (downloads, static files) may be served with Range or sendfile
+                and not response.direct_passthrough
+                and 'Content-Range' not in response.headers)
+
+    def process(self, accept_encodings, response):
+        """Compress the response in place if it is eligible and the client accepts an encoding"""
+        if not self.eligible(response):
+            return response
+        # A 304 carries the same Vary and validator as the 200 it stands for, but no body
+        response.vary.add('Accept-Encoding')
+        if response.content_encoding or response.cache_control.no_transform:
+            return response
+        encoding = self.negotiate(accept_encodings)
+        if encoding is None:
+            return response
+
+        # The compressed bytes differ from the identity ones, but a conditional request with
+        # either validator should still get a 304. Weakened whenever an encoding is negotiated
+        # (even for bodies left below min_size), so a 304 always repeats its 200's ETag
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        if response.status_code == 304:
+            return response
+
+        if response.is_streamed:
+            # Size unknown up front: compress as the chunks are produced, and still close the
+            # original iterable (it may hold a database session or a file open)
+            original = response.response
+            close = getattr(original, 'close', None)
+            response.response = ClosingIterator(self._compress_chunks(response.iter_encoded(), encoding),
+                                                [close] if close else None)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self.compress(data, encoding))
+
+        response.content_encoding = encoding
+        return response
+
+# Elements whose content is whitespace-sensitive, and Jinja tags (left untouched)
+_PRESERVED = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>|\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\})',
+                        re.S | re.I)
+_INDENTATION = re.compile(r'[ \t\r\f\v]*\n\s*')
+
+def minify_template_source(source):
+    """
+    Template source with every run of whitespace that contains a line break reduced to a single
+    newline. A newline renders like any other whitespace, so the page looks the same.
+    """
+    parts = _PRESERVED.split(source)
+    # split() yields text, full match, inner group, text, ...
+    minified = []
+    for index in range(0, len(parts), 3):
+        minified.append(_INDENTATION.sub('\n', parts[index]))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return ''.join(minified)
+
+class HTMLMinifyExtension(Extension):
+    """Strips indentation from .html templates when environment.minify_html is true"""
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(minify_html=False)
+
+    def preprocess(self, source, name, filename=None):
+        if not self.environment.minify_html or not (name or '').endswith('.html'):
+            return source
+        return minify_template_source(source)
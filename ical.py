@@ -0,0 +1,76 @@
+"""
+iCalendar feed for C-Suite Pathway Program
+Renders events as an RFC 5545 VCALENDAR for calendar clients to subscribe to. The output
+depends only on the events passed in (each DTSTAMP is when the event last changed, not the
+time of the request), so the same events always give the same bytes and a strong ETag holds.
+"""
+
+from collections import namedtuple
+
+CONTENT_TYPE = 'text/calendar; charset=utf-8'
+PRODID = '-//C-Suite Pathway Program//Calendar//EN'
+UID_DOMAIN = 'csuite-pathway'
+# Part of the feed's ETag: bump whenever a change here alters the output for the same events
+FORMAT_VERSION = 1
+
+FeedEvent = namedtuple('FeedEvent', ['id', 'title', 'description', 'date', 'location', 'changed_at'])
+
+def escape_text(value):
+    """TEXT value with backslashes, separators and line breaks escaped"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n'))
+
+def fold(line):
+    """A content line split into lines of at most 75 octets, never inside a UTF-8 character"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    start = 0
+    limit = 75  # continuation lines start with a space, so they carry 74 octets
+    while len(encoded) - start > limit:
+        end = start + limit
+        while end > start and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # back off to the start of a multi-byte character
+        parts.append(encoded[start:end].decode('utf-8'))
+        start = end
+        limit = 74
+    parts.append(encoded[start:].decode('utf-8'))
+    return '\r\n '.join(parts)
+
+def format_local(value):
+    # Event dates are wall-clock times as entered, so they are sent as floating times
+    return value.strftime('%Y%m%dT%H%M%S')
+
+def format_utc(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+def render_calendar(events, name, refresh_minutes=60):
+    """UTF-8 VCALENDAR bytes for FeedEvent tuples, in the order given"""
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+        # How often clients should poll (the first is standard, the second is what Outlook and Apple read)
+        f'REFRESH-INTERVAL;VALUE=DURATION:PT{refresh_minutes}M',
+        f'X-PUBLISHED-TTL:PT{refresh_minutes}M',
+    ]
+    for event in events:
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:event-{event.id}@{UID_DOMAIN}',
+            f'DTSTAMP:{format_utc(event.changed_at)}',
+            f'LAST-MODIFIED:{format_utc(event.changed_at)}',
+            f'DTSTART:{format_local(event.date)}',
+            f'SUMMARY:{escape_text(event.title)}',
+        ]
+        if event.description:
+            lines.append(f'DESCRIPTION:{escape_text(event.description)}')
+        if event.location:
+            lines.append(f'LOCATION:{escape_text(event.location)}')
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines).encode('utf-8')
@@ -0,0 +1,183 @@
+"""
+Live feed for C-Suite Pathway Program
+Keeps the messages and events created since clients started listening in process memory, so
+any number of open Server-Sent Events or long-poll requests can wait for the next ones
+without a database connection. One poller thread per process reads the database while at
+least one request is waiting; every waiting request only waits on a condition variable.
+
+A cursor is the pair (last message id, last event id) a client has seen, written "12-7".
+"""
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+KINDS = ('message', 'event')
+
+LiveItem = namedtuple('LiveItem', ['cursor', 'kind', 'id', 'payload'])
+
+def encode_cursor(cursor):
+    return f'{cursor[0]}-{cursor[1]}'
+
+def decode_cursor(value):
+    """(message id, event id) from a cursor string, or None if it is missing or malformed"""
+    try:
+        message_id, event_id = (int(part) for part in (value or '').split('-'))
+    except ValueError:
+        return None
+    if message_id < 0 or event_id < 0:
+        return None
+    return message_id, event_id
+
+def is_after(item, cursor):
+    return item.id > cursor[KINDS.index(item.kind)]
+
+class LiveFeed:
+    """
+    load_cursor() returns the newest (message id, event id). changed() returns a value that
+    differs whenever messages or events may have been added. fetch(cursor, limit) returns
+    (kind, id, payload) for up to `limit` of the newest rows of each kind after the cursor,
+    messages then events, each in ascending id order.
+    """
+
+    def __init__(self, load_cursor, changed, fetch, poll_interval=2.0, buffer_size=200, max_waiters=100,
+                 logger=None):
+        self.load_cursor = load_cursor
+        self.changed = changed
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.max_waiters = max_waiters
+        self.logger = logger
+
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._items = deque()
+        self._cursor = None  # newest position the poller has seen
+        self._base = None    # the buffer holds every item after this position
+        self._token = None
+        self._polled_at = 0.0
+        self._waiters = 0
+        self._poller_pid = None
+
+    def cursor(self):
+        """The newest position this process knows of (loaded once, then kept up by the poller)"""
+        if self._cursor is None:
+            cursor = tuple(self.load_cursor())
+            with self._condition:
+                if self._cursor is None:
+                    self._cursor = self._base = cursor
+        return self._cursor
+
+    def with_cursors(self, cursor, rows):
+        """LiveItems for fetched rows, each carrying the position a client has reached after it"""
+        items = []
+        for kind, row_id, payload in rows:
+            cursor = tuple(max(row_id, position) if KINDS[index] == kind else position
+                           for index, position in enumerate(cursor))
+            items.append(LiveItem(cursor, kind, row_id, payload))
+        return items
+
+    def backfill(self, cursor, limit):
+        """Items after the cursor straight from the database (one fetch, for requests that do not wait)"""
+        return self.with_cursors(cursor, self.fetch(cursor, limit))
+
+    def items_after(self, cursor):
+        """Buffered items after the cursor, or None when the buffer cannot tell (poller idle, cursor too old)"""
+        with self._condition:
+            if self._base is None or time.monotonic() - self._polled_at > 2 * self.poll_interval:
+                return None
+            if cursor[0] < self._base[0] or cursor[1] < self._base[1]:
+                return None
+            return [item for item in self._items if is_after(item, cursor)]
+
+    def try_hold(self):
+        """
+        Take one of the max_waiters slots for a request that will wait. Returns the function that
+        gives the slot back (calling it again is harmless), or None when every slot is taken.
+        """
+        with self._condition:
+            if self._waiters >= self.max_waiters:
+                return None
+            self._waiters += 1
+            self._condition.notify_all()  # wake an idle poller
+        self._ensure_poller()
+
+        held = [True]
+
+        def release():
+            with self._condition:
+                if held:
+                    held.pop()
+                    self._waiters -= 1
+        return release
+
+    def wait(self, cursor, timeout):
+        """Items after the cursor, waiting up to timeout seconds for some to arrive (requires a hold)"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                items = [item for item in self._items if is_after(item, cursor)]
+                remaining = deadline - time.monotonic()
+                if items or remaining <= 0:
+                    return items
+                self._condition.wait(remaining)
+
+    def notify(self):
+        """Poll now instead of at the next interval (this process just committed new rows)"""
+        self._wakeup.set()
+
+    @property
+    def waiters(self):
+        return self._waiters
+
+    def _ensure_poller(self):
+        """Start one poller thread per process (after gunicorn has forked)"""
+        if self._poller_pid == os.getpid():
+            return
+        with self._condition:
+            if self._poller_pid != os.getpid():
+                threading.Thread(target=self._run, name='live-feed-poller', daemon=True).start()
+                self._poller_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._waiters:
+                    self._condition.wait()  # nobody is listening: no queries at all
+            try:
+                self.poll()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f'Live feed poll error: {str(e)}')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def poll(self):
+        """Add the rows created since the last poll to the buffer and wake the waiting requests"""
+        token = self.changed()
+        cursor = self.cursor()
+        if token != self._token:
+            rows = self.fetch(cursor, self.buffer_size)
+            items = self.with_cursors(cursor, rows)
+        else:
+            items = []
+
+        with self._condition:
+            self._token = token
+            self._polled_at = time.monotonic()
+            if items:
+                base = list(self._base)
+                for index, kind in enumerate(KINDS):
+                    of_kind = [item for item in items if item.kind == kind]
+                    # More new rows than were fetched: the buffer only has the newest ones
+                    if len(of_kind) >= self.buffer_size:
+                        base[index] = of_kind[0].id - 1
+                self._items.extend(items)
+                while len(self._items) > self.buffer_size:
+                    evicted = self._items.popleft()
+                    base = [max(position, evicted.cursor[index]) for index, position in enumerate(base)]
+                self._base = tuple(base)
+                self._cursor = items[-1].cursor
+                self._condition.notify_all()
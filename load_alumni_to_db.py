@@ -1,17 +1,36 @@
 #!/usr/bin/env python3
 """
 Load Alumni to Database Script
-Automatically loads the processed alumni data into the database
+Streams alumni from a CSV/TSV file into the database in batches.
+
+Usage:
+    python load_alumni_to_db.py                      # built-in C-Suite Pathway alumni list
+    python load_alumni_to_db.py alumni.csv
+    python load_alumni_to_db.py alumni.tsv --batch-size 2000 --update
+
+The file needs a header row with an Email column and either First Name/Last Name
+columns or a single Name column (split with process_alumni.parse_name).
+Graduation Year, Company and Position columns are optional.
+Each batch costs one query to find existing emails, one bulk insert and a bump of the
+'alumni' collection version (which makes running web workers reload their allowlist),
+committed as a single transaction.
 """
 
-import sys
+import argparse
+import csv
 import os
+import sys
+import time
 from datetime import datetime
+from itertools import islice
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, Alumni, UserMessage
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import app, db, Alumni, ensure_collection_versions, increment_collection_versions, normalize_email
+from process_alumni import parse_name
 
 # Processed alumni data from the previous script
 ALUMNI_DATA = [
@@ -43,8 +62,92 @@ ALUMNI_DATA = [
     {'first_name': 'Yousuf', 'last_name': 'Rashid', 'email': 'yusuf.s.zaabi@pdo.co.om'}
 ]
 
-def load_alumni_to_database():
-    """Load all alumni data into the database"""
+UPDATABLE_COLUMNS = ('first_name', 'last_name', 'graduation_year', 'company', 'position', 'is_active')
+
+def normalize_header(name):
+    """'First Name' -> 'first_name'"""
+    return name.strip().lower().replace(' ', '_').replace('-', '_')
+
+def read_alumni_file(path, delimiter=None):
+    """Yield one raw row dict per line of a CSV/TSV file without loading it into memory"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if delimiter is None:
+            if path.lower().endswith(('.tsv', '.tab')):
+                delimiter = '\t'
+            else:
+                delimiter = csv.Sniffer().sniff(f.read(4096), delimiters=',\t;').delimiter
+                f.seek(0)
+        
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [normalize_header(name) for name in next(reader, [])]
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield dict(zip(header, values))
+
+def to_alumni_row(raw):
+    """Convert a raw file row to Alumni column values, or None if it has no usable email"""
+    email = normalize_email(raw.get('email') or '')
+    if '@' not in email:
+        return None
+    
+    if raw.get('first_name') or raw.get('last_name'):
+        first_name = (raw.get('first_name') or '').strip()
+        last_name = (raw.get('last_name') or '').strip()
+    else:
+        first_name, last_name = parse_name(raw.get('name') or '')
+    
+    graduation_year = (raw.get('graduation_year') or '').strip()
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': email,
+        'graduation_year': int(graduation_year) if graduation_year.isdigit() else None,
+        'company': (raw.get('company') or '').strip() or None,
+        'position': (raw.get('position') or '').strip() or None,
+        'is_active': True,
+        'created_at': datetime.utcnow(),
+    }
+
+def insert_statement(update):
+    """Bulk INSERT that tolerates rows added concurrently, optionally updating them (upsert)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(Alumni)
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(Alumni)
+    else:
+        return insert(Alumni)
+    
+    if update:
+        return stmt.on_conflict_do_update(
+            index_elements=['email'],
+            set_={column: stmt.excluded[column] for column in UPDATABLE_COLUMNS}
+        )
+    return stmt.on_conflict_do_nothing(index_elements=['email'])
+
+def import_batch(rows, update=False):
+    """
+    Write one batch in a single transaction.
+    Returns (inserted, updated, duplicates).
+    """
+    # Collapse duplicates inside the batch; the last occurrence wins
+    by_email = {row['email']: row for row in rows}
+    existing = set(db.session.scalars(select(Alumni.email).where(Alumni.email.in_(by_email.keys()))))
+    
+    new_rows = [row for email, row in by_email.items() if email not in existing]
+    changed_rows = [row for email, row in by_email.items() if email in existing] if update else []
+    duplicates = len(rows) - len(new_rows) - len(changed_rows)
+    
+    to_write = new_rows + changed_rows
+    if to_write:
+        db.session.execute(insert_statement(update), to_write)
+        # Core inserts skip the flush that bumps the version; every web worker's alumni index watches it
+        increment_collection_versions(db.session.connection(), ['alumni'])
+    db.session.commit()
+    return len(new_rows), len(changed_rows), duplicates
+
+def load_alumni_to_database(rows, batch_size=1000, update=False):
+    """Load alumni rows (an iterable of raw dicts) into the database in batches"""
     
     with app.app_context():
         print("🔄 Loading C-Suite Pathway Alumni to Database")
@@ -52,55 +155,68 @@ def load_alumni_to_database():
         
         # Create tables if they don't exist
         db.create_all()
+        ensure_collection_versions()
         
-        success_count = 0
-        error_count = 0
-        duplicate_count = 0
+        inserted = updated = duplicates = invalid = errors = 0
+        processed = 0
+        started = time.perf_counter()
+        rows = iter(rows)
         
-        for i, alumni_data in enumerate(ALUMNI_DATA, 1):
+        while True:
+            raw_batch = list(islice(rows, batch_size))
+            if not raw_batch:
+                break
+            processed += len(raw_batch)
+            
+            batch = [row for row in map(to_alumni_row, raw_batch) if row]
+            invalid += len(raw_batch) - len(batch)
+            if not batch:
+                continue
+            
             try:
-                # Check if alumni already exists
-                existing_alumni = Alumni.query.filter_by(email=alumni_data['email']).first()
-                
-                if existing_alumni:
-                    print(f"⚠️  {i:2d}. {alumni_data['first_name']} {alumni_data['last_name']} - Already exists")
-                    duplicate_count += 1
-                    continue
-                
-                # Create new alumni record
-                new_alumni = Alumni(
-                    first_name=alumni_data['first_name'],
-                    last_name=alumni_data['last_name'],
-                    email=alumni_data['email'].lower(),
-                    is_active=True,
-                    created_at=datetime.utcnow()
-                )
-                
-                db.session.add(new_alumni)
-                db.session.commit()
-                
-                print(f"✅ {i:2d}. {alumni_data['first_name']} {alumni_data['last_name']} - Added successfully")
-                success_count += 1
-                
+                batch_inserted, batch_updated, batch_duplicates = import_batch(batch, update=update)
+                inserted += batch_inserted
+                updated += batch_updated
+                duplicates += batch_duplicates
             except Exception as e:
-                print(f"❌ {i:2d}. {alumni_data['first_name']} {alumni_data['last_name']} - Error: {str(e)}")
-                error_count += 1
                 db.session.rollback()
+                errors += len(batch)
+                print(f"❌ Batch ending at row {processed} rolled back: {str(e)}")
+            
+            if processed % (batch_size * 10) < batch_size:
+                elapsed = time.perf_counter() - started
+                print(f"   {processed:,} rows processed ({processed / elapsed:,.0f} rows/s)")
+        
+        elapsed = time.perf_counter() - started
         
         print("\n" + "=" * 60)
         print("📊 Loading Summary:")
-        print(f"✅ Successfully added: {success_count}")
-        print(f"⚠️  Duplicates found: {duplicate_count}")
-        print(f"❌ Errors: {error_count}")
-        print(f"📋 Total processed: {len(ALUMNI_DATA)}")
+        print(f"✅ Successfully added: {inserted}")
+        if update:
+            print(f"🔁 Updated: {updated}")
+        print(f"⚠️  Duplicates found: {duplicates}")
+        print(f"⚠️  Invalid rows skipped: {invalid}")
+        print(f"❌ Errors: {errors}")
+        print(f"📋 Total processed: {processed}")
+        print(f"⏱️  {elapsed:.2f}s ({processed / elapsed if elapsed else 0:,.0f} rows/s)")
         
-        if success_count > 0:
-            print(f"\n🎉 {success_count} new alumni added to the verification system!")
+        if inserted > 0:
+            print(f"\n🎉 {inserted} new alumni added to the verification system!")
             print("🔐 These alumni can now register on the website.")
         
         # Show total alumni count
         total_alumni = Alumni.query.filter_by(is_active=True).count()
         print(f"\n📈 Total active alumni in database: {total_alumni}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Import alumni from a CSV/TSV file')
+    parser.add_argument('path', nargs='?', help='CSV/TSV file (default: built-in alumni list)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per transaction (default: 1000)')
+    parser.add_argument('--delimiter', help='field delimiter (default: detect from the file)')
+    parser.add_argument('--update', action='store_true', help='update names/company of alumni that already exist')
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    load_alumni_to_database()
+    args = parse_args()
+    rows = read_alumni_file(args.path, args.delimiter) if args.path else ALUMNI_DATA
+    load_alumni_to_database(rows, batch_size=args.batch_size, update=args.update)
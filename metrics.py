@@ -0,0 +1,144 @@
+"""
+Request metrics for C-Suite Pathway Program
+Per-endpoint counters and histograms kept in process memory and rendered in the
+Prometheus text exposition format. Each gunicorn worker keeps its own registry.
+"""
+
+import bisect
+import threading
+
+# Upper bounds (le) of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic total per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield (f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", _number(bound))])} '
+                       f'{cumulative}')
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+class MetricsRegistry:
+    """The metrics of one process, rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """Everything recorded about the requests served by this process"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter(
+            'csuite_http_requests_total', 'Requests served', ('endpoint', 'method', 'status'))
+        self.duration = self.registry.histogram(
+            'csuite_http_request_duration_seconds', 'Wall time from routing to response', ('endpoint',))
+        self.db_queries = self.registry.histogram(
+            'csuite_http_request_db_queries', 'SQL statements executed per request', ('endpoint',),
+            buckets=QUERY_COUNT_BUCKETS)
+        self.db_duration = self.registry.histogram(
+            'csuite_http_request_db_duration_seconds', 'Time spent executing SQL per request', ('endpoint',))
+        self.template_duration = self.registry.histogram(
+            'csuite_http_request_template_duration_seconds', 'Time spent rendering templates per request',
+            ('endpoint',))
+        self.response_size = self.registry.histogram(
+            'csuite_http_response_size_bytes', 'Response body size (0 when streamed without a length)',
+            ('endpoint',), buckets=SIZE_BUCKETS)
+        self.slow_requests = self.registry.counter(
+            'csuite_slow_requests_total', 'Requests slower than SLOW_REQUEST_MS', ('endpoint',))
+        self.slow_queries = self.registry.counter(
+            'csuite_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS', ('endpoint',))
+
+    def observe_request(self, endpoint, method, status, duration, queries, db_duration, template_duration, size):
+        self.requests.inc((endpoint, method, str(status)))
+        self.duration.observe(duration, (endpoint,))
+        self.db_queries.observe(queries, (endpoint,))
+        self.db_duration.observe(db_duration, (endpoint,))
+        self.template_duration.observe(template_duration, (endpoint,))
+        self.response_size.observe(size, (endpoint,))
+
+    def render(self):
+        return self.registry.render()
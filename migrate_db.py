@@ -1,61 +1,279 @@
 #!/usr/bin/env python3
 """
 Database Migration Script for C-Suite Pathway Alumni Website
-Migrates data from SQLite to PostgreSQL for Render deployment
+Streams every table from the SQLite database into the target database (PostgreSQL on Render).
+
+Usage:
+    python migrate_db.py                                    # instance/csuite.db -> $DATABASE_URL
+    python migrate_db.py --source sqlite:///old.db --target postgresql://localhost/csuite
+    python migrate_db.py --target sqlite:///copy.db --batch-size 10000
+    python migrate_db.py --verify-only
+
+Tables are copied parents-first in primary key order, in batches read with a
+server-side cursor and written with COPY on PostgreSQL (executemany elsewhere).
+Each committed batch is recorded in a checkpoint file, so an interrupted run
+resumes where it stopped when started again. Afterwards sequences are reset and
+every table's row count and checksum are compared between source and target.
 """
 
+import argparse
+import csv
+import hashlib
+import io
+import json
 import os
 import sys
+import time
 from datetime import datetime
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, User, UserMessage, Event, Resource, FAQ, Alumni
+from sqlalchemy import Integer, create_engine, func, inspect, insert, select, text
+from app import app, db, User
 from werkzeug.security import generate_password_hash
 
+DEFAULT_SOURCE = 'sqlite:///' + os.path.join(app.instance_path, 'csuite.db')
+DEFAULT_CHECKPOINT = os.path.join(app.instance_path, 'migration_checkpoint.json')
+
+def normalize_url(url):
+    """Render hands out postgres:// URLs, which SQLAlchemy no longer accepts"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint atomically so a crash never leaves a truncated file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+def common_columns(table, source_engine, target_engine):
+    """Columns of the model table that exist in both databases, primary key first"""
+    source_names = {column['name'] for column in inspect(source_engine).get_columns(table.name)}
+    target_names = {column['name'] for column in inspect(target_engine).get_columns(table.name)}
+    columns = [column for column in table.columns if column.name in source_names & target_names]
+    return sorted(columns, key=lambda column: not column.primary_key)
+
+def primary_key(table):
+    return table.primary_key.columns.values()[0]
+
+def after_key(pk, last_key):
+    """WHERE clause for rows past the checkpointed key (None, or 0 from older checkpoints, means from the start)"""
+    if last_key in (None, 0):
+        return None
+    return pk > last_key
+
+def read_batches(source_engine, table, columns, last_key, batch_size):
+    """Stream rows with a primary key past last_key in key order using a server-side cursor"""
+    pk = primary_key(table)
+    query = select(*columns).order_by(pk)
+    after = after_key(pk, last_key)
+    if after is not None:
+        query = query.where(after)
+    with source_engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for partition in result.partitions(batch_size):
+            yield [tuple(row) for row in partition]
+
+def copy_rows(connection, table, columns, rows):
+    """Bulk load rows with PostgreSQL COPY ... FROM STDIN; returns False if the driver cannot COPY"""
+    cursor = connection.connection.driver_connection.cursor()
+    if not hasattr(cursor, 'copy_expert'):
+        cursor.close()
+        return False
+
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC quotes every string (so '' stays an empty string) and leaves
+    # None unquoted, which COPY reads as NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow([value.isoformat(' ') if isinstance(value, datetime) else value for value in row])
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    column_list = ', '.join(preparer.quote(column.name) for column in columns)
+    try:
+        cursor.copy_expert(
+            f"COPY {preparer.quote(table.name)} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+    return True
+
+def write_rows(connection, table, columns, rows):
+    if connection.dialect.name == 'postgresql' and copy_rows(connection, table, columns, rows):
+        return
+    keys = [column.name for column in columns]
+    connection.execute(insert(table), [dict(zip(keys, row)) for row in rows])
+
+def has_serial_id(table):
+    """Whether the table's primary key is an integer id column backed by a sequence"""
+    pk = primary_key(table)
+    return pk.name == 'id' and isinstance(pk.type, Integer) and len(table.primary_key.columns) == 1
+
+def reset_sequence(connection, table):
+    """Point the PostgreSQL id sequence past the copied rows (tables keyed otherwise have none)"""
+    if connection.dialect.name != 'postgresql' or not has_serial_id(table):
+        return
+    quoted = connection.dialect.identifier_preparer.quote(table.name)
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence(:table, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f"FROM {quoted}"
+    ), {'table': quoted})
+
+def copy_table(table, source_engine, target_engine, checkpoint, checkpoint_path, batch_size):
+    """Copy one table, resuming after the last checkpointed primary key"""
+    state = checkpoint['tables'].setdefault(table.name, {'last_id': None, 'rows': 0, 'done': False})
+    if state['done']:
+        print(f"⏭️  {table.name}: already copied ({state['rows']} rows)")
+        return
+
+    pk = primary_key(table)
+    columns = common_columns(table, source_engine, target_engine)
+    started = time.perf_counter()
+
+    with target_engine.begin() as connection:
+        # Rows past the checkpoint come from a batch whose checkpoint write never happened
+        stale = after_key(pk, state['last_id'])
+        connection.execute(table.delete() if stale is None else table.delete().where(stale))
+
+    for rows in read_batches(source_engine, table, columns, state['last_id'], batch_size):
+        with target_engine.begin() as connection:
+            write_rows(connection, table, columns, rows)
+        state['last_id'] = rows[-1][0]
+        state['rows'] += len(rows)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    with target_engine.begin() as connection:
+        reset_sequence(connection, table)
+    state['done'] = True
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    elapsed = time.perf_counter() - started
+    rate = state['rows'] / elapsed if elapsed else 0
+    print(f"✅ {table.name}: {state['rows']} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+def table_fingerprint(engine, table, columns):
+    """(row count, sha256 of every row in primary key order)"""
+    digest = hashlib.sha256()
+    count = 0
+    pk = primary_key(table)
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+            select(*columns).order_by(pk)
+        )
+        for row in result:
+            digest.update('\x1f'.join('' if value is None else str(value) for value in row).encode())
+            digest.update(b'\x1e')
+            count += 1
+    return count, digest.hexdigest()
+
+def verify(source_engine, target_engine, tables):
+    """Compare row counts and checksums of every table; returns True if all match"""
+    print("\n🔍 Verifying row counts and checksums...")
+    all_match = True
+    for table in tables:
+        columns = common_columns(table, source_engine, target_engine)
+        source_count, source_hash = table_fingerprint(source_engine, table, columns)
+        target_count, target_hash = table_fingerprint(target_engine, table, columns)
+        match = source_count == target_count and source_hash == target_hash
+        all_match = all_match and match
+        print(f"{'✅' if match else '❌'} {table.name:<18} source {source_count:>8} rows  "
+              f"target {target_count:>8} rows  checksum {'match' if match else 'MISMATCH'}")
+    return all_match
+
+def create_admin_user(target_engine):
+    """Optionally create the default admin user in the target database"""
+    with target_engine.begin() as connection:
+        if connection.execute(select(User.id).where(User.email == 'admin@csuite-alumni.com')).first():
+            print("Admin user already exists!")
+            return
+        connection.execute(insert(User.__table__).values(
+            first_name="Admin",
+            last_name="User",
+            email="admin@csuite-alumni.com",
+            password_hash=generate_password_hash("admin123"),
+            is_verified=True,
+            is_admin=True,
+            created_at=datetime.utcnow()
+        ))
+        reset_sequence(connection, User.__table__)
+    print("✅ Default admin user created successfully!")
+    print("📧 Email: admin@csuite-alumni.com")
+    print("🔑 Password: admin123")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Copy every table from SQLite into the target database')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='source database URL (default: instance/csuite.db)')
+    parser.add_argument('--target', default=os.environ.get('DATABASE_URL'), help='target database URL (default: $DATABASE_URL)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per batch (default: 5000)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='checkpoint file used to resume')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and empty the target tables first')
+    parser.add_argument('--verify-only', action='store_true', help='only compare source and target')
+    parser.add_argument('--create-admin', action='store_true', help='also create the default admin user')
+    return parser.parse_args()
+
 def migrate_database():
     """Migrate data from SQLite to PostgreSQL"""
-    
-    with app.app_context():
-        print("🔄 Starting database migration...")
-        
+    args = parse_args()
+    if not args.target:
+        print("❌ No target database: pass --target or set DATABASE_URL")
+        sys.exit(1)
+
+    source_engine = create_engine(normalize_url(args.source))
+    target_engine = create_engine(normalize_url(args.target))
+    tables = db.metadata.sorted_tables
+    source_tables = set(inspect(source_engine).get_table_names())
+    tables = [table for table in tables if table.name in source_tables]
+
+    print("🔄 Starting database migration...")
+    print(f"   {source_engine.url.render_as_string(hide_password=True)} → "
+          f"{target_engine.url.render_as_string(hide_password=True)}")
+
+    if not args.verify_only:
         # Create all tables in the new database
         print("📋 Creating database tables...")
-        db.create_all()
-        
-        # Check if we have existing data to migrate
-        if os.path.exists('instance/csuite.db'):
-            print("📊 Found existing SQLite database, checking for data...")
-            
-            # Import SQLite data (if any exists)
-            try:
-                # For now, we'll create a default admin user
-                # In a real migration, you'd read from the SQLite database
-                print("👤 Creating default admin user...")
-                
-                admin_user = User(
-                    first_name="Admin",
-                    last_name="User",
-                    email="admin@csuite-alumni.com",
-                    password_hash=generate_password_hash("admin123"),
-                    is_verified=True,
-                    is_admin=True,
-                    created_at=datetime.utcnow()
-                )
-                
-                db.session.add(admin_user)
-                db.session.commit()
-                print("✅ Default admin user created successfully!")
-                print("📧 Email: admin@csuite-alumni.com")
-                print("🔑 Password: admin123")
-                
-            except Exception as e:
-                print(f"⚠️  Error creating admin user: {e}")
-                db.session.rollback()
-        
-        print("✅ Database migration completed successfully!")
-        print("🚀 Your application is ready for Render deployment!")
+        db.metadata.create_all(target_engine)
+
+        target_name = target_engine.url.render_as_string(hide_password=True)
+        checkpoint = load_checkpoint(args.checkpoint)
+        if args.restart or checkpoint.get('target') != target_name:
+            checkpoint = {'target': target_name, 'tables': {}}
+
+        if args.restart:
+            with target_engine.begin() as connection:
+                for table in reversed(tables):
+                    connection.execute(table.delete())
+        elif not checkpoint['tables']:
+            with target_engine.connect() as connection:
+                non_empty = [table.name for table in tables
+                             if connection.execute(select(func.count()).select_from(table)).scalar()]
+            if non_empty:
+                print(f"❌ Target tables already contain rows: {', '.join(non_empty)}")
+                print("   Use --restart to empty them first.")
+                sys.exit(1)
+
+        for table in tables:
+            copy_table(table, source_engine, target_engine, checkpoint, args.checkpoint, args.batch_size)
+
+    if not verify(source_engine, target_engine, tables):
+        print("\n❌ Source and target differ. Re-run with --restart to copy everything again.")
+        sys.exit(1)
+
+    if args.create_admin:
+        create_admin_user(target_engine)
+
+    print("\n✅ Database migration completed successfully!")
+    print("🚀 Your application is ready for Render deployment!")
 
 if __name__ == '__main__':
     migrate_database()
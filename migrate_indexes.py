@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Index Migration Script
+Adds the composite indexes (and any new nullable columns they may rely on) declared on the
+models to an existing SQLite or PostgreSQL database.
+db.create_all() never alters tables that already exist, so run this once after deploying.
+Running it again is a no-op.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, ensure_columns, ensure_indexes, ensure_search_index, ensure_collection_versions
+
+def migrate_indexes():
+    """Create every missing model index"""
+    with app.app_context():
+        print(f"🔄 Checking indexes on {db.engine.url.render_as_string(hide_password=True)}")
+        db.create_all()
+        for name in ensure_columns():
+            print(f"✅ Added column {name}")
+        created = ensure_indexes()
+        
+        if created:
+            for name in created:
+                print(f"✅ Created index {name}")
+        else:
+            print("✅ All indexes already exist, nothing to do")
+        indexed = ensure_search_index()
+        if indexed:
+            print(f"✅ Built the search index ({indexed} documents)")
+        ensure_collection_versions()
+
+if __name__ == '__main__':
+    migrate_indexes()
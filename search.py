@@ -0,0 +1,320 @@
+"""
+Full-text search for C-Suite Pathway Program
+One index over FAQs, messages and resources: an FTS5 virtual table on SQLite and a
+weighted tsvector column with a GIN index on PostgreSQL. Documents are added, replaced
+and removed one at a time as the records behind them change.
+"""
+
+import json
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import text
+
+KINDS = ('faq', 'message', 'resource')
+
+SearchHit = namedtuple('SearchHit', ['kind', 'doc_id', 'title', 'snippet', 'created_at', 'rank'])
+
+# Wrapped around matched terms in snippets; the page escapes the snippet, then turns them into <mark>
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+# Words in nearly every document: matching them costs a scan of the whole index and ranks nothing
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have i in is it of on or our that the this to was we were will with you your'.split()
+)
+
+def query_terms(query, max_terms=10):
+    """Words of a user query, stripped of operator syntax the index would interpret and of stop words"""
+    words = re.findall(r'\w+', query.lower())
+    terms = [word for word in words if word not in STOP_WORDS] or words
+    return terms[:max_terms]
+
+class SearchIndex:
+    """Interface every search index implements (all methods run on the caller's connection)"""
+
+    def create(self, connection):
+        """Create the index if it does not exist yet"""
+        raise NotImplementedError
+
+    def is_empty(self, connection):
+        raise NotImplementedError
+
+    def upsert(self, connection, kind, doc_id, title, body, created_at):
+        """Add a document, replacing any previous version of it"""
+        raise NotImplementedError
+
+    def add_many(self, connection, documents):
+        """Bulk-add (kind, doc_id, title, body, created_at) tuples that are not indexed yet"""
+        raise NotImplementedError
+
+    def remove(self, connection, kind, doc_id):
+        raise NotImplementedError
+
+    def clear(self, connection):
+        raise NotImplementedError
+
+    def search(self, connection, query, kinds=None, limit=20, offset=0, window=1000):
+        """
+        Best matches first, as SearchHit tuples. Queries with fewer than `window` matches are
+        ranked by relevance; more common ones list title matches first, then the other
+        matches, each newest first, so their cost grows with offset + limit rather than with
+        the number of matches. Every match can be reached by paging either way.
+        """
+        raise NotImplementedError
+
+class SQLiteSearchIndex(SearchIndex):
+    """
+    FTS5 table ranked with bm25. The rowid encodes (kind, doc_id) so updates never scan, and
+    each kind owns a contiguous rowid range so filtering by kind is a cheap range seek.
+    """
+
+    KIND_SPAN = 2 ** 40
+
+    _insert = text(
+        "INSERT INTO search_index (rowid, kind, title, body, doc_id, created_at) "
+        "VALUES (:rowid, :kind, :title, :body, :doc_id, :created_at)"
+    )
+
+    def _rowid(self, kind, doc_id):
+        # Grows with doc_id, so within a kind rowid order is creation order
+        return KINDS.index(kind) * self.KIND_SPAN + doc_id
+
+    def _kind_range(self, kind):
+        start = KINDS.index(kind) * self.KIND_SPAN
+        return start, start + self.KIND_SPAN - 1
+
+    def _params(self, kind, doc_id, title, body, created_at):
+        return {
+            'rowid': self._rowid(kind, doc_id), 'kind': kind, 'title': title, 'body': body or '',
+            'doc_id': doc_id, 'created_at': created_at.isoformat(' ') if created_at else None,
+        }
+
+    def create(self, connection):
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind, title, body, doc_id UNINDEXED, created_at UNINDEXED, "
+            "tokenize='porter unicode61')"
+        ))
+
+    def is_empty(self, connection):
+        return connection.execute(text("SELECT 1 FROM search_index LIMIT 1")).first() is None
+
+    def upsert(self, connection, kind, doc_id, title, body, created_at):
+        self.remove(connection, kind, doc_id)
+        connection.execute(self._insert, self._params(kind, doc_id, title, body, created_at))
+
+    def add_many(self, connection, documents):
+        connection.execute(self._insert, [self._params(*document) for document in documents])
+
+    def remove(self, connection, kind, doc_id):
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"),
+                           {'rowid': self._rowid(kind, doc_id)})
+
+    def clear(self, connection):
+        # Much faster than DELETE, which rewrites the index row by row
+        connection.execute(text("DROP TABLE IF EXISTS search_index"))
+        self.create(connection)
+
+    def _kind_of(self, rowid):
+        return KINDS[rowid // self.KIND_SPAN]
+
+    def _union(self, template, groups, params):
+        """
+        One statement running `template` once per (match, low, high) group, each with its own
+        parameters (a single FTS5 scan over several kind ranges would read everything between them)
+        """
+        parts = []
+        for number, (match, low, high) in enumerate(groups):
+            parts.append(template.format(match=f':match{number}', low=f':low{number}', high=f':high{number}'))
+            params.update({f'match{number}': match, f'low{number}': low, f'high{number}': high})
+        return text(' UNION ALL '.join(parts)), params
+
+    def _newest(self, connection, match, kinds, count):
+        """Rowids of the newest `count` matches of the kinds, newest first"""
+        # Within a kind rowid order is recency: read each kind backwards from the end of its range
+        statement, params = self._union(
+            "SELECT * FROM (SELECT rowid AS id, created_at AS created FROM search_index "
+            "WHERE search_index MATCH {match} AND rowid BETWEEN {low} AND {high} ORDER BY rowid DESC LIMIT :count)",
+            [(match, *self._kind_range(kind)) for kind in kinds], {'count': count}
+        )
+        rows = connection.execute(text(f"SELECT id FROM ({statement.text}) ORDER BY created DESC, id DESC LIMIT :count"),
+                                  params)
+        return rows.scalars().all()
+
+    def search(self, connection, query, kinds=None, limit=20, offset=0, window=1000):
+        terms = query_terms(query)
+        kinds = [kind for kind in KINDS if not kinds or kind in kinds]
+        if not terms or not kinds:
+            return []
+        # Every (stemmed) term must match title or body. No prefix queries: FTS5 has to
+        # merge the whole doclist of every matching term for them
+        phrases = '(' + ' AND '.join(f'"{term}"' for term in terms) + ')'
+        match = '{title body} : ' + phrases
+
+        # Counting up to `window` matches tells rare terms from common ones
+        low, high = self._kind_range(kinds[0])[0], self._kind_range(kinds[-1])[1]
+        count = connection.execute(text(
+            "SELECT count(*) FROM (SELECT 1 FROM search_index WHERE search_index MATCH :match "
+            "AND rowid BETWEEN :low AND :high LIMIT :window)"
+        ), {'match': match, 'low': low, 'high': high, 'window': window}).scalar()
+
+        if count < window:
+            # Rare terms: rank every match with bm25, titles weighted 10x
+            ranked = connection.execute(text(
+                "SELECT rowid, -bm25(search_index, 0.0, 10.0, 1.0) FROM search_index "
+                "WHERE search_index MATCH :match AND rowid BETWEEN :low AND :high "
+                "AND kind IN (SELECT value FROM json_each(:kinds)) "
+                "ORDER BY 2 DESC LIMIT :limit OFFSET :offset"
+            ), {'match': match, 'low': low, 'high': high, 'kinds': json.dumps(kinds),
+                'limit': limit, 'offset': offset}).all()
+            matches = {rowid: match for rowid, _ in ranked}
+        else:
+            # Common terms: bm25 has to score their whole doclists (200ms and more at 100k
+            # documents) while their weight is near zero anyway. Title matches come first, then
+            # the rest, each newest first, so a page only reads the `offset + limit` newest
+            # matches of each kind and every match can still be paged to
+            title_match = '{title} : ' + phrases
+            wanted = offset + limit
+            ranked = [(rowid, 1.0) for rowid in self._newest(connection, title_match, kinds, wanted)]
+            not_in_title = f'({match}) NOT ({title_match})'
+            if len(ranked) < wanted:
+                ranked += [(rowid, 0.0) for rowid in
+                           self._newest(connection, not_in_title, kinds, wanted - len(ranked))]
+            ranked = ranked[offset:]
+            # Snippets of title matches need the terms in the body highlighted too
+            in_title = f'({title_match}) AND ({match})'
+            matches = {rowid: in_title if rank else not_in_title for rowid, rank in ranked}
+        if not ranked:
+            return []
+
+        # Snippets only for the rows on this page, scanning each kind and tier from its oldest
+        # to its newest row on the page
+        ranks = dict(ranked)
+        groups = {}
+        for rowid in ranks:
+            groups.setdefault((matches[rowid], self._kind_of(rowid)), []).append(rowid)
+        statement, params = self._union(
+            "SELECT rowid, kind, doc_id, title, snippet(search_index, 2, :start, :end, '…', 24), created_at "
+            "FROM search_index WHERE search_index MATCH {match} AND rowid BETWEEN {low} AND {high} "
+            "AND +rowid IN (SELECT value FROM json_each(:rowids))",
+            [(group_match, min(rowids), max(rowids)) for (group_match, _), rowids in groups.items()],
+            {'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END, 'rowids': json.dumps(list(ranks))}
+        )
+        hits = {
+            rowid: SearchHit(kind, doc_id, title, snippet,
+                             datetime.fromisoformat(created_at) if created_at else None, ranks[rowid])
+            for rowid, kind, doc_id, title, snippet, created_at in connection.execute(statement, params)
+        }
+        return [hits[rowid] for rowid in ranks if rowid in hits]
+
+class PostgresSearchIndex(SearchIndex):
+    """Table with a generated tsvector (title weighted above body) behind a GIN index"""
+
+    _upsert = text(
+        "INSERT INTO search_index (kind, doc_id, title, body, created_at) "
+        "VALUES (:kind, :doc_id, :title, :body, :created_at) "
+        "ON CONFLICT (kind, doc_id) DO UPDATE SET "
+        "title = EXCLUDED.title, body = EXCLUDED.body, created_at = EXCLUDED.created_at"
+    )
+
+    def create(self, connection):
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_index ("
+            "kind VARCHAR(20) NOT NULL, "
+            "doc_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL, "
+            "body TEXT NOT NULL, "
+            "created_at TIMESTAMP, "
+            "document TSVECTOR GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', body), 'B')) STORED, "
+            "PRIMARY KEY (kind, doc_id))"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_index_created_at ON search_index (created_at)"
+        ))
+
+    def is_empty(self, connection):
+        return connection.execute(text("SELECT 1 FROM search_index LIMIT 1")).first() is None
+
+    def _params(self, kind, doc_id, title, body, created_at):
+        return {'kind': kind, 'doc_id': doc_id, 'title': title, 'body': body or '', 'created_at': created_at}
+
+    def upsert(self, connection, kind, doc_id, title, body, created_at):
+        connection.execute(self._upsert, self._params(kind, doc_id, title, body, created_at))
+
+    def add_many(self, connection, documents):
+        connection.execute(self._upsert, [self._params(*document) for document in documents])
+
+    def remove(self, connection, kind, doc_id):
+        connection.execute(text("DELETE FROM search_index WHERE kind = :kind AND doc_id = :doc_id"),
+                           {'kind': kind, 'doc_id': doc_id})
+
+    def clear(self, connection):
+        connection.execute(text("TRUNCATE search_index"))
+
+    def search(self, connection, query, kinds=None, limit=20, offset=0, window=1000):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        params = {
+            'tsquery': ' & '.join(terms),
+            # The same terms, each restricted to the title (weight A)
+            'title_tsquery': ' & '.join(f'{term}:A' for term in terms),
+            'kinds': list(kinds) if kinds else None,
+            'headline': f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=35, MinWords=15',
+            'window': window,
+            'wanted': offset + limit,
+            'limit': limit,
+            'offset': offset,
+        }
+        matching = ("document @@ to_tsquery('english', :tsquery) "
+                    "AND (CAST(:kinds AS VARCHAR[]) IS NULL OR kind = ANY(CAST(:kinds AS VARCHAR[])))")
+
+        # Counting up to `window` matches tells rare terms from common ones
+        count = connection.execute(text(
+            f"SELECT count(*) FROM (SELECT 1 FROM search_index WHERE {matching} LIMIT :window) matches"
+        ), params).scalar()
+        if count < window:
+            # Rare terms: rank every match
+            candidates = (f"SELECT kind, doc_id, title, body, created_at, "
+                          f"ts_rank_cd(document, to_tsquery('english', :tsquery)) AS rank "
+                          f"FROM search_index WHERE {matching}")
+        else:
+            # Common terms: title matches, then the rest, each newest first along the created_at
+            # index, so a page reads only the `offset + limit` newest rows of each
+            in_title = "document @@ to_tsquery('english', :title_tsquery)"
+            candidates = (f"(SELECT kind, doc_id, title, body, created_at, 1.0 AS rank FROM search_index "
+                          f"WHERE {matching} AND {in_title} ORDER BY created_at DESC LIMIT :wanted) "
+                          f"UNION ALL "
+                          f"(SELECT kind, doc_id, title, body, created_at, 0.0 FROM search_index "
+                          f"WHERE {matching} AND NOT {in_title} ORDER BY created_at DESC LIMIT :wanted)")
+
+        # Page the candidates, and only then build headlines for the rows that are shown
+        rows = connection.execute(text(
+            "SELECT hits.kind, hits.doc_id, hits.title, "
+            "ts_headline('english', hits.body, to_tsquery('english', :tsquery), :headline), "
+            "hits.created_at, hits.rank "
+            f"FROM (SELECT * FROM ({candidates}) candidates "
+            "ORDER BY rank DESC, created_at DESC LIMIT :limit OFFSET :offset) hits "
+            "ORDER BY hits.rank DESC, hits.created_at DESC"
+        ), params)
+        return [SearchHit(*row) for row in rows]
+
+_indexes = {}
+
+def search_index_for(dialect_name):
+    """Search index implementation for a database dialect ('sqlite' or 'postgresql')"""
+    if dialect_name not in _indexes:
+        if dialect_name == 'sqlite':
+            _indexes[dialect_name] = SQLiteSearchIndex()
+        elif dialect_name == 'postgresql':
+            _indexes[dialect_name] = PostgresSearchIndex()
+        else:
+            raise ValueError(f"Full-text search is not supported on '{dialect_name}'")
+    return _indexes[dialect_name]
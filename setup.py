@@ -6,7 +6,7 @@ Setup script for C-Suite Pathway Program Website
 import os
 import sys
 from werkzeug.security import generate_password_hash
-from app import app, db, User
+from app import app, db, bootstrap_database, User
 
 def create_admin_user():
     """Create an admin user for initial setup"""
@@ -74,10 +74,10 @@ def main():
     print("C-Suite Pathway Program Setup")
     print("=" * 30)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-        print("✅ Database tables created")
+    # Create tables, indexes, the search index and collection versions, and load seed data
+    if not bootstrap_database():
+        sys.exit(1)
+    print("✅ Database bootstrapped")
     
     # Check email configuration
     check_email_config()
@@ -96,33 +96,6 @@ document.addEventListener('DOMContentLoaded', function() {
         updateCounter();
     }
 
-    // FAQ search functionality
-    const faqSearch = document.createElement('input');
-    faqSearch.type = 'text';
-    faqSearch.className = 'form-control mb-3';
-    faqSearch.placeholder = 'Search FAQs...';
-    
-    const faqContainer = document.querySelector('#faqAccordion');
-    if (faqContainer) {
-        faqContainer.parentNode.insertBefore(faqSearch, faqContainer);
-        
-        faqSearch.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const faqItems = faqContainer.querySelectorAll('.accordion-item');
-            
-            faqItems.forEach(item => {
-                const question = item.querySelector('.accordion-button').textContent.toLowerCase();
-                const answer = item.querySelector('.accordion-body').textContent.toLowerCase();
-                
-                if (question.includes(searchTerm) || answer.includes(searchTerm)) {
-                    item.style.display = 'block';
-                } else {
-                    item.style.display = 'none';
-                }
-            });
-        });
-    }
-
     // Event date validation
     const eventDateInput = document.getElementById('date');
     if (eventDateInput) {
@@ -236,8 +209,106 @@ document.addEventListener('DOMContentLoaded', function() {
         childList: true,
         subtree: true
     });
+
+    startLiveFeed();
 });
 
+// Live feed: new messages and events are added to the lists on the page as they are posted.
+// Uses Server-Sent Events, or long polling where EventSource is missing or cannot connect.
+function startLiveFeed() {
+    const body = document.body;
+    const lists = document.querySelectorAll('[data-live-list]');
+    if (!lists.length || !body.dataset.liveStream) {
+        return;
+    }
+    let cursor = body.dataset.liveCursor;
+
+    function insertItem(list, item) {
+        const html = item.html[list.dataset.liveVariant];
+        const key = `${item.kind}-${item.id}`;
+        if (!html || list.querySelector(`[data-live-id="${key}"]`)) {
+            return;
+        }
+        if (list.dataset.liveType && list.dataset.liveType !== item.type) {
+            return;
+        }
+        if (list.hasAttribute('data-live-upcoming') && item.sort < new Date().toISOString()) {
+            return;
+        }
+
+        // Keep the list's order; items that belong on another page are left out
+        const ascending = list.dataset.liveOrder === 'asc';
+        const children = Array.from(list.querySelectorAll(':scope > [data-live-id]'));
+        const next = children.find(child => ascending ? child.dataset.liveSort > item.sort
+                                                      : child.dataset.liveSort < item.sort);
+        if (!next && list.hasAttribute('data-live-has-next')) {
+            return;
+        }
+        if (next === children[0] && children.length && list.hasAttribute('data-live-has-prev')) {
+            return;
+        }
+
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        const element = template.content.firstElementChild;
+        element.classList.add('fade-in');
+        list.insertBefore(element, next || null);
+        list.parentElement.querySelectorAll(':scope > [data-live-empty]').forEach(empty => empty.remove());
+
+        const limit = parseInt(list.dataset.liveLimit, 10);
+        if (limit) {
+            Array.from(list.querySelectorAll(':scope > [data-live-id]')).slice(limit).forEach(child => child.remove());
+        }
+    }
+
+    function receive(item) {
+        lists.forEach(list => {
+            if (list.dataset.liveList === item.kind) {
+                insertItem(list, item);
+            }
+        });
+    }
+
+    function longPoll() {
+        fetch(`${body.dataset.livePoll}?cursor=${encodeURIComponent(cursor)}`, {credentials: 'same-origin'})
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                cursor = data.cursor;
+                data.items.forEach(receive);
+                setTimeout(longPoll, data.retry_after * 1000);
+            })
+            .catch(() => setTimeout(longPoll, 15000));
+    }
+
+    if (!window.EventSource) {
+        longPoll();
+        return;
+    }
+
+    // The server sends each event's cursor as its id; EventSource reconnects with it as Last-Event-ID
+    const source = new EventSource(`${body.dataset.liveStream}?cursor=${encodeURIComponent(cursor)}`);
+    let opened = false;
+    source.addEventListener('open', () => { opened = true; });
+    ['new-message', 'new-event'].forEach(type => {
+        source.addEventListener(type, event => {
+            cursor = event.lastEventId;
+            receive(JSON.parse(event.data));
+        });
+    });
+    source.addEventListener('error', () => {
+        // Never connected (a proxy that buffers or blocks streams): poll instead
+        if (!opened) {
+            source.close();
+            longPoll();
+        }
+    });
+}
+
 // Add CSS for animations
 const style = document.createElement('style');
 style.textContent = `
@@ -0,0 +1,168 @@
+"""
+Resource storage for C-Suite Pathway Program
+Uploaded files are addressed by key (e.g. "<sha256>.pdf") and kept by a pluggable
+backend: the local upload folder, a sharded directory tree, or an S3-compatible
+object store shared by every web instance.
+"""
+
+import os
+import shutil
+from urllib.parse import quote
+
+class StorageBackend:
+    """Interface every storage backend implements"""
+
+    def save(self, key, source_path):
+        """Move the local file at source_path into storage under key (the source is consumed)"""
+        raise NotImplementedError
+
+    def open(self, key):
+        """Binary file-like object streaming the stored bytes; raises FileNotFoundError"""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove key; missing keys are ignored"""
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """Absolute path of key on this machine, or None if the backend is remote"""
+        return None
+
+    def download_url(self, key, download_name, expires_in):
+        """Short-lived URL the client can fetch key from directly, or None"""
+        return None
+
+class LocalStorage(StorageBackend):
+    """Files stored flat in one directory (the historical static/uploads layout)"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key):
+        # Keys are generated by the app, but never let one escape the root
+        if os.path.basename(key) != key or key in ('', '.', '..'):
+            raise ValueError(f"Invalid storage key '{key}'")
+        return os.path.join(self.root, key)
+
+    def save(self, key, source_path):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(source_path, path)
+        except OSError:
+            # Staging folder on another filesystem
+            shutil.move(source_path, path)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key):
+        path = self._path(key)
+        return path if os.path.isfile(path) else None
+
+class ShardedStorage(LocalStorage):
+    """
+    Files spread over nested directories named after the key's leading characters
+    (ab/cd/abcd....pdf), so no single directory grows to hundreds of thousands of entries.
+    Files written flat before sharding was enabled are still found.
+    """
+
+    def __init__(self, root, depth=2, width=2):
+        super().__init__(root)
+        self.depth = depth
+        self.width = width
+
+    def _path(self, key):
+        flat_path = super()._path(key)
+        shards = [key[i * self.width:(i + 1) * self.width] for i in range(self.depth)]
+        sharded_path = os.path.join(self.root, *shards, key)
+        if not os.path.exists(sharded_path) and os.path.exists(flat_path):
+            return flat_path
+        return sharded_path
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3-compatible bucket (AWS S3, MinIO, Cloudflare R2, ...; requires boto3).
+    endpoint_url points the client at a non-AWS server such as a local MinIO or moto_server.
+    """
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, chunk_size=8 * 1024 * 1024):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError('STORAGE_BACKEND=s3 requires the boto3 package (pip install boto3)') from e
+        if not bucket:
+            raise RuntimeError('STORAGE_BACKEND=s3 requires STORAGE_S3_BUCKET')
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.client('s3', endpoint_url=endpoint_url or None, region_name=region or None)
+        # Files larger than chunk_size are sent as a multipart upload, one chunk in memory at a time
+        self._transfer_config = TransferConfig(multipart_threshold=chunk_size, multipart_chunksize=chunk_size)
+        self._client_error = ClientError
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def _is_missing(self, error):
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def save(self, key, source_path):
+        self._client.upload_file(source_path, self.bucket, self._key(key), Config=self._transfer_config)
+        os.remove(source_path)
+
+    def open(self, key):
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._key(key))['Body']
+        except self._client_error as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def exists(self, key):
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except self._client_error as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def delete(self, key):
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def download_url(self, key, download_name, expires_in):
+        # Presigned GET: the object store serves the bytes (including Range requests) itself
+        return self._client.generate_presigned_url('get_object', Params={
+            'Bucket': self.bucket,
+            'Key': self._key(key),
+            'ResponseContentDisposition': f"attachment; filename*=UTF-8''{quote(download_name)}",
+        }, ExpiresIn=expires_in)
+
+def create_storage_backend(name, root, **options):
+    """Build the backend selected by the STORAGE_BACKEND setting"""
+    if name == 'local':
+        return LocalStorage(root)
+    if name == 'sharded':
+        return ShardedStorage(root, depth=options.get('depth', 2))
+    if name == 's3':
+        return S3Storage(
+            options.get('bucket'),
+            prefix=options.get('prefix', ''),
+            endpoint_url=options.get('endpoint_url'),
+            region=options.get('region'),
+        )
+    raise ValueError(f"Unknown storage backend '{name}'")
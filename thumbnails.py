@@ -0,0 +1,78 @@
+"""
+Preview images for C-Suite Pathway Program resources
+Renders a small JPEG thumbnail of an uploaded image or of a PDF's first page.
+Requires Pillow; PDF previews additionally require PyMuPDF (pip install pymupdf).
+"""
+
+import io
+
+# File types a preview can be generated for
+PREVIEW_TYPES = {'jpg', 'jpeg', 'png', 'gif', 'pdf'}
+
+# Pixels a source may be decoded at; larger files are refused before any pixel is decoded
+DEFAULT_MAX_PIXELS = 40_000_000
+
+class PreviewUnavailable(Exception):
+    """The file cannot be previewed: a library is missing or it is too large (retrying will not help)"""
+
+def _check_pixels(size, max_pixels):
+    width, height = size
+    if width * height > max_pixels:
+        raise PreviewUnavailable(f'{width}x{height} pixels is over the {max_pixels} pixel preview limit')
+
+def _load_first_page(path, max_pixels):
+    """First page of a PDF rendered as a Pillow image"""
+    try:
+        import pymupdf
+    except ImportError as e:
+        raise PreviewUnavailable('PDF previews require the pymupdf package (pip install pymupdf)') from e
+    from PIL import Image
+
+    with pymupdf.open(path) as document:
+        # 1.5x zoom is plenty for a thumbnail and keeps huge pages cheap to rasterize
+        page = document[0]
+        _check_pixels((round(page.rect.width * 1.5), round(page.rect.height * 1.5)), max_pixels)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(1.5, 1.5), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+def render_preview(path, file_type, max_size=320, quality=80, max_pixels=DEFAULT_MAX_PIXELS):
+    """
+    JPEG bytes of a preview no larger than max_size x max_size pixels. Sources that would be
+    decoded at more than max_pixels raise PreviewUnavailable, from their header alone.
+    """
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise PreviewUnavailable('Previews require the Pillow package (pip install Pillow)') from e
+
+    if file_type == 'pdf':
+        image = _load_first_page(path, max_pixels)
+    else:
+        try:
+            # Only reads the header; Pillow refuses outright far beyond its own MAX_IMAGE_PIXELS
+            image = Image.open(path)
+        except Image.DecompressionBombError as e:
+            raise PreviewUnavailable(str(e)) from e
+        # Decode at a reduced scale when the format supports it (JPEG) instead of at full size
+        image.draft('RGB', (max_size, max_size))
+        try:
+            # The size to be decoded, after any draft reduction
+            _check_pixels(image.size, max_pixels)
+        except PreviewUnavailable:
+            image.close()
+            raise
+
+    with image:
+        image.thumbnail((max_size, max_size))
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Flatten transparency onto white rather than the black JPEG would give
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=quality, optimize=True)
+        return output.getvalue()